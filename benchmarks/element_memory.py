@@ -0,0 +1,87 @@
+"""Memory benchmark for the elements of large loops.
+
+Builds a `ForEach` tree with (by default) 1M leaf elements, once with the elements of this package, which declare `__slots__`,
+and once with copies of the same elements that store their attributes in a per-instance `__dict__`, as they did before.
+Run it from the root of the repository, with `make benchmarks` or:
+
+    python -m benchmarks.element_memory [leaves]
+
+It is not part of the test suite, since it takes a while and its numbers depend on the Python version;
+`tests/test_elements.py` checks that the elements have no `__dict__`.
+"""
+
+import gc
+import sys
+import tracemalloc
+from typing import Callable, Dict, List
+
+import cloudofficeprint as cop
+
+LEAVES_PER_ROW = 5
+
+_unslotted_classes: Dict[type, type] = {}
+
+
+def slot_names(cls: type) -> List[str]:
+    """All slots of a class and its base classes, from the base class down."""
+    names = []
+    for klass in reversed(cls.__mro__):
+        slots = klass.__dict__.get("__slots__", ())
+        names.extend([slots] if isinstance(slots, str) else slots)
+    return names
+
+
+def unslotted(obj):
+    """A copy of an element (or cell style) that keeps its attributes in a `__dict__`, with the memory layout from before `__slots__`."""
+    cls = type(obj)
+    if cls not in _unslotted_classes:
+        bases = (list,) if isinstance(obj, list) else ()
+        _unslotted_classes[cls] = type("Unslotted" + cls.__name__, bases, {})
+    copy = _unslotted_classes[cls](unslotted(item) for item in obj) if isinstance(obj, list) else _unslotted_classes[cls]()
+    for name in slot_names(cls):
+        value = getattr(obj, name)
+        if isinstance(value, (cop.elements.Element, cop.elements.CellStyle)):
+            value = unslotted(value)
+        setattr(copy, name, value)
+    return copy
+
+
+def build(leaves: int, convert: Callable) -> cop.elements.ForEach:
+    """A loop of rows with `LEAVES_PER_ROW` leaf elements each: three properties, a styled cell and an image.
+    The names and values are shared strings, so only the elements themselves are measured."""
+    source = "https://www.cloudofficeprint.com/logo.png"
+    rows = []
+    for _ in range(leaves // LEAVES_PER_ROW):
+        style = cop.elements.CellStyleXlsx(font_bold=True, cell_background="#ff0000")
+        rows.append(convert(cop.elements.ElementCollection("row", [
+            cop.elements.Property("id", "1"),
+            cop.elements.Property("description", "description"),
+            cop.elements.Property("amount", "10"),
+            cop.elements.CellStyleProperty("total", "10", style),
+            cop.elements.Image.from_url("logo", source, max_width=100),
+        ])))
+    return cop.elements.ForEach("rows", rows)
+
+
+def measure(leaves: int, convert: Callable) -> int:
+    """The memory in bytes taken by a loop built by `build`."""
+    gc.collect()
+    tracemalloc.start()
+    loop = build(leaves, convert)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del loop
+    return size
+
+
+def main(leaves: int):
+    print(f"Python {sys.version.split()[0]}, a ForEach of {leaves // LEAVES_PER_ROW} rows with {LEAVES_PER_ROW} leaf elements each")
+    before = measure(leaves, unslotted)
+    after = measure(leaves, lambda row: row)
+    for label, size in (("__dict__ (before)", before), ("__slots__ (after)", after)):
+        print(f"{label:<20}{size / 2 ** 20:10.1f} MiB{size / leaves:10.1f} bytes per leaf element")
+    print(f"{'saved':<20}{(before - after) / 2 ** 20:10.1f} MiB{100 * (before - after) / before:10.1f} %")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -13,6 +13,16 @@ Templates are represented by `Resource`. The simplest way to obtain a `Resource`
 template = cop.Resource.from_local_file("./path/to/template.docx")
 ```
 
+With `lazy=True`, a `resource.FileResource` is created, which keeps only the path, size and modification time of the file: the file is memory-mapped and base64 encoded while the print job is sent, and never encoded when the resource is sent as its hash, so large files are never held in memory.
+Otherwise, the base64 representation of local files and raw data is cached by `own_utils.EncodingCache`, keyed by path, size and modification time or by content digest, so a file used by many resources or images (e.g. a logo) is encoded once; `own_utils.set_encoding_cache` sets its size in memory and an optional directory on disk.
+Files at URLs that the server cannot reach can be downloaded with `fetch=True` in `Resource.from_url` and `elements.Image.from_url`: they are base64 encoded while they are downloaded, within an optional `max_size` (see `own_utils.file_utils.stream_url_as_base64`). Pass `session=server.session` to download through the pooled connections of a `config.Server`.
+Before a print job is serialized, its resources are hashed and encoded on a pool of threads; `PrintJob.prepare_many` does this for a whole batch of print jobs at once.
+Images repeated in a loop (e.g. the same icon in every row) can be created with `interned=True`, so all of them share one base64 string, which is written from the same encoded bytes for every occurrence.
+Large table loops can be generated from their columns (lists, NumPy arrays or pandas Series) with `elements.ForEach.from_columns` or `elements.ForEach.from_dataframe`, and the other loop classes: the rows are created in batches while the print job is written, without elements per row.
+Print jobs are serialized incrementally and sent with chunked transfer encoding, unless `chunked_requests` is disabled in `config.ServerConfig`.
+JSON is serialized compactly with [orjson](https://github.com/ijl/orjson) when it is installed (`pip install cloudofficeprint[fast]`), or with the standard library otherwise.
+The backend can be chosen with `own_utils.json_utils.set_backend`.
+
 ### Render elements
 Most render elements encapsulate the data for a single tag. An `elements.ElementCollection` is an element which represents a collection of elements.
 
@@ -48,6 +58,18 @@ server = cop.config.Server(
 )
 ```
 
+A `config.Server` keeps a pool of keep-alive connections to the Cloud Office Print server, which is shared by all print jobs and requests using that server (also from multiple threads).
+The pool can be tuned with the `pool_connections`, `pool_maxsize` and `keep_alive` options of `config.ServerConfig`.
+Request bodies can be gzip compressed with `config.ServerConfig(compression="gzip")`; bodies smaller than `compression_threshold` are sent as is.
+Transient failures (connection errors, timeouts, 502/503/504 responses) can be retried with exponential backoff and jitter by passing a `config.RetryPolicy` as `retry_policy`.
+The versions and supported mime types of the server are cached for `metadata_ttl` seconds and fetched in one concurrent sweep on first use; set `metadata_cache_path` to share them between processes.
+With a `config.HashStore` as `template_hash_store` (in memory, SQLite or a shared directory), the hashes the server issues for templates with `should_hash` are shared by all templates with the same content, across processes and restarts; `config.Server.revalidate_template_hashes` removes the hashes the server no longer knows.
+Before a batch, `Template.prewarm` (or `Template.prewarm_many` for several templates) uploads templates to every server, also every server of a `config.ServerPool`, and records the issued hashes, so the print jobs of the batch only send hashes; it returns the timing per server.
+For a server that supports it, enabled with `config.ServerConfig.hash_secondary_files`, secondary files (subtemplates, prepend, append and compare files, attachments) with `Resource.should_hash` set are uploaded once per server as well and sent as their hash afterwards; if the server rejects a hash with `config.ServerConfig.hash_rejected_status`, the print job is sent again with the full files.
+
+Several servers can be combined in a `config.ServerPool`, which can be used wherever a `config.Server` is accepted.
+It balances the requests over its servers (round-robin, least outstanding requests or latency-weighted), takes failing servers out of rotation and fails over to another server when a connection drops.
+
 ### Print job
 `PrintJob` combines template, data, server and an optional output configuration (`config.OutputConfig`) and can execute itself on the Cloud Office Print server. An example using the variables declared above:
 
@@ -57,6 +79,8 @@ printjob.execute()
 ```
 
 A print job can be executed asynchronously as well.
+Asynchronous requests do not block the event loop and do not use worker threads, so many print jobs can be awaited concurrently.
+The informational methods of `config.Server` have `_async` counterparts too (e.g. `config.Server.get_version_cop_async`).
 
 ```python
 import asyncio
@@ -65,6 +89,15 @@ coroutine = printjob.execute_async()
 result = await coroutine
 ```
 
+Print jobs with output polling (`config.OutputConfig` with `output_polling=True`) can be submitted and collected by a `PollingClient`.
+It polls the returned download links with adaptive backoff and yields the outputs as soon as they are ready:
+
+```python
+client = cop.PollingClient(server)
+async for result in client.execute(printjobs):
+    result.result().to_file(f"./output/{result.index}")
+```
+
 ### Full JSON available
 If you already have the JSON to be sent to the server (not just the data, but the entire JSON body including your API key and template), this package will wrap the request to the server for you (requests are made using [requests](https://requests.readthedocs.io/en/master/)).
 ```python
@@ -98,6 +131,8 @@ from .resource import Resource
 from .template import Template
 from .response import Response
 from .transformation import TransformationFunction
+from .polling import PollingClient, PollingHandle
+from .prewarm import PrewarmResult
 
 # specify what is imported on "from cloudofficeprint import *"
 # but that shouldn't really be used anyway
@@ -111,4 +146,7 @@ __all__ = [
     "Template",
     "Response",
     "transformation",
+    "PollingClient",
+    "PollingHandle",
+    "PrewarmResult",
 ]
@@ -10,4 +10,10 @@ from .csv import *
 from .output import *
 from .pdf import *
 from .server import *
+from .server_pool import *
+from .reachability import *
+from .retry import *
+from .metadata import *
+from .hash_store import *
+from .async_transport import *
 from .request_option import *
\ No newline at end of file
@@ -0,0 +1,616 @@
+import asyncio
+import ssl
+from base64 import b64encode
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+from urllib.parse import urlsplit, unquote
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from ..own_utils import json_utils
+
+MAX_LINE_SIZE = 64 * 1024
+"""Maximum size in bytes of the status line, of a header line and of a chunk size line of a response."""
+
+MAX_HEADERS = 100
+"""Maximum number of headers of a response."""
+
+BODY_READ_SIZE = 64 * 1024
+"""Size in bytes of the parts of a request body that are produced at once in a worker thread."""
+
+
+class _Connection:
+    """An open connection to a host, possibly through a proxy."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader: asyncio.StreamReader = reader
+        self.writer: asyncio.StreamWriter = writer
+        self.reused: bool = False
+
+    def close(self):
+        self.writer.close()
+
+
+class AsyncResponse:
+    """Response to a request sent by the `AsyncTransport`.
+
+    It offers the same interface as `requests.Response` for the attributes used in this package
+    (`status_code`, `headers`, `content`, `text`, `json`).
+    The body is read before the response is returned, unless the request was sent with `stream=True`,
+    in which case it can be read with `AsyncResponse.read` or `AsyncResponse.iter_chunks`.
+    """
+
+    def __init__(self,
+                 url: str,
+                 status_code: int,
+                 reason: str,
+                 headers: CaseInsensitiveDict,
+                 body: AsyncIterator[bytes],
+                 release: Callable[[bool], None]):
+        """You should never need to construct an AsyncResponse manually.
+
+        Args:
+            url (str): URL of the request
+            status_code (int): HTTP status code
+            reason (str): HTTP reason phrase
+            headers (CaseInsensitiveDict): response headers
+            body (AsyncIterator[bytes]): iterator over the chunks of the body
+            release (Callable[[bool], None]): called with whether the connection can be reused once the body is read or the response is closed
+        """
+        self.url: str = url
+        self.status_code: int = status_code
+        self.reason: str = reason
+        self.headers: CaseInsensitiveDict = headers
+        self._body: AsyncIterator[bytes] = body
+        self._release: Callable[[bool], None] = release
+        self._content: bytes = None
+
+    @property
+    def content(self) -> bytes:
+        """The body of the response.
+
+        Raises:
+            RuntimeError: the body of a streamed response has not been read yet
+
+        Returns:
+            bytes: the body of the response
+        """
+        if self._content is None:
+            raise RuntimeError("The response body has not been read, use AsyncResponse.read().")
+        return self._content
+
+    @property
+    def text(self) -> str:
+        """The body of the response decoded as text.
+
+        Returns:
+            str: the body of the response as text
+        """
+        encoding = requests.utils.get_encoding_from_headers(self.headers) or "utf-8"
+        return self.content.decode(encoding, errors="replace")
+
+    def json(self):
+        """The body of the response parsed as JSON.
+
+        Returns:
+            the JSON content of the response
+        """
+        return json_utils.loads(self.text)
+
+    async def iter_chunks(self) -> AsyncIterator[bytes]:
+        """Iterate over the body of the response as it is received.
+        The connection is returned to the pool once the body has been read completely.
+
+        Yields:
+            bytes: the next chunk of the body
+        """
+        completed = False
+        try:
+            async for chunk in self._body:
+                yield chunk
+            completed = True
+        finally:
+            self._finish(completed)
+
+    async def read(self) -> bytes:
+        """Read the entire body of the response.
+
+        Returns:
+            bytes: the body of the response
+        """
+        if self._content is None:
+            self._content = b"".join([chunk async for chunk in self.iter_chunks()])
+        return self._content
+
+    def close(self):
+        """Close the response. If the body was not read completely, the connection is closed instead of reused."""
+        self._finish(False)
+
+    def __del__(self):
+        # a streamed response that is dropped without being read or closed still gives back its connection slot
+        self._finish(False)
+
+    def _finish(self, completed: bool):
+        if self._release is not None:
+            release, self._release = self._release, None
+            release(completed)
+
+
+class AsyncTransport:
+    """A non-blocking HTTP/1.1 client for asyncio with a pool of keep-alive connections per host.
+
+    The transport is bound to the event loop it is used on.
+    The number of simultaneous connections per host is bounded, further requests wait for a free connection.
+    A request body given as an iterable of chunks is produced in a worker thread (e.g. while the print job is serialized,
+    compressed or its files are encoded), so producing it does not block the event loop.
+    The timeout of a request applies to every step on its own: connecting, every write of the body and every read of the response,
+    so a large upload on a slow link does not time out while the server keeps accepting it.
+    The proxy for a host is resolved on its first request. Once the transport is used on an event loop, it closes its idle connections
+    when `asyncio.run` cancels the remaining tasks of that loop, before the loop is closed.
+    Errors are raised as `requests.exceptions.ConnectionError` and `requests.exceptions.Timeout`,
+    just like for the requests sent by `Server.session`.
+    """
+
+    def __init__(self,
+                 max_connections_per_host: int = 10,
+                 keep_alive: bool = True,
+                 proxies: Dict[str, str] = None):
+        """
+        Args:
+            max_connections_per_host (int, optional): Maximum number of simultaneous connections per host. Defaults to 10.
+            keep_alive (bool, optional): Whether connections are kept alive and reused between requests. Defaults to True.
+            proxies (Dict[str, str], optional): Proxies [as a dictionary](https://requests.readthedocs.io/en/master/user/advanced/#proxies).
+                Proxies from the environment are used as well. Defaults to None.
+        """
+        self.max_connections_per_host: int = max_connections_per_host
+        self.keep_alive: bool = keep_alive
+        self.proxies: Dict[str, str] = proxies
+        self._idle: Dict[Tuple, List[_Connection]] = {}
+        self._semaphores: Dict[Tuple, asyncio.Semaphore] = {}
+        self._proxies_by_host: Dict[Tuple, Optional[str]] = {}
+        self._ssl_context: ssl.SSLContext = None
+        self._closer: Optional[asyncio.Task] = None
+        self._shut_down: bool = False
+
+    @property
+    def ssl_context(self) -> ssl.SSLContext:
+        """The SSL context used for HTTPS connections, using the same certificate authorities as requests.
+
+        Returns:
+            ssl.SSLContext: the SSL context
+        """
+        if self._ssl_context is None:
+            self._ssl_context = ssl.create_default_context(cafile=requests.certs.where())
+        return self._ssl_context
+
+    async def request(self,
+                      method: str,
+                      url: str,
+                      data: Union[bytes, str, Iterable[bytes], AsyncIterator[bytes]] = None,
+                      headers: Mapping[str, str] = None,
+                      stream: bool = False,
+                      timeout: float = None) -> AsyncResponse:
+        """Send a request.
+
+        Args:
+            method (str): HTTP method
+            url (str): URL to send the request to
+            data (Union[bytes, str, Iterable[bytes], AsyncIterator[bytes]], optional): the request body. Iterables are sent with chunked transfer encoding. Defaults to None.
+            headers (Mapping[str, str], optional): additional request headers. Defaults to None.
+            stream (bool, optional): whether to return before the body of the response is read. Defaults to False.
+            timeout (float, optional): time in seconds to wait for the connection, for each write of the request body,
+                for the response headers and for each chunk of the response body. Defaults to None.
+
+        Raises:
+            requests.exceptions.ConnectionError: the server could not be contacted or closed the connection
+            requests.exceptions.Timeout: the server did not answer in time
+
+        Returns:
+            AsyncResponse: the response
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        proxy = self._select_proxy(url, (parts.scheme, parts.hostname, port))
+        key = (parts.scheme, parts.hostname, port, proxy)
+        self._close_with_loop()
+        semaphore = self._semaphores.get(key)
+        if semaphore is None:
+            semaphore = self._semaphores[key] = asyncio.Semaphore(self.max_connections_per_host)
+        await semaphore.acquire()
+        try:
+            connection, response = await self._send(key, parts, proxy, method, url, data, headers, timeout)
+        except BaseException:
+            semaphore.release()
+            raise
+
+        status_code, reason, response_headers, reusable = response
+
+        def release(completed: bool):
+            if completed and reusable and self.keep_alive and not self._shut_down:
+                connection.reused = True
+                self._idle.setdefault(key, []).append(connection)
+            else:
+                connection.close()
+            semaphore.release()
+
+        result = AsyncResponse(
+            url,
+            status_code,
+            reason,
+            response_headers,
+            self._read_body(connection, method, status_code, response_headers, timeout),
+            release,
+        )
+        if not stream:
+            await result.read()
+        return result
+
+    async def close(self):
+        """Close all idle connections."""
+        closer, self._closer = self._closer, None
+        if closer is not None and closer is not asyncio.current_task():
+            closer.cancel()
+        for connections in self._idle.values():
+            for connection in connections:
+                connection.close()
+        self._idle.clear()
+
+    def _close_with_loop(self):
+        """Close the idle connections once the running event loop shuts down, see `AsyncTransport._close_on_cancel`."""
+        if self._closer is None:
+            self._shut_down = False
+            self._closer = asyncio.get_running_loop().create_task(self._close_on_cancel())
+
+    async def _close_on_cancel(self):
+        """Wait until cancelled, which `asyncio.run` does with all remaining tasks before it closes the loop, and close the transport.
+        Connections that are still in use at that moment are closed when they are released."""
+        try:
+            await asyncio.get_running_loop().create_future()
+        finally:
+            self._shut_down = True
+            await self.close()
+
+    def _select_proxy(self, url: str, host: Tuple) -> Optional[str]:
+        """Select the proxy for a URL from `AsyncTransport.proxies` and the environment, once per host.
+
+        Args:
+            url (str): the URL to send a request to
+            host (Tuple): scheme, host name and port of the URL
+
+        Returns:
+            Optional[str]: the proxy URL or None
+        """
+        if host not in self._proxies_by_host:
+            proxies = dict(requests.utils.get_environ_proxies(url))
+            proxies.update(self.proxies or {})
+            self._proxies_by_host[host] = requests.utils.select_proxy(url, proxies)
+        return self._proxies_by_host[host]
+
+    @staticmethod
+    async def _within(awaitable, timeout: Optional[float], error: type, message: str):
+        """Await a single step of a request within the timeout of the request.
+
+        Args:
+            awaitable: the step
+            timeout (Optional[float]): time in seconds, or None to wait indefinitely
+            error (type): the subclass of `requests.exceptions.Timeout` to raise when the step takes too long
+            message (str): the message of the error
+
+        Returns:
+            the result of the step
+        """
+        if timeout is None:
+            return await awaitable
+        try:
+            return await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError as err:
+            raise error(message) from err
+
+    async def _send(self, key: Tuple, parts, proxy: str, method: str, url: str, data, headers: Mapping[str, str], timeout: Optional[float]):
+        """Send a request on a pooled or new connection and read the response head.
+        A request on a reused connection that was closed by the server in the meantime is sent again on a new connection.
+
+        Returns:
+            Tuple: the connection and (status code, reason, headers, whether the connection can be reused)
+        """
+        idle = self._idle.get(key)
+        while True:
+            connection = idle.pop() if idle else await self._within(
+                self._connect(parts, proxy), timeout, requests.exceptions.ConnectTimeout, f"Could not connect to {url} within {timeout} seconds"
+            )
+            try:
+                await self._write_request(connection, parts, proxy, method, url, data, headers, timeout)
+                return connection, await self._within(
+                    self._read_head(connection), timeout, requests.exceptions.ReadTimeout, f"No response from {url} within {timeout} seconds"
+                )
+            except requests.exceptions.RequestException:
+                # requests' exceptions are OSErrors as well, they are raised as they are
+                connection.close()
+                raise
+            except (OSError, asyncio.IncompleteReadError, _ServerClosedConnection) as err:
+                connection.close()
+                if connection.reused and isinstance(data, (bytes, type(None))):
+                    continue
+                raise requests.exceptions.ConnectionError(f"Connection to {url} failed: {err!r}") from err
+            except _InvalidResponse as err:
+                connection.close()
+                raise requests.exceptions.ConnectionError(f"Invalid response from {url}: {err}") from err
+            except BaseException:
+                # e.g. cancelled by the timeout, or the body could not be produced: the connection is in an unknown state
+                connection.close()
+                raise
+
+    async def _connect(self, parts, proxy: str) -> _Connection:
+        """Open a new connection to the host of a URL, through a proxy if given.
+
+        Returns:
+            _Connection: the new connection
+        """
+        host = parts.hostname
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        connection = None
+        try:
+            if proxy is None:
+                reader, writer = await asyncio.open_connection(
+                    host, port, ssl=self.ssl_context if parts.scheme == "https" else None
+                )
+                return _Connection(reader, writer)
+            proxy_parts = urlsplit(proxy if "://" in proxy else "http://" + proxy)
+            reader, writer = await asyncio.open_connection(
+                proxy_parts.hostname,
+                proxy_parts.port or (443 if proxy_parts.scheme == "https" else 80),
+                ssl=self.ssl_context if proxy_parts.scheme == "https" else None,
+            )
+            connection = _Connection(reader, writer)
+            if parts.scheme == "https":
+                # tunnel through the proxy
+                if not hasattr(writer, "start_tls"):
+                    raise requests.exceptions.ConnectionError(
+                        "HTTPS requests through a proxy need Python 3.11 or higher for asyncio."
+                    )
+                request = f"CONNECT {host}:{port} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+                for name, value in self._proxy_headers(proxy_parts).items():
+                    request += f"{name}: {value}\r\n"
+                writer.write((request + "\r\n").encode("latin-1"))
+                status_code, reason, _, _ = await self._read_head(connection)
+                if status_code != 200:
+                    raise requests.exceptions.ProxyError(f"Proxy refused the tunnel: {status_code} {reason}")
+                await writer.start_tls(self.ssl_context, server_hostname=host)
+            return connection
+        except requests.exceptions.RequestException:
+            if connection is not None:
+                connection.close()
+            raise
+        except (OSError, asyncio.IncompleteReadError, _ServerClosedConnection, _InvalidResponse) as err:
+            if connection is not None:
+                connection.close()
+            raise requests.exceptions.ConnectionError(f"Could not connect to {host}:{port}: {err!r}") from err
+        except BaseException:
+            if connection is not None:
+                connection.close()
+            raise
+
+    @staticmethod
+    def _proxy_headers(proxy_parts) -> Dict[str, str]:
+        """The headers to authenticate with a proxy, if its URL contains credentials."""
+        if proxy_parts.username is None:
+            return {}
+        credentials = f"{unquote(proxy_parts.username)}:{unquote(proxy_parts.password or '')}"
+        return {"Proxy-Authorization": "Basic " + b64encode(credentials.encode("latin-1")).decode("ascii")}
+
+    async def _write_request(self, connection: _Connection, parts, proxy: str, method: str, url: str, data, headers, timeout: Optional[float]):
+        """Write the request line, headers and body to a connection, waiting at most `timeout` seconds for each write to be accepted."""
+        if proxy is not None and parts.scheme == "http":
+            target = url
+        else:
+            target = (parts.path or "/") + ("?" + parts.query if parts.query else "")
+        default_port = 443 if parts.scheme == "https" else 80
+        request_headers = CaseInsensitiveDict({
+            "Host": parts.hostname if parts.port in (None, default_port) else f"{parts.hostname}:{parts.port}",
+            "User-Agent": requests.utils.default_user_agent(),
+            "Accept-Encoding": "identity",
+            "Accept": "*/*",
+            "Connection": "keep-alive" if self.keep_alive else "close",
+        })
+        if proxy is not None and parts.scheme == "http":
+            request_headers.update(self._proxy_headers(urlsplit(proxy if "://" in proxy else "http://" + proxy)))
+        if headers:
+            request_headers.update(headers)
+        chunked = data is not None and not isinstance(data, (bytes, bytearray, memoryview))
+        if chunked:
+            request_headers["Transfer-Encoding"] = "chunked"
+        elif data is not None or method in ("POST", "PUT", "PATCH"):
+            request_headers["Content-Length"] = str(len(data) if data is not None else 0)
+
+        head = f"{method} {target} HTTP/1.1\r\n"
+        for name, value in request_headers.items():
+            head += f"{name}: {value}\r\n"
+        writer = connection.writer
+        writer.write((head + "\r\n").encode("latin-1"))
+        if not chunked:
+            if data:
+                view = memoryview(data)
+                for start in range(0, len(view), BODY_READ_SIZE):
+                    writer.write(view[start:start + BODY_READ_SIZE])
+                    await self._drain(writer, timeout, url)
+            await self._drain(writer, timeout, url)
+            return
+        if hasattr(data, "__aiter__"):
+            async for chunk in data:
+                await self._write_chunk(writer, chunk, timeout, url)
+        else:
+            loop = asyncio.get_running_loop()
+            chunks = iter(data)
+            while True:
+                chunk = await loop.run_in_executor(None, AsyncTransport._read_ahead, chunks, BODY_READ_SIZE)
+                if not chunk:
+                    break
+                await self._write_chunk(writer, chunk, timeout, url)
+        writer.write(b"0\r\n\r\n")
+        await self._drain(writer, timeout, url)
+
+    @staticmethod
+    def _read_ahead(chunks: Iterator[bytes], size: int) -> bytes:
+        """Produce the next part of a request body, called in a worker thread.
+
+        Args:
+            chunks (Iterator[bytes]): the chunks of the body
+            size (int): size in bytes after which no further chunks are produced
+
+        Returns:
+            bytes: the next chunks joined, empty at the end of the body
+        """
+        part = []
+        total = 0
+        for chunk in chunks:
+            part.append(chunk)
+            total += len(chunk)
+            if total >= size:
+                break
+        return b"".join(part)
+
+    @staticmethod
+    async def _write_chunk(writer: asyncio.StreamWriter, chunk: bytes, timeout: Optional[float], url: str):
+        if chunk:
+            writer.write(b"%x\r\n" % len(chunk))
+            writer.write(chunk)
+            writer.write(b"\r\n")
+            await AsyncTransport._drain(writer, timeout, url)
+
+    @staticmethod
+    async def _drain(writer: asyncio.StreamWriter, timeout: Optional[float], url: str):
+        """Wait until the server accepted the data written so far, for at most `timeout` seconds."""
+        await AsyncTransport._within(
+            writer.drain(), timeout, requests.exceptions.Timeout, f"{url} did not accept the request body for {timeout} seconds"
+        )
+
+    @staticmethod
+    async def _read_head(connection: _Connection) -> Tuple[int, str, CaseInsensitiveDict, bool]:
+        """Read the status line and headers of a response, skipping informational (1xx) responses.
+
+        Returns:
+            Tuple[int, str, CaseInsensitiveDict, bool]: status code, reason, headers and whether the connection can be reused
+        """
+        reader = connection.reader
+        while True:
+            status_line = await AsyncTransport._read_line(reader)
+            if not status_line:
+                raise _ServerClosedConnection("The server closed the connection without a response.")
+            version, status_code, reason = (status_line.decode("latin-1").rstrip("\r\n").split(" ", 2) + [""])[:3]
+            try:
+                status_code = int(status_code) if version.startswith("HTTP/") and status_code.isascii() else None
+            except ValueError:
+                status_code = None
+            if status_code is None or not 100 <= status_code < 600:
+                raise _InvalidResponse(f"invalid status line {status_line[:100]!r}")
+            headers = CaseInsensitiveDict()
+            while True:
+                line = await AsyncTransport._read_line(reader)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                if len(headers) >= MAX_HEADERS:
+                    raise _InvalidResponse(f"more than {MAX_HEADERS} headers")
+                name, _, value = line.decode("latin-1").partition(":")
+                name, value = name.strip(), value.strip()
+                headers[name] = headers[name] + ", " + value if name in headers else value
+            if 100 <= status_code < 200 and status_code != 101:
+                continue
+            length = headers.get("Content-Length")
+            if length is not None and not (length.isascii() and length.isdigit()):
+                raise _InvalidResponse(f"invalid Content-Length {length[:100]!r}")
+            connection_header = headers.get("Connection", "").lower()
+            if version == "HTTP/1.0":
+                reusable = connection_header == "keep-alive"
+            else:
+                reusable = connection_header != "close"
+            if "Content-Length" not in headers and "chunked" not in headers.get("Transfer-Encoding", "").lower():
+                # the body ends when the connection is closed
+                reusable = reusable and status_code in (204, 304)
+            return status_code, reason, headers, reusable
+
+    @staticmethod
+    async def _read_line(reader: asyncio.StreamReader) -> bytes:
+        """Read a line of the response head or of the chunked encoding.
+
+        Raises:
+            _InvalidResponse: the line is longer than `MAX_LINE_SIZE`
+
+        Returns:
+            bytes: the line, including its line ending, or empty at the end of the stream
+        """
+        try:
+            line = await reader.readline()
+        except (ValueError, asyncio.LimitOverrunError) as err:
+            raise _InvalidResponse(f"a line exceeds the limit of the stream reader: {err}") from err
+        if len(line) > MAX_LINE_SIZE:
+            raise _InvalidResponse(f"a line exceeds {MAX_LINE_SIZE} bytes")
+        return line
+
+    @staticmethod
+    async def _read_body(connection: _Connection,
+                         method: str,
+                         status_code: int,
+                         headers: CaseInsensitiveDict,
+                         timeout: float,
+                         chunk_size: int = 65536) -> AsyncIterator[bytes]:
+        """Read the body of a response in chunks.
+
+        Yields:
+            bytes: the next chunk of the body
+        """
+        reader = connection.reader
+
+        async def read(coroutine):
+            try:
+                return await asyncio.wait_for(coroutine, timeout)
+            except asyncio.TimeoutError as err:
+                raise requests.exceptions.Timeout(f"The server stopped sending the response for {timeout} seconds") from err
+            except (OSError, asyncio.IncompleteReadError) as err:
+                raise requests.exceptions.ConnectionError(f"The connection broke while reading the response: {err!r}") from err
+            except _InvalidResponse as err:
+                raise requests.exceptions.ConnectionError(f"Invalid response: {err}") from err
+
+        async def read_size():
+            line = await read(AsyncTransport._read_line(reader))
+            try:
+                return int(line.split(b";")[0].strip(), 16)
+            except ValueError as err:
+                raise requests.exceptions.ConnectionError(f"Invalid chunk size {line[:100]!r} in the response") from err
+
+        if method == "HEAD" or status_code in (204, 304):
+            return
+        if "chunked" in headers.get("Transfer-Encoding", "").lower():
+            while True:
+                size = await read_size()
+                if size == 0:
+                    # skip the trailers
+                    while (await read(AsyncTransport._read_line(reader))) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return
+                while size > 0:
+                    chunk = await read(reader.readexactly(min(size, chunk_size)))
+                    size -= len(chunk)
+                    yield chunk
+                await read(AsyncTransport._read_line(reader))
+        elif "Content-Length" in headers:
+            remaining = int(headers["Content-Length"])
+            while remaining > 0:
+                chunk = await read(reader.readexactly(min(remaining, chunk_size)))
+                remaining -= len(chunk)
+                yield chunk
+        else:
+            while True:
+                chunk = await read(reader.read(chunk_size))
+                if not chunk:
+                    return
+                yield chunk
+
+
+class _ServerClosedConnection(Exception):
+    """The server closed a connection before sending a response."""
+
+
+class _InvalidResponse(Exception):
+    """The server sent a response that is not valid HTTP/1.1 or exceeds the limits of the transport."""
@@ -1,4 +1,4 @@
-import json
+from ..own_utils import json_utils
 from typing import Dict, List
 from abc import ABC, abstractmethod
 
@@ -76,7 +76,7 @@ class CloudAccessToken(ABC):
         Returns:
             str: JSON representation for this cloud access token
         """
-        return json.dumps(self.as_dict)
+        return json_utils.dumps(self.as_dict)
 
     @staticmethod
     def is_valid_service(value: str) -> bool:
@@ -1,4 +1,4 @@
-import json
+from ..own_utils import json_utils
 from typing import Dict
 
 class CsvOptions:
@@ -46,7 +46,7 @@ class CsvOptions:
         Returns:
             str: JSON representation of these csv options
         """
-        return json.dumps(self.as_dict)
+        return json_utils.dumps(self.as_dict)
 
     @property
     def as_dict(self) -> Dict:
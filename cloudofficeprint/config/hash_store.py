@@ -0,0 +1,228 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import closing
+from typing import Dict, List, Optional, Tuple
+
+
+class HashStore(ABC):
+    """Store for the hashes that Cloud Office Print servers issue for the files they cache (see `Template.should_hash`).
+
+    A hash is only valid on the server that issued it, so hashes are stored by server URL and by digest of the file content
+    (see `Resource.digest`). A store configured as `ServerConfig.template_hash_store` is consulted when a print job is sent,
+    so a file is uploaded once per server instead of once per `Template` object, and with a persistent store once per server
+    for all processes and across restarts.
+    """
+
+    @abstractmethod
+    def get(self, server_url: str, digest: str) -> Optional[str]:
+        """The hash that a server issued for a file.
+
+        Args:
+            server_url (str): URL of the server
+            digest (str): digest of the file content
+
+        Returns:
+            Optional[str]: the hash, or None if the server did not issue a hash for the file
+        """
+        pass
+
+    @abstractmethod
+    def set(self, server_url: str, digest: str, hashcode: str):
+        """Store the hash that a server issued for a file.
+
+        Args:
+            server_url (str): URL of the server
+            digest (str): digest of the file content
+            hashcode (str): the hash issued by the server
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, server_url: str, digest: str):
+        """Forget the hash that a server issued for a file, e.g. because the server does not know it anymore.
+
+        Args:
+            server_url (str): URL of the server
+            digest (str): digest of the file content
+        """
+        pass
+
+    @abstractmethod
+    def items(self, server_url: str) -> List[Tuple[str, str]]:
+        """All hashes stored for a server.
+
+        Args:
+            server_url (str): URL of the server
+
+        Returns:
+            List[Tuple[str, str]]: the digest of the file content and the hash of every file
+        """
+        pass
+
+    @staticmethod
+    def _server_key(server_url: str) -> str:
+        """The normalized URL of a server, so "http://host/" and "http://host" share their hashes.
+
+        Args:
+            server_url (str): URL of the server
+
+        Returns:
+            str: the normalized URL
+        """
+        return server_url.rstrip("/")
+
+
+class MemoryHashStore(HashStore):
+    """A `HashStore` in memory, shared by all print jobs of a process."""
+
+    def __init__(self):
+        self._hashes: Dict[Tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def get(self, server_url: str, digest: str) -> Optional[str]:
+        return self._hashes.get((HashStore._server_key(server_url), digest))
+
+    def set(self, server_url: str, digest: str, hashcode: str):
+        with self._lock:
+            self._hashes[(HashStore._server_key(server_url), digest)] = hashcode
+
+    def delete(self, server_url: str, digest: str):
+        with self._lock:
+            self._hashes.pop((HashStore._server_key(server_url), digest), None)
+
+    def items(self, server_url: str) -> List[Tuple[str, str]]:
+        server_url = HashStore._server_key(server_url)
+        with self._lock:
+            return [(digest, hashcode) for (url, digest), hashcode in self._hashes.items() if url == server_url]
+
+
+class SQLiteHashStore(HashStore):
+    """A `HashStore` in an SQLite database file, which can be shared by processes on the same machine."""
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        """
+        Args:
+            path (str): path of the database file, which is created if it does not exist
+            timeout (float, optional): time in seconds to wait for a lock held by another process. Defaults to 30.0.
+        """
+        self.path: str = path
+        self.timeout: float = timeout
+        self._execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            "server_url TEXT NOT NULL, digest TEXT NOT NULL, hashcode TEXT NOT NULL, "
+            "PRIMARY KEY (server_url, digest))"
+        )
+
+    def _execute(self, statement: str, parameters: Tuple = ()) -> List[Tuple]:
+        """Execute an SQL statement in its own transaction.
+
+        Args:
+            statement (str): the SQL statement
+            parameters (Tuple, optional): the parameters of the statement. Defaults to ().
+
+        Returns:
+            List[Tuple]: the rows returned by the statement
+        """
+        with closing(sqlite3.connect(self.path, timeout=self.timeout)) as connection:
+            with connection:
+                return connection.execute(statement, parameters).fetchall()
+
+    def get(self, server_url: str, digest: str) -> Optional[str]:
+        rows = self._execute(
+            "SELECT hashcode FROM hashes WHERE server_url = ? AND digest = ?",
+            (HashStore._server_key(server_url), digest),
+        )
+        return rows[0][0] if rows else None
+
+    def set(self, server_url: str, digest: str, hashcode: str):
+        self._execute(
+            "INSERT OR REPLACE INTO hashes (server_url, digest, hashcode) VALUES (?, ?, ?)",
+            (HashStore._server_key(server_url), digest, hashcode),
+        )
+
+    def delete(self, server_url: str, digest: str):
+        self._execute(
+            "DELETE FROM hashes WHERE server_url = ? AND digest = ?",
+            (HashStore._server_key(server_url), digest),
+        )
+
+    def items(self, server_url: str) -> List[Tuple[str, str]]:
+        return self._execute(
+            "SELECT digest, hashcode FROM hashes WHERE server_url = ?",
+            (HashStore._server_key(server_url),),
+        )
+
+
+class DirectoryHashStore(HashStore):
+    """A `HashStore` in a local directory, with one small file per hash.
+
+    Files are replaced atomically, so the directory can be shared by processes and by machines that mount it.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory (str): path of the directory, which is created if it does not exist
+        """
+        self.directory: str = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _server_directory(self, server_url: str) -> str:
+        """The directory holding the hashes of a server.
+
+        Args:
+            server_url (str): URL of the server
+
+        Returns:
+            str: the path of the directory
+        """
+        key = hashlib.sha256(HashStore._server_key(server_url).encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.directory, key)
+
+    def get(self, server_url: str, digest: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self._server_directory(server_url), digest), encoding="ascii") as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def set(self, server_url: str, digest: str, hashcode: str):
+        directory = self._server_directory(server_url)
+        os.makedirs(directory, exist_ok=True)
+        temporary = os.path.join(directory, f".{digest}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(temporary, "w", encoding="ascii") as f:
+            f.write(hashcode)
+        os.replace(temporary, os.path.join(directory, digest))
+
+    def delete(self, server_url: str, digest: str):
+        try:
+            os.remove(os.path.join(self._server_directory(server_url), digest))
+        except FileNotFoundError:
+            pass
+
+    def items(self, server_url: str) -> List[Tuple[str, str]]:
+        directory = self._server_directory(server_url)
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return []
+        result = []
+        for digest in names:
+            if digest.startswith("."):
+                continue
+            hashcode = self.get(server_url, digest)
+            if hashcode is not None:
+                result.append((digest, hashcode))
+        return result
@@ -0,0 +1,149 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from ..own_utils import json_utils
+
+VERSION_PATH = "version"
+"""Path of the version of Cloud Office Print, which invalidates all other metadata of a server when it changes."""
+
+METADATA_PATHS = (
+    VERSION_PATH,
+    "soffice",
+    "officetopdf",
+    "supported_template_mimetypes",
+    "supported_prepend_mimetypes",
+    "supported_append_mimetypes",
+)
+"""Paths of the metadata that is fetched when the metadata cache of a server is warmed up."""
+
+
+class MetadataCache:
+    """Cache for the answers of a Cloud Office Print server to requests for its versions and supported mime types.
+
+    Entries expire `MetadataCache.ttl` seconds after they were fetched.
+    When the version of Cloud Office Print changes, all other entries are dropped, since the server was upgraded.
+    With a `MetadataCache.path`, the entries are stored in a JSON file, shared with other processes and kept across restarts.
+    The file can hold the metadata of several servers, stored by URL.
+    """
+
+    def __init__(self, url: str, ttl: float = 300.0, path: str = None):
+        """
+        Args:
+            url (str): URL of the server whose metadata is cached
+            ttl (float, optional): Time in seconds during which an entry is valid. 0 disables the cache. Defaults to 300.0.
+            path (str, optional): Path of the JSON file in which the entries are stored. Defaults to None (in memory only).
+        """
+        self.url: str = url
+        self.ttl: float = ttl
+        self.path: str = path
+        self._entries: Dict[str, Tuple[float, str]] = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether metadata is cached at all.
+
+        Returns:
+            bool: whether `MetadataCache.ttl` is positive
+        """
+        return self.ttl > 0
+
+    def get(self, path: str) -> Optional[str]:
+        """The cached answer of the server for a path, if it did not expire.
+
+        Args:
+            path (str): the requested path, relative to the URL of the server, including its query string
+
+        Returns:
+            Optional[str]: the answer of the server, or None if it is not cached
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._load().get(path)
+            if entry is not None and time.time() - entry[0] < self.ttl:
+                return entry[1]
+            return None
+
+    def update(self, answers: Dict[str, str]):
+        """Store answers of the server.
+        If they contain a version of Cloud Office Print that differs from the cached version, the other cached entries are dropped first.
+
+        Args:
+            answers (Dict[str, str]): the answers by path
+        """
+        if not self.enabled or not answers:
+            return
+        now = time.time()
+        with self._lock:
+            entries = self._load()
+            version = answers.get(VERSION_PATH)
+            if version is not None and VERSION_PATH in entries and entries[VERSION_PATH][1] != version:
+                logging.debug("Cloud Office Print at %s changed version, dropping its cached metadata", self.url)
+                entries.clear()
+            for path, answer in answers.items():
+                entries[path] = (now, answer)
+            self._save()
+
+    def clear(self):
+        """Drop all cached entries, including the ones stored in the file."""
+        with self._lock:
+            self._entries = {}
+            self._save()
+
+    def _load(self) -> Dict[str, Tuple[float, str]]:
+        """The cached entries, read from the file the first time.
+
+        Returns:
+            Dict[str, Tuple[float, str]]: the time at which each answer was fetched and the answer, by path
+        """
+        if self._entries is None:
+            self._entries = {}
+            if self.path is not None:
+                stored = MetadataCache._read(self.path).get(self.url, {})
+                self._entries = {path: tuple(entry) for path, entry in stored.items()}
+        return self._entries
+
+    def _save(self):
+        """Write the entries of this server to the file, keeping the entries of other servers."""
+        if self.path is None:
+            return
+        stored = MetadataCache._read(self.path)
+        stored[self.url] = self._entries
+        temporary = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporary, "wb") as f:
+                f.write(json_utils.dumps_bytes(stored))
+            # atomic, so other processes never read a partially written file
+            os.replace(temporary, self.path)
+        except OSError as err:
+            logging.debug("Could not store the metadata cache in %s: %s", self.path, err)
+
+    @staticmethod
+    def _read(path: str) -> Dict:
+        """Read a metadata cache file.
+
+        Args:
+            path (str): path of the file
+
+        Returns:
+            Dict: the stored entries by server URL, empty if the file does not exist or is invalid
+        """
+        try:
+            with open(path, "rb") as f:
+                stored = json_utils.loads(f.read())
+        except (OSError, ValueError):
+            return {}
+        return stored if isinstance(stored, dict) else {}
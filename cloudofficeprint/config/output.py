@@ -1,4 +1,4 @@
-import json
+from ..own_utils import json_utils
 from typing import Dict
 from .cloud import CloudAccessToken
 from .pdf import PDFOptions
@@ -72,7 +72,7 @@ class OutputConfig:
         Returns:
             str: JSON representation of this output config
         """
-        return json.dumps(self.as_dict)
+        return json_utils.dumps(self.as_dict)
 
     @property
     def as_dict(self) -> Dict:
@@ -1,7 +1,7 @@
-import json
+from ..own_utils import json_utils
 from typing import Union, Dict, Mapping
 
-from ..resource import Base64Resource, ServerPathResource, URLResource
+from ..resource import Base64Resource, Resource, ServerPathResource, URLResource
 
 
 class PDFOptions:
@@ -67,7 +67,7 @@ class PDFOptions:
             landscape (bool, optional): Only for HTML to PDF. If True: the orientation of the output file is landscape; else portrait (default). Defaults to None.
             page_format (str, optional): Only for HTML to PDF. The page format: "a4" (default) or "letter". Defaults to None.
             merge (bool, optional): If True: instead of returning back a zip file for multiple output, merge it. Defaults to None.
-            sign_certificate (str, optional): Signing certificate for the output PDF (pkcs #12 .p12/.pfx) as a base64 string, URL, FTP location or a server path. The function read_file_as_base64() from file_utils.py can be used to read local .p12 or .pfx file as base64. Defaults to None.
+            sign_certificate (str, optional): Signing certificate for the output PDF (pkcs #12 .p12/.pfx) as a base64 string, URL, FTP location or a server path. `PDFOptions.sign` reads a local .p12 or .pfx file as base64. Defaults to None.
             sign_certificate_password (str, optional): If you are signing with a password protected certificate, you can specify the password as a plain string. Defaults to None.
             identify_form_fields (bool, optional): Identify the form fields in a PDF-form by filling the name of each field into the respective field. Defaults to None.
             split (bool, optional): You can specify to split a PDF in separate files. You will get one file per page in a zip file. Defaults to None.
@@ -136,7 +136,7 @@ class PDFOptions:
         Returns:
             str: JSON representation of these PDF options
         """
-        return json.dumps(self.as_dict)
+        return json_utils.dumps(self.as_dict)
 
     @property
     def as_dict(self) -> Dict:
@@ -295,14 +295,17 @@ class PDFOptions:
 
     def sign(
         self,
-        certificate: Union[Base64Resource, ServerPathResource, URLResource],
+        certificate: Union[Base64Resource, ServerPathResource, URLResource, str],
         password: str = None,
     ):
         """Sign the output PDF with a certificate file.
 
         Args:
-            certificate (str): Resource of the certificate file.
+            certificate (Union[Base64Resource, ServerPathResource, URLResource, str]): Resource of the certificate file, or the path to a local certificate file,
+                which is encoded once for all print jobs signed with it (see `own_utils.EncodingCache`).
             password (str): password of the certificate. Defaults to None.
         """
+        if isinstance(certificate, str):
+            certificate = Resource.from_local_file(certificate)
         self.sign_certificate = certificate.data
         self.sign_certificate_password = password
@@ -0,0 +1,162 @@
+import threading
+import time
+from typing import Callable, Dict
+
+
+class CircuitBreaker:
+    """Keeps track of the reachability of a Cloud Office Print server.
+
+    The state is updated passively from the outcome of the real requests to the server:
+    - closed: the server is reachable. A successful request is trusted for `CircuitBreaker.reachable_ttl` seconds,
+        so no separate reachability check is needed during that time.
+    - open: `CircuitBreaker.failure_threshold` consecutive requests failed. Requests fail fast without contacting the server.
+    - half-open: `CircuitBreaker.recovery_timeout` seconds after opening, a single trial request is let through (or a probe is started).
+        Other requests keep failing fast until the trial succeeds (closed) or fails (open again).
+        A trial that records no outcome within `CircuitBreaker.recovery_timeout` seconds is replaced by a new one.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self,
+                 failure_threshold: int = 3,
+                 recovery_timeout: float = 5.0,
+                 reachable_ttl: float = 30.0):
+        """
+        Args:
+            failure_threshold (int, optional): Number of consecutive failed requests after which the circuit opens. Defaults to 3.
+            recovery_timeout (float, optional): Time in seconds after which an open circuit probes the server again. Defaults to 5.0.
+            reachable_ttl (float, optional): Time in seconds during which a successful request proves the server is reachable. Defaults to 30.0.
+        """
+        self.failure_threshold: int = failure_threshold
+        self.recovery_timeout: float = recovery_timeout
+        self.reachable_ttl: float = reachable_ttl
+        self._state: str = CircuitBreaker.CLOSED
+        self._failures: int = 0
+        self._last_success: float = None
+        self._opened_at: float = None
+        self._trial_at: float = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """The current state of the circuit: `CircuitBreaker.CLOSED`, `CircuitBreaker.OPEN` or `CircuitBreaker.HALF_OPEN`.
+
+        Returns:
+            str: the current state of the circuit
+        """
+        return self._state
+
+    @property
+    def is_known_reachable(self) -> bool:
+        """Whether a request succeeded less than `CircuitBreaker.reachable_ttl` seconds ago and the circuit is closed.
+
+        Returns:
+            bool: whether the server is known to be reachable
+        """
+        with self._lock:
+            return (
+                self._state == CircuitBreaker.CLOSED
+                and self._last_success is not None
+                and time.monotonic() - self._last_success < self.reachable_ttl
+            )
+
+    @property
+    def is_available(self) -> bool:
+        """Whether `CircuitBreaker.allow_request` would let a request through, read without changing the state of the circuit:
+        the circuit is closed, or the recovery timeout has passed and no trial is in progress.
+
+        Returns:
+            bool: whether a request to the server may be attempted
+        """
+        with self._lock:
+            if self._state == CircuitBreaker.CLOSED:
+                return True
+            now = time.monotonic()
+            if self._state == CircuitBreaker.OPEN:
+                return now - self._opened_at >= self.recovery_timeout
+            return self._trial_at is None or now - self._trial_at >= self.recovery_timeout
+
+    def record_success(self):
+        """Record that the server answered a request. This closes the circuit."""
+        with self._lock:
+            self._state = CircuitBreaker.CLOSED
+            self._failures = 0
+            self._last_success = time.monotonic()
+            self._trial_at = None
+
+    def record_failure(self):
+        """Record that a request to the server failed. This opens the circuit after `CircuitBreaker.failure_threshold` consecutive failures."""
+        with self._lock:
+            self._failures += 1
+            self._last_success = None
+            if self._state == CircuitBreaker.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = CircuitBreaker.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_at = None
+
+    def allow_request(self, probe: Callable[[], None] = None) -> bool:
+        """Check whether a request to the server should be attempted.
+
+        When the circuit is open and the recovery timeout has passed, the circuit becomes half-open and one trial is allowed:
+        without `probe`, the request of the caller is the trial and True is returned;
+        with `probe`, the probe is started in a background thread as the trial and the caller fails fast.
+        The trial is expected to record its outcome with `CircuitBreaker.record_success` or `CircuitBreaker.record_failure`.
+
+        Args:
+            probe (Callable[[], None], optional): function contacting the server in the background. Defaults to None.
+
+        Returns:
+            bool: True if the circuit is closed or the request is the trial, False if the request should fail fast
+        """
+        with self._lock:
+            if self._state == CircuitBreaker.CLOSED:
+                return True
+            now = time.monotonic()
+            if self._state == CircuitBreaker.OPEN:
+                if now - self._opened_at < self.recovery_timeout:
+                    return False
+            elif self._trial_at is not None and now - self._trial_at < self.recovery_timeout:
+                # a trial is in progress
+                return False
+            self._state = CircuitBreaker.HALF_OPEN
+            self._trial_at = now
+            if probe is None:
+                return True
+            threading.Thread(target=self._probe, args=(probe,), daemon=True).start()
+            return False
+
+    def _probe(self, probe: Callable[[], None]):
+        """Run `probe`, reopening the circuit if it did not record an outcome.
+
+        Args:
+            probe (Callable[[], None]): function contacting the server
+        """
+        try:
+            probe()
+        except Exception:
+            pass
+        with self._lock:
+            if self._state == CircuitBreaker.HALF_OPEN:
+                self._state = CircuitBreaker.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_at = None
+
+    def reset(self):
+        """Forget all recorded outcomes and close the circuit."""
+        with self._lock:
+            self._state = CircuitBreaker.CLOSED
+            self._failures = 0
+            self._last_success = None
+            self._opened_at = None
+            self._trial_at = None
@@ -0,0 +1,145 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+from tempfile import SpooledTemporaryFile
+from typing import Iterable, Iterator, Optional, Tuple, Type
+
+import requests
+
+
+class RetryPolicy:
+    """Policy for retrying requests to a Cloud Office Print server that failed because of a transient error.
+
+    A request is retried when it raises one of `RetryPolicy.retry_on_exceptions` or when the server answers with one of `RetryPolicy.retry_on_status`.
+    The delay before retry n (starting at 0) is `backoff_factor * 2 ** n` seconds, capped at `max_backoff`.
+    With jitter, a random delay between 0 and that value is used, so many clients do not retry in lockstep.
+    A Retry-After header sent by the server is respected if it fits within the caps.
+    No retry is started that would end after `total_timeout` seconds have passed since the first attempt.
+    """
+
+    def __init__(self,
+                 max_attempts: int = 4,
+                 backoff_factor: float = 0.5,
+                 max_backoff: float = 10.0,
+                 jitter: bool = True,
+                 total_timeout: float = 60.0,
+                 retry_on_status: Iterable[int] = (502, 503, 504),
+                 retry_on_exceptions: Tuple[Type[Exception], ...] = (
+                     requests.exceptions.ConnectionError,
+                     requests.exceptions.Timeout,
+                 )):
+        """
+        Args:
+            max_attempts (int, optional): Maximum number of attempts, including the first one. Defaults to 4.
+            backoff_factor (float, optional): Delay in seconds before the first retry, doubled for every next retry. Defaults to 0.5.
+            max_backoff (float, optional): Maximum delay in seconds between two attempts. Defaults to 10.0.
+            jitter (bool, optional): Whether to use a random delay between 0 and the exponential backoff ("full jitter"). Defaults to True.
+            total_timeout (float, optional): Maximum time in seconds spent on all attempts together. Defaults to 60.0.
+            retry_on_status (Iterable[int], optional): HTTP status codes that are retried. Defaults to (502, 503, 504).
+            retry_on_exceptions (Tuple[Type[Exception], ...], optional): Exceptions that are retried.
+                Defaults to the connection errors and timeouts of the requests package, which are also raised by the asynchronous transport.
+        """
+        self.max_attempts: int = max_attempts
+        self.backoff_factor: float = backoff_factor
+        self.max_backoff: float = max_backoff
+        self.jitter: bool = jitter
+        self.total_timeout: float = total_timeout
+        self.retry_on_status: frozenset = frozenset(retry_on_status)
+        self.retry_on_exceptions: Tuple[Type[Exception], ...] = tuple(retry_on_exceptions)
+
+    def backoff(self, attempt: int, retry_after: str = None) -> float:
+        """The delay before the next attempt.
+
+        Args:
+            attempt (int): number of the attempt that failed, starting at 0
+            retry_after (str, optional): value of the Retry-After header of the failed response. Defaults to None.
+
+        Returns:
+            float: the delay in seconds
+        """
+        server_delay = _parse_retry_after(retry_after)
+        if server_delay is not None:
+            return min(server_delay, self.max_backoff)
+        delay = min(self.backoff_factor * 2 ** attempt, self.max_backoff)
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def next_delay(self, attempt: int, started: float, retry_after: str = None) -> Optional[float]:
+        """The delay before the next attempt, or None if the request should not be retried anymore.
+
+        Args:
+            attempt (int): number of the attempt that failed, starting at 0
+            started (float): `time.monotonic()` at the start of the first attempt
+            retry_after (str, optional): value of the Retry-After header of the failed response. Defaults to None.
+
+        Returns:
+            Optional[float]: the delay in seconds, or None
+        """
+        if attempt + 1 >= self.max_attempts:
+            return None
+        delay = self.backoff(attempt, retry_after)
+        if time.monotonic() + delay - started > self.total_timeout:
+            return None
+        return delay
+
+
+def _parse_retry_after(value: str) -> Optional[float]:
+    """Parse the value of a Retry-After header.
+
+    Args:
+        value (str): a number of seconds or an HTTP date
+
+    Returns:
+        Optional[float]: the delay in seconds, or None if there is no valid value
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class ReplayableBody:
+    """A request body given as an iterator of chunks that can be sent more than once.
+
+    The chunks are recorded in a spooled temporary file while they are sent for the first time.
+    When the body is iterated again, e.g. for a retry, the remaining chunks are recorded first and then the recording is sent,
+    so the body is encoded only once.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], spool_threshold: int, chunk_size: int = 64 * 1024):
+        """
+        Args:
+            chunks (Iterable[bytes]): the chunks of the body
+            spool_threshold (int): size in bytes above which the recording is stored in a temporary file instead of in memory
+            chunk_size (int, optional): size in bytes of the chunks in which the recording is sent. Defaults to 64 KiB.
+        """
+        self._chunks: Iterator[bytes] = iter(chunks)
+        self._spool = SpooledTemporaryFile(max_size=spool_threshold)
+        self._chunk_size: int = chunk_size
+        self._started: bool = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        if not self._started:
+            self._started = True
+            for chunk in self._chunks:
+                self._spool.write(chunk)
+                yield chunk
+            return
+        for chunk in self._chunks:
+            self._spool.write(chunk)
+        self._spool.seek(0)
+        while True:
+            chunk = self._spool.read(self._chunk_size)
+            if not chunk:
+                break
+            yield chunk
+        self._spool.seek(0, 2)
+
+    def close(self):
+        """Release the memory or temporary file holding the recorded body."""
+        self._spool.close()
@@ -1,8 +1,23 @@
+import asyncio
+import itertools
 import logging
+import threading
+import time
+import weakref
 import requests
-from typing import Mapping, Dict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Mapping, Dict, Iterable, List, Tuple, Union
 from urllib.parse import urljoin, urlparse
-import json
+
+from ..own_utils import file_utils, json_utils
+from .async_transport import AsyncResponse, AsyncTransport
+from .hash_store import HashStore, MemoryHashStore
+from .metadata import METADATA_PATHS, MetadataCache
+from .reachability import CircuitBreaker
+from .retry import ReplayableBody, RetryPolicy
+
+GATEWAY_ERRORS = (502, 503, 504)
 
 
 class Printer:
@@ -158,6 +173,24 @@ class ServerConfig:
         commands: Commands = None,
         proxies: Dict[str, str] = None,
         cop_remote_debug: bool = False,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        keep_alive: bool = True,
+        reachability_ttl: float = 30.0,
+        failure_threshold: int = 3,
+        recovery_timeout: float = 5.0,
+        spool_threshold: int = 16 * 1024 * 1024,
+        chunked_requests: bool = True,
+        compression: str = None,
+        compression_threshold: int = 8 * 1024,
+        compression_level: int = 6,
+        retry_policy: RetryPolicy = None,
+        max_payload_size: int = None,
+        metadata_ttl: float = 300.0,
+        metadata_cache_path: str = None,
+        template_hash_store: HashStore = None,
+        hash_secondary_files: bool = False,
+        hash_rejected_status: int = 410,
     ):
         """
         Args:
@@ -167,6 +200,32 @@ class ServerConfig:
             commands (Commands, optional): Configuration for the various command hooks offered. Defaults to None.
             proxies (Dict[str, str], optional): Proxies for contacting the server URL, [as a dictionary](https://requests.readthedocs.io/en/master/user/advanced/#proxies). Defaults to None.
             cop_remote_debug (bool, optional): If True: The Cloud Office Print server will log the JSON into the database and this can bee seen when logged into cloudofficeprint.com. Defaults to False.
+            pool_connections (int, optional): Number of per-host connection pools kept by the `Server`'s HTTP session. Defaults to 10.
+            pool_maxsize (int, optional): Maximum number of connections kept open per host, i.e. the maximum number of concurrent requests that reuse a connection. Defaults to 10.
+            keep_alive (bool, optional): Whether connections to the server are kept alive and reused between requests. Defaults to True.
+            reachability_ttl (float, optional): Time in seconds during which the server is considered reachable after it answered a request, without checking again. 0 checks before every request. Defaults to 30.0.
+            failure_threshold (int, optional): Number of consecutive failed requests after which requests to the server fail fast. Defaults to 3.
+            recovery_timeout (float, optional): Time in seconds after which one request is let through to check whether a server that failed is back. Defaults to 5.0.
+            spool_threshold (int, optional): Size in bytes above which the output of a print job is stored in a temporary file instead of in memory. Defaults to 16 MiB.
+            chunked_requests (bool, optional): Whether the JSON body of a print job is serialized incrementally while it is sent with chunked transfer encoding,
+                instead of being built completely in memory first. Defaults to True.
+            compression (str, optional): Content encoding used to compress the bodies of print jobs. Only "gzip" is supported. Defaults to None (no compression).
+            compression_threshold (int, optional): Size in bytes below which request bodies are sent uncompressed. Defaults to 8 KiB.
+            compression_level (int, optional): Compression level from 1 (fastest) to 9 (smallest). Defaults to 6.
+            retry_policy (RetryPolicy, optional): Policy for retrying requests that failed because of a transient error. Defaults to None (no retries).
+            max_payload_size (int, optional): Size in bytes of the largest (uncompressed) request body to send to the server.
+                A print job with a `Mapping` of files as data that exceeds it is split into smaller print jobs that are executed in parallel (see `PrintJob.execute`).
+                Defaults to None (no limit).
+            metadata_ttl (float, optional): Time in seconds during which the versions and supported mime types of the server are cached (see `Server.warm_metadata`).
+                0 disables the cache. Defaults to 300.0.
+            metadata_cache_path (str, optional): Path of a JSON file in which the cached metadata is stored, to share it between processes and keep it across restarts.
+                Defaults to None (in memory only).
+            template_hash_store (HashStore, optional): Store for the hashes the server issues for templates with `Template.should_hash`,
+                shared by all templates with the same content (see `HashStore`). Defaults to None (the hash is only kept on the `Template`).
+            hash_secondary_files (bool, optional): Whether secondary files with `Resource.should_hash` are sent as their MD5 hash once the server cached them.
+                Only enable this for a server that accepts files with `"file_source": "hash"`. Defaults to False (secondary files are always sent in full).
+            hash_rejected_status (int, optional): HTTP status code with which the server rejects the hash of a file or template it no longer caches;
+                a print job rejected with it is sent again with the full files. Defaults to 410.
         """
         self.api_key: str = api_key
         self.logging: dict = dict(logging) if logging else None
@@ -174,6 +233,26 @@ class ServerConfig:
         self.printer: Printer = printer
         self.commands: Commands = commands
         self.cop_remote_debug: bool = cop_remote_debug
+        self.pool_connections: int = pool_connections
+        self.pool_maxsize: int = pool_maxsize
+        self.keep_alive: bool = keep_alive
+        self.reachability_ttl: float = reachability_ttl
+        self.failure_threshold: int = failure_threshold
+        self.recovery_timeout: float = recovery_timeout
+        self.spool_threshold: int = spool_threshold
+        self.chunked_requests: bool = chunked_requests
+        if compression not in (None, "gzip"):
+            raise ValueError(f'Unsupported compression "{compression}", only "gzip" is supported')
+        self.compression: str = compression
+        self.compression_threshold: int = compression_threshold
+        self.compression_level: int = compression_level
+        self.retry_policy: RetryPolicy = retry_policy
+        self.max_payload_size: int = max_payload_size
+        self.metadata_ttl: float = metadata_ttl
+        self.metadata_cache_path: str = metadata_cache_path
+        self.template_hash_store: HashStore = template_hash_store
+        self.hash_secondary_files: bool = hash_secondary_files
+        self.hash_rejected_status: int = hash_rejected_status
 
     @property
     def as_dict(self) -> Dict:
@@ -199,7 +278,20 @@ class ServerConfig:
 
 
 class Server:
-    """This config class is used to specify the Cloud Office Print server to interact with."""
+    """This config class is used to specify the Cloud Office Print server to interact with.
+
+    A `Server` owns a pooled HTTP session, so consecutive requests (print jobs as well as the informational requests below)
+    reuse open keep-alive connections instead of setting up a new TCP/TLS connection each time.
+    The session is safe to share between threads; the pool is configured through `ServerConfig`.
+    For asyncio, every method has an `_async` counterpart that uses a non-blocking `AsyncTransport` with its own pool per event loop.
+
+    The outcome of every request is recorded in `Server.circuit_breaker`.
+    While the server is known to be reachable, print jobs are sent without a separate reachability check,
+    and while it is known to be down, they fail fast.
+
+    The versions and supported mime types of the server are cached in `Server.metadata_cache` for `ServerConfig.metadata_ttl` seconds.
+    The first time one of them is requested, all of them are fetched in one concurrent sweep.
+    """
 
     def __init__(self, url: str, config: ServerConfig = None):
         """
@@ -209,6 +301,18 @@ class Server:
         """
         self.url = url
         self.config: ServerConfig = config
+        self._session: requests.Session = None
+        self._session_lock = threading.Lock()
+        self._metadata_lock = threading.Lock()
+        self._async_transports = weakref.WeakKeyDictionary()
+        # the secondary files this server cached, for print jobs without `ServerConfig.template_hash_store`
+        self._file_hashes: HashStore = MemoryHashStore()
+        config = config if config is not None else ServerConfig()
+        self.circuit_breaker: CircuitBreaker = CircuitBreaker(
+            config.failure_threshold,
+            config.recovery_timeout,
+            config.reachability_ttl,
+        )
 
     @property
     def url(self) -> str:
@@ -231,6 +335,357 @@ class Server:
             logging.warning(f'No scheme found in "{value}", assuming "{self._url}".')
         else:
             self._url = value
+        self._metadata_cache = None
+        self._metadata_warmed_at: float = None
+
+    @property
+    def metadata_cache(self) -> MetadataCache:
+        """The cache of the versions and supported mime types of this server, configured through `ServerConfig`.
+
+        Returns:
+            MetadataCache: the metadata cache
+        """
+        if self._metadata_cache is None:
+            config = self.config if self.config is not None else ServerConfig()
+            self._metadata_cache = MetadataCache(self.url, config.metadata_ttl, config.metadata_cache_path)
+        return self._metadata_cache
+
+    @property
+    def _proxies(self) -> Dict[str, str]:
+        """The proxies from the server configuration, if any.
+
+        Returns:
+            Dict[str, str]: the proxies to use for contacting the server
+        """
+        return self.config.proxies if self.config is not None else None
+
+    @property
+    def session(self) -> requests.Session:
+        """The pooled HTTP session used for all requests to this server.
+
+        The session is created on first use from the pool options in `Server.config`.
+        Changing those options afterwards has no effect until `Server.close` is called.
+
+        Returns:
+            requests.Session: the HTTP session of this server
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+
+    def _create_session(self) -> requests.Session:
+        """Create a new HTTP session with a connection pool configured from `Server.config`.
+
+        Returns:
+            requests.Session: the new HTTP session
+        """
+        config = self.config if self.config is not None else ServerConfig()
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=config.pool_connections,
+            pool_maxsize=config.pool_maxsize,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if not config.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    @property
+    def async_transport(self) -> AsyncTransport:
+        """The non-blocking HTTP transport used for all asynchronous requests to this server from the running event loop.
+
+        Every event loop gets its own transport, configured from the pool options in `Server.config`.
+        A transport closes its connections when its event loop shuts down, and is dropped once the loop is closed.
+
+        Returns:
+            AsyncTransport: the asynchronous HTTP transport of this server for the running event loop
+        """
+        loop = asyncio.get_running_loop()
+        with self._session_lock:
+            for closed in [other for other in self._async_transports if other.is_closed()]:
+                del self._async_transports[closed]
+            transport = self._async_transports.get(loop)
+            if transport is None:
+                config = self.config if self.config is not None else ServerConfig()
+                transport = AsyncTransport(
+                    config.pool_maxsize,
+                    config.keep_alive,
+                    config.proxies,
+                )
+                self._async_transports[loop] = transport
+        return transport
+
+    def close(self):
+        """Close the HTTP session of this server and all of its pooled connections.
+
+        The server can still be used afterwards, a new session is created when needed.
+        """
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    async def aclose(self):
+        """Close the pooled connections of the asynchronous transport for the running event loop."""
+        with self._session_lock:
+            transport = self._async_transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.close()
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        # the session, the transports and the locks belong to this process, they are created again when needed
+        for name in ("_session", "_session_lock", "_metadata_lock", "_async_transports"):
+            del state[name]
+        return state
+
+    def __setstate__(self, state: Dict):
+        self.__dict__.update(state)
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._metadata_lock = threading.Lock()
+        self._async_transports = weakref.WeakKeyDictionary()
+        # the time of the last sweep is only meaningful in the process that measured it
+        self._metadata_warmed_at = None
+
+    def __enter__(self) -> "Server":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _request(self, method: str, path: str = "", **kwargs) -> requests.Response:
+        """Send a request to the server through the pooled session, retrying it as configured by `ServerConfig.retry_policy`.
+
+        A body given as an iterator of chunks is recorded while it is sent, so a retry sends the same encoded body again.
+
+        Args:
+            method (str): HTTP method
+            path (str, optional): path relative to `Server.url`. Defaults to "".
+            **kwargs: additional arguments for `requests.Session.request`
+
+        Returns:
+            requests.Response: the response of the server
+        """
+        policy = self.config.retry_policy if self.config else None
+        if policy is None:
+            return self._send(method, path, **kwargs)
+        kwargs = self._replayable(kwargs)
+        started = time.monotonic()
+        try:
+            for attempt in itertools.count():
+                try:
+                    response = self._send(method, path, **kwargs)
+                except policy.retry_on_exceptions:
+                    delay = policy.next_delay(attempt, started)
+                    if delay is None:
+                        raise
+                else:
+                    if response.status_code not in policy.retry_on_status:
+                        return response
+                    delay = policy.next_delay(attempt, started, response.headers.get("Retry-After"))
+                    if delay is None:
+                        return response
+                    response.close()
+                logging.debug("Retrying %s request to %s in %.2f seconds", method, self.url, delay)
+                time.sleep(delay)
+        finally:
+            if isinstance(kwargs.get("data"), ReplayableBody):
+                kwargs["data"].close()
+
+    def _replayable(self, kwargs: Dict) -> Dict:
+        """Make the body in the request arguments `kwargs` replayable for retries.
+
+        Args:
+            kwargs (Dict): arguments for `Server._request` or `Server._request_async`
+
+        Returns:
+            Dict: the arguments with a `ReplayableBody` if the body is an iterator of chunks
+        """
+        data = kwargs.get("data")
+        if data is None or isinstance(data, (str, bytes, bytearray, memoryview, ReplayableBody)) or hasattr(data, "__aiter__"):
+            return kwargs
+        config = self.config if self.config is not None else ServerConfig()
+        return {**kwargs, "data": ReplayableBody(data, config.spool_threshold)}
+
+    def _send(self, method: str, path: str = "", **kwargs) -> requests.Response:
+        """Send a single request to the server through the pooled session.
+
+        The outcome is recorded in `Server.circuit_breaker`: a connection error, a timeout or a gateway error (502, 503, 504) is a failure,
+        any other response means the server is reachable.
+
+        Args:
+            method (str): HTTP method
+            path (str, optional): path relative to `Server.url`. Defaults to "".
+            **kwargs: additional arguments for `requests.Session.request`
+
+        Returns:
+            requests.Response: the response of the server
+        """
+        kwargs.setdefault("proxies", self._proxies)
+        try:
+            response = self.session.request(method, urljoin(self.url, path), **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            self.circuit_breaker.record_failure()
+            raise
+        if response.status_code in GATEWAY_ERRORS:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+        return response
+
+    def _get(self, path: str, **kwargs) -> requests.Response:
+        """Send a GET request to the server through the pooled session.
+
+        Args:
+            path (str): path relative to `Server.url`
+            **kwargs: additional arguments for `requests.Session.request`
+
+        Returns:
+            requests.Response: the response of the server
+        """
+        return self._request("GET", path, **kwargs)
+
+    def _post(self, **kwargs) -> requests.Response:
+        """Send a POST request to `Server.url` through the pooled session.
+
+        Args:
+            **kwargs: additional arguments for `requests.Session.request`
+
+        Returns:
+            requests.Response: the response of the server
+        """
+        return self._request("POST", **self._compress(kwargs))
+
+    async def _request_async(self, method: str, path: str = "", **kwargs) -> AsyncResponse:
+        """Async version of `Server._request`, sending the request through `Server.async_transport`.
+
+        Args:
+            method (str): HTTP method
+            path (str, optional): path relative to `Server.url`. Defaults to "".
+            **kwargs: additional arguments for `AsyncTransport.request`
+
+        Returns:
+            AsyncResponse: the response of the server
+        """
+        policy = self.config.retry_policy if self.config else None
+        if policy is None:
+            return await self._send_async(method, path, **kwargs)
+        kwargs = self._replayable(kwargs)
+        started = time.monotonic()
+        try:
+            for attempt in itertools.count():
+                try:
+                    response = await self._send_async(method, path, **kwargs)
+                except policy.retry_on_exceptions:
+                    delay = policy.next_delay(attempt, started)
+                    if delay is None:
+                        raise
+                else:
+                    if response.status_code not in policy.retry_on_status:
+                        return response
+                    delay = policy.next_delay(attempt, started, response.headers.get("Retry-After"))
+                    if delay is None:
+                        return response
+                    response.close()
+                logging.debug("Retrying %s request to %s in %.2f seconds", method, self.url, delay)
+                await asyncio.sleep(delay)
+        finally:
+            if isinstance(kwargs.get("data"), ReplayableBody):
+                kwargs["data"].close()
+
+    async def _send_async(self, method: str, path: str = "", **kwargs) -> AsyncResponse:
+        """Async version of `Server._send`.
+
+        Args:
+            method (str): HTTP method
+            path (str, optional): path relative to `Server.url`. Defaults to "".
+            **kwargs: additional arguments for `AsyncTransport.request`
+
+        Returns:
+            AsyncResponse: the response of the server
+        """
+        try:
+            response = await self.async_transport.request(method, urljoin(self.url, path), **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            self.circuit_breaker.record_failure()
+            raise
+        if response.status_code in GATEWAY_ERRORS:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+        return response
+
+    async def _get_async(self, path: str, **kwargs) -> AsyncResponse:
+        """Async version of `Server._get`.
+
+        Args:
+            path (str): path relative to `Server.url`
+            **kwargs: additional arguments for `AsyncTransport.request`
+
+        Returns:
+            AsyncResponse: the response of the server
+        """
+        return await self._request_async("GET", path, **kwargs)
+
+    async def _post_async(self, **kwargs) -> AsyncResponse:
+        """Async version of `Server._post`.
+
+        Args:
+            **kwargs: additional arguments for `AsyncTransport.request`
+
+        Returns:
+            AsyncResponse: the response of the server
+        """
+        if self.config is not None and self.config.compression is not None:
+            # reading ahead and compressing the start of the body blocks, so it is done in a worker thread
+            kwargs = await asyncio.get_running_loop().run_in_executor(None, self._compress, kwargs)
+        return await self._request_async("POST", **kwargs)
+
+    def _compress(self, kwargs: Dict) -> Dict:
+        """Compress the body in the request arguments `kwargs` as configured by `ServerConfig.compression`.
+
+        A body smaller than `ServerConfig.compression_threshold` is left uncompressed.
+        For a body given as an iterator of chunks, only the chunks up to the threshold are read ahead
+        and the remaining chunks are compressed while they are sent.
+
+        Args:
+            kwargs (Dict): arguments for `Server._request` or `Server._request_async`
+
+        Returns:
+            Dict: the arguments with the compressed body and a Content-Encoding header
+        """
+        data = kwargs.get("data")
+        if self.config is None or self.config.compression is None or data is None or hasattr(data, "__aiter__"):
+            return kwargs
+        threshold = self.config.compression_threshold
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            if len(data) < threshold:
+                return kwargs
+            chunks = [data]
+        else:
+            chunks = iter(data)
+            head = []
+            size = 0
+            for chunk in chunks:
+                head.append(chunk)
+                size += len(chunk)
+                if size >= threshold:
+                    break
+            else:
+                return {**kwargs, "data": b"".join(head)}
+            chunks = itertools.chain(head, chunks)
+        body = file_utils.gzip_chunks(chunks, self.config.compression_level)
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            body = b"".join(body)
+        headers = dict(kwargs.get("headers") or {})
+        headers["Content-Encoding"] = self.config.compression
+        return {**kwargs, "data": body, "headers": headers}
 
     def is_reachable(self) -> bool:
         """Contact the server to see if it is reachable.
@@ -239,13 +694,38 @@ class Server:
             bool: whether the server at `Server.url` is reachable
         """
         try:
-            r = requests.get(
-                urljoin(self.url, "marco"),
-                proxies=self.config.proxies if self.config is not None else None,
-            )
-            return r.text == "polo"
+            r = self._get("marco")
+        except requests.exceptions.ConnectionError:
+            return False
+        return self._check_marco(r)
+
+    async def is_reachable_async(self) -> bool:
+        """Async version of `Server.is_reachable`.
+
+        Returns:
+            bool: whether the server at `Server.url` is reachable
+        """
+        try:
+            r = await self._get_async("marco")
         except requests.exceptions.ConnectionError:
             return False
+        return self._check_marco(r)
+
+    def _check_marco(self, r: Union[requests.Response, AsyncResponse]) -> bool:
+        """Check whether a response to server-url/marco comes from a reachable Cloud Office Print server.
+
+        Args:
+            r (Union[requests.Response, AsyncResponse]): the response to server-url/marco
+
+        Returns:
+            bool: whether the server is reachable
+        """
+        if r.status_code != 200 or r.text != "polo":
+            if r.status_code not in GATEWAY_ERRORS:
+                # the request itself was recorded as a success
+                self.circuit_breaker.record_failure()
+            return False
+        return True
 
     def is_ipp_printer_reachable(self) -> bool:
         """Check the status of ipp-printer,if the location and version of ipp-printer is provided.
@@ -257,7 +737,7 @@ class Server:
             ipp_printer_check_url = self.url + \
                 ('/'if(self.url[-1] != '/') else '')+'ipp_check?ipp_url=' + \
                 self.config.printer.location+'&version='+self.config.printer.version
-            response = requests.get(ipp_printer_check_url)
+            response = self._request("GET", ipp_printer_check_url)
             return response.json()['statusCode'] == "successful-ok"
         except:
             return False
@@ -265,23 +745,153 @@ class Server:
     def _raise_if_unreachable(self):
         """Raise a connection error if the server is unreachable.
 
+        No request is sent if the server answered a request less than `ServerConfig.reachability_ttl` seconds ago.
+        If the server is known to be down, the error is raised immediately, until `ServerConfig.recovery_timeout` has passed:
+        then one caller checks the server again as the trial of `Server.circuit_breaker`.
+
         Raises:
             ConnectionError: raise error if server is unreachable
         """
+        if self.circuit_breaker.is_known_reachable:
+            return
+        if not self.circuit_breaker.allow_request():
+            raise ConnectionError(
+                f"Could not reach server at {self.url} (circuit {self.circuit_breaker.state})"
+            )
         if not self.is_reachable():
             raise ConnectionError(f"Could not reach server at {self.url}")
 
+    async def _raise_if_unreachable_async(self):
+        """Async version of `Server._raise_if_unreachable`.
+
+        Raises:
+            ConnectionError: raise error if server is unreachable
+        """
+        if self.circuit_breaker.is_known_reachable:
+            return
+        if not self.circuit_breaker.allow_request():
+            raise ConnectionError(
+                f"Could not reach server at {self.url} (circuit {self.circuit_breaker.state})"
+            )
+        if not await self.is_reachable_async():
+            raise ConnectionError(f"Could not reach server at {self.url}")
+
+    def warm_metadata(self):
+        """Fetch the versions and supported mime types of the server concurrently and store them in `Server.metadata_cache`.
+        This happens automatically the first time one of them is requested. Requests that fail are not cached.
+
+        Raises:
+            ConnectionError: raise error if server is unreachable
+        """
+        if not self.metadata_cache.enabled:
+            self._metadata_warmed_at = time.monotonic()
+            return
+        self._raise_if_unreachable()
+
+        def get(path: str) -> Union[requests.Response, requests.exceptions.RequestException]:
+            try:
+                return self._get(path)
+            except requests.exceptions.RequestException as err:
+                return err
+
+        workers = min(len(METADATA_PATHS), self.config.pool_maxsize if self.config is not None else 10)
+        with ThreadPoolExecutor(workers) as executor:
+            responses = list(executor.map(get, METADATA_PATHS))
+        self._store_metadata(zip(METADATA_PATHS, responses))
+        self._metadata_warmed_at = time.monotonic()
+
+    async def warm_metadata_async(self):
+        """Async version of `Server.warm_metadata`.
+
+        Raises:
+            ConnectionError: raise error if server is unreachable
+        """
+        self._metadata_warmed_at = time.monotonic()
+        if not self.metadata_cache.enabled:
+            return
+        await self._raise_if_unreachable_async()
+        responses = await asyncio.gather(
+            *(self._get_async(path) for path in METADATA_PATHS),
+            return_exceptions=True,
+        )
+        self._store_metadata(zip(METADATA_PATHS, responses))
+
+    def _store_metadata(self, responses: Iterable[Tuple[str, Union[requests.Response, AsyncResponse, BaseException]]]):
+        """Store the successful answers of the server to metadata requests in `Server.metadata_cache`.
+
+        Args:
+            responses (Iterable[Tuple[str, Union[requests.Response, AsyncResponse, BaseException]]]): the response or error for each path
+        """
+        answers = {}
+        for path, response in responses:
+            if isinstance(response, BaseException):
+                logging.debug("Could not fetch %s from %s: %s", path, self.url, response)
+            elif response.status_code == 200:
+                answers[path] = response.text
+        self.metadata_cache.update(answers)
+
+    @property
+    def _metadata_expired(self) -> bool:
+        """Whether the metadata cache should be warmed up again, because it never was or its last sweep is older than `ServerConfig.metadata_ttl`.
+
+        Returns:
+            bool: whether a metadata path that is not cached is fetched in a new sweep
+        """
+        return self._metadata_warmed_at is None or time.monotonic() - self._metadata_warmed_at >= self.metadata_cache.ttl
+
+    def _metadata(self, path: str) -> str:
+        """The answer of the server to a metadata request, from `Server.metadata_cache` if possible.
+        A path that is not cached after the last sweep expired starts a new sweep of all `METADATA_PATHS` (see `Server.warm_metadata`) first,
+        which also fetches the version, so a version change drops all other entries before any answer is stored.
+
+        Args:
+            path (str): the path relative to `Server.url`, including its query string
+
+        Returns:
+            str: the answer of the server
+        """
+        answer = self.metadata_cache.get(path)
+        if answer is None and self._metadata_expired:
+            with self._metadata_lock:
+                if self._metadata_expired:
+                    self.warm_metadata()
+            answer = self.metadata_cache.get(path)
+        if answer is None:
+            self._raise_if_unreachable()
+            response = self._get(path)
+            answer = response.text
+            if response.status_code == 200:
+                self.metadata_cache.update({path: answer})
+        return answer
+
+    async def _metadata_async(self, path: str) -> str:
+        """Async version of `Server._metadata`.
+
+        Args:
+            path (str): the path relative to `Server.url`, including its query string
+
+        Returns:
+            str: the answer of the server
+        """
+        answer = self.metadata_cache.get(path)
+        if answer is None and self._metadata_expired:
+            await self.warm_metadata_async()
+            answer = self.metadata_cache.get(path)
+        if answer is None:
+            await self._raise_if_unreachable_async()
+            response = await self._get_async(path)
+            answer = response.text
+            if response.status_code == 200:
+                self.metadata_cache.update({path: answer})
+        return answer
+
     def get_version_soffice(self) -> str:
         """Sends a GET request to server-url/soffice.
 
         Returns:
             str: current version of Libreoffice installed on the server.
         """
-        self._raise_if_unreachable()
-        return requests.get(
-            urljoin(self.url, "soffice"),
-            proxies=self.config.proxies if self.config is not None else None,
-        ).text
+        return self._metadata("soffice")
 
     def get_version_officetopdf(self) -> str:
         """Sends a GET request to server-url/officetopdf.
@@ -289,11 +899,7 @@ class Server:
         Returns:
             str: current version of OfficeToPdf installed on the server. (Only available if the server runs in Windows environment).
         """
-        self._raise_if_unreachable()
-        return requests.get(
-            urljoin(self.url, "officetopdf"),
-            proxies=self.config.proxies if self.config is not None else None,
-        ).text
+        return self._metadata("officetopdf")
 
     def get_supported_template_mimetypes(self) -> Dict:
         """Sends a GET request to server-url/supported_template_mimetypes.
@@ -301,13 +907,7 @@ class Server:
         Returns:
             Dict: JSON of the mime types of templates that Cloud Office Print supports.
         """
-        self._raise_if_unreachable()
-        return json.loads(
-            requests.get(
-                urljoin(self.url, "supported_template_mimetypes"),
-                proxies=self.config.proxies if self.config is not None else None,
-            ).text
-        )
+        return json_utils.loads(self._metadata("supported_template_mimetypes"))
 
     def get_supported_output_mimetypes(self, input_type: str) -> Dict:
         """Sends a GET request to server-url/supported_output_mimetypes?template=input_type.
@@ -319,15 +919,7 @@ class Server:
         Returns:
             Dict: JSON of the supported output types for the given template extension.
         """
-        self._raise_if_unreachable()
-        return json.loads(
-            requests.get(
-                urljoin(
-                    self.url, "supported_output_mimetypes" + f"?template={input_type}"
-                ),
-                proxies=self.config.proxies if self.config is not None else None,
-            ).text
-        )
+        return json_utils.loads(self._metadata(f"supported_output_mimetypes?template={input_type}"))
 
     def get_supported_prepend_mimetypes(self) -> Dict:
         """Sends a GET request to server-url/supported_prepend_mimetypes.
@@ -335,13 +927,7 @@ class Server:
         Returns:
             Dict: JSON of the supported prepend file mime types.
         """
-        self._raise_if_unreachable()
-        return json.loads(
-            requests.get(
-                urljoin(self.url, "supported_prepend_mimetypes"),
-                proxies=self.config.proxies if self.config is not None else None,
-            ).text
-        )
+        return json_utils.loads(self._metadata("supported_prepend_mimetypes"))
 
     def get_supported_append_mimetypes(self) -> Dict:
         """Sends a GET request to server-url/supported_append_mimetypes.
@@ -349,13 +935,7 @@ class Server:
         Returns:
             Dict: JSON of the supported append file mime types.
         """
-        self._raise_if_unreachable()
-        return json.loads(
-            requests.get(
-                urljoin(self.url, "supported_append_mimetypes"),
-                proxies=self.config.proxies if self.config is not None else None,
-            ).text
-        )
+        return json_utils.loads(self._metadata("supported_append_mimetypes"))
 
     def verify_template_hash(self, hashcode: str) -> bool:
         """Sends a GET request to server-url/verify_template_hash?hash=hashcode.
@@ -367,24 +947,101 @@ class Server:
             bool: whether the hash is valid and present in cache.
         """
         self._raise_if_unreachable()
-        return json.loads(
-            requests.get(
-                urljoin(self.url, "verify_template_hash" + f"?hash={hashcode}"),
-                proxies=self.config.proxies if self.config is not None else None,
-            ).text
+        return json_utils.loads(
+            self._get("verify_template_hash" + f"?hash={hashcode}").text
         )["valid"]
 
+    def revalidate_template_hashes(self, store: HashStore = None) -> int:
+        """Check all hashes stored for this server with `Server.verify_template_hash` and remove the ones the server does not know anymore,
+        e.g. after a restart of the server. The hashes are checked concurrently.
+        A hash that cannot be checked because of a connection error is kept.
+
+        Args:
+            store (HashStore, optional): the store to revalidate. Defaults to `ServerConfig.template_hash_store`.
+
+        Returns:
+            int: the number of hashes that were removed
+        """
+        store = self._template_hash_store(store)
+        entries = store.items(self.url)
+        if not entries:
+            return 0
+        self._raise_if_unreachable()
+
+        def verify(hashcode: str) -> bool:
+            try:
+                return self.verify_template_hash(hashcode)
+            except (requests.exceptions.RequestException, ConnectionError):
+                return True
+
+        workers = min(len(entries), self.config.pool_maxsize if self.config is not None else 10)
+        with ThreadPoolExecutor(workers) as executor:
+            valid = list(executor.map(verify, [hashcode for _, hashcode in entries]))
+        return self._remove_invalid_hashes(store, entries, valid)
+
+    async def revalidate_template_hashes_async(self, store: HashStore = None) -> int:
+        """Async version of `Server.revalidate_template_hashes`.
+
+        Args:
+            store (HashStore, optional): the store to revalidate. Defaults to `ServerConfig.template_hash_store`.
+
+        Returns:
+            int: the number of hashes that were removed
+        """
+        store = self._template_hash_store(store)
+        entries = store.items(self.url)
+        if not entries:
+            return 0
+        await self._raise_if_unreachable_async()
+        valid = await asyncio.gather(
+            *(self.verify_template_hash_async(hashcode) for _, hashcode in entries),
+            return_exceptions=True,
+        )
+        return self._remove_invalid_hashes(store, entries, [result is not False for result in valid])
+
+    def _template_hash_store(self, store: HashStore = None) -> HashStore:
+        """The given hash store, or the one configured for this server.
+
+        Args:
+            store (HashStore, optional): the given hash store. Defaults to None.
+
+        Raises:
+            ValueError: if no hash store is given or configured
+
+        Returns:
+            HashStore: the hash store
+        """
+        if store is None and self.config is not None:
+            store = self.config.template_hash_store
+        if store is None:
+            raise ValueError(f"No template hash store configured for the server at {self.url}")
+        return store
+
+    def _remove_invalid_hashes(self, store: HashStore, entries: List[Tuple[str, str]], valid: List[bool]) -> int:
+        """Remove the hashes that the server did not recognize from a hash store.
+
+        Args:
+            store (HashStore): the hash store
+            entries (List[Tuple[str, str]]): the checked digests and hashes
+            valid (List[bool]): whether each hash is still valid
+
+        Returns:
+            int: the number of hashes that were removed
+        """
+        removed = 0
+        for (digest, _), is_valid in zip(entries, valid):
+            if not is_valid:
+                store.delete(self.url, digest)
+                removed += 1
+        return removed
+
     def get_version_cop(self) -> str:
         """Sends a GET request to server-url/version.
 
         Returns:
             str: the version of Cloud Office Print that the server runs.
         """
-        self._raise_if_unreachable()
-        return requests.get(
-            urljoin(self.url, "version"),
-            proxies=self.config.proxies if self.config is not None else None,
-        ).text
+        return self._metadata("version")
 
     def check_ipp(self, ipp_url: str, version: str) -> Dict:
         """Sends a GET request to server-url/ipp_check?ipp_url=ipp_url&version=version.
@@ -397,11 +1054,94 @@ class Server:
             Dict: the status of the IPP printer.
         """
         self._raise_if_unreachable()
-        return json.loads(
-            requests.get(
-                urljoin(
-                    self.url, "ipp_check" + f"?ipp_url={ipp_url}&version={version}"
-                ),
-                proxies=self.config.proxies if self.config is not None else None,
-            ).text
+        return json_utils.loads(
+            self._get("ipp_check" + f"?ipp_url={ipp_url}&version={version}").text
+        )
+
+    async def get_version_soffice_async(self) -> str:
+        """Async version of `Server.get_version_soffice`.
+
+        Returns:
+            str: current version of Libreoffice installed on the server.
+        """
+        return await self._metadata_async("soffice")
+
+    async def get_version_officetopdf_async(self) -> str:
+        """Async version of `Server.get_version_officetopdf`.
+
+        Returns:
+            str: current version of OfficeToPdf installed on the server. (Only available if the server runs in Windows environment).
+        """
+        return await self._metadata_async("officetopdf")
+
+    async def get_supported_template_mimetypes_async(self) -> Dict:
+        """Async version of `Server.get_supported_template_mimetypes`.
+
+        Returns:
+            Dict: JSON of the mime types of templates that Cloud Office Print supports.
+        """
+        return json_utils.loads(await self._metadata_async("supported_template_mimetypes"))
+
+    async def get_supported_output_mimetypes_async(self, input_type: str) -> Dict:
+        """Async version of `Server.get_supported_output_mimetypes`.
+
+        Args:
+            input_type (str): extension of file
+
+        Returns:
+            Dict: JSON of the supported output types for the given template extension.
+        """
+        return json_utils.loads(await self._metadata_async(f"supported_output_mimetypes?template={input_type}"))
+
+    async def get_supported_prepend_mimetypes_async(self) -> Dict:
+        """Async version of `Server.get_supported_prepend_mimetypes`.
+
+        Returns:
+            Dict: JSON of the supported prepend file mime types.
+        """
+        return json_utils.loads(await self._metadata_async("supported_prepend_mimetypes"))
+
+    async def get_supported_append_mimetypes_async(self) -> Dict:
+        """Async version of `Server.get_supported_append_mimetypes`.
+
+        Returns:
+            Dict: JSON of the supported append file mime types.
+        """
+        return json_utils.loads(await self._metadata_async("supported_append_mimetypes"))
+
+    async def verify_template_hash_async(self, hashcode: str) -> bool:
+        """Async version of `Server.verify_template_hash`.
+
+        Args:
+            hashcode (str): md5 hash of file
+
+        Returns:
+            bool: whether the hash is valid and present in cache.
+        """
+        await self._raise_if_unreachable_async()
+        return json_utils.loads(
+            (await self._get_async("verify_template_hash" + f"?hash={hashcode}")).text
+        )["valid"]
+
+    async def get_version_cop_async(self) -> str:
+        """Async version of `Server.get_version_cop`.
+
+        Returns:
+            str: the version of Cloud Office Print that the server runs.
+        """
+        return await self._metadata_async("version")
+
+    async def check_ipp_async(self, ipp_url: str, version: str) -> Dict:
+        """Async version of `Server.check_ipp`.
+
+        Args:
+            ippURL (str): the URL of the IPP printer.
+            version (str): the version of the IPP printer.
+
+        Returns:
+            Dict: the status of the IPP printer.
+        """
+        await self._raise_if_unreachable_async()
+        return json_utils.loads(
+            (await self._get_async("ipp_check" + f"?ipp_url={ipp_url}&version={version}")).text
         )
@@ -0,0 +1,386 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Union
+
+import requests
+
+from .async_transport import AsyncResponse
+from .hash_store import HashStore
+from .metadata import MetadataCache
+from .server import Server, ServerConfig
+
+
+class ServerPool(Server):
+    """A pool of Cloud Office Print servers that can be used anywhere a `Server` is accepted.
+
+    Every request is sent to one of the servers in the pool, selected by the strategy of the pool:
+    - `ServerPool.ROUND_ROBIN`: the servers take turns.
+    - `ServerPool.LEAST_OUTSTANDING`: the server with the fewest requests in progress, to spread concurrent print jobs.
+    - `ServerPool.LATENCY_WEIGHTED`: a random server, weighted by the inverse of its recent response time.
+
+    The servers keep their own `Server.circuit_breaker`, so a server that keeps failing is taken out of rotation.
+    Selecting a server only reads the state of the circuit breakers: after `ServerConfig.recovery_timeout` seconds,
+    the next request selected for a server that was taken out of rotation is sent to it as the trial of its circuit breaker.
+    If a server drops the connection before it responds, the request is sent to another server of the pool.
+
+    `ServerPool.url` identifies the pool, it is not the URL of any of its servers.
+    The versions and supported mime types are those of the first available server of the pool and are cached per server,
+    in the `Server.metadata_cache` of that server.
+
+    The `ServerConfig` of the pool is used for the print jobs (e.g. the API key in `ServerConfig.api_key`),
+    the configuration of each server for the connections to that server.
+    Template hashes are only valid on the server that issued them, so a template is only sent as a hash to a pool
+    if every server of the pool issued that hash (see `Template.prewarm`), otherwise it is sent in full.
+    """
+
+    ROUND_ROBIN = "round_robin"
+    LEAST_OUTSTANDING = "least_outstanding"
+    LATENCY_WEIGHTED = "latency_weighted"
+
+    def __init__(self,
+                 servers: Iterable[Union[Server, str]],
+                 config: ServerConfig = None,
+                 strategy: str = ROUND_ROBIN,
+                 latency_decay: float = 0.3):
+        """
+        Args:
+            servers (Iterable[Union[Server, str]]): The servers in the pool, or their URLs. A server given as URL is configured with `config`.
+            config (ServerConfig, optional): Server configuration of the pool. Defaults to None.
+            strategy (str, optional): `ServerPool.ROUND_ROBIN`, `ServerPool.LEAST_OUTSTANDING` or `ServerPool.LATENCY_WEIGHTED`. Defaults to `ServerPool.ROUND_ROBIN`.
+            latency_decay (float, optional): Weight of the latest response time in the moving average of the response time of a server. Defaults to 0.3.
+
+        Raises:
+            ValueError: if the pool is empty or the strategy is unknown
+        """
+        self.servers: List[Server] = [
+            server if isinstance(server, Server) else Server(server, config)
+            for server in servers
+        ]
+        if not self.servers:
+            raise ValueError("A ServerPool needs at least one server")
+        if strategy not in (ServerPool.ROUND_ROBIN, ServerPool.LEAST_OUTSTANDING, ServerPool.LATENCY_WEIGHTED):
+            raise ValueError(f'Unknown strategy "{strategy}"')
+        # the pool has no URL of its own, so nothing is ever sent to or cached for one of its servers by mistake
+        super().__init__("serverpool:" + ",".join(server.url for server in self.servers), config)
+        self.strategy: str = strategy
+        self.latency_decay: float = latency_decay
+        self._lock = threading.Lock()
+        self._next: int = 0
+        self._outstanding: Dict[Server, int] = {server: 0 for server in self.servers}
+        self._latency: Dict[Server, float] = {}
+
+    def __getstate__(self) -> Dict:
+        state = super().__getstate__()
+        del state["_lock"]
+        # a copy has no requests in progress
+        state["_outstanding"] = {server: 0 for server in self.servers}
+        return state
+
+    def __setstate__(self, state: Dict):
+        super().__setstate__(state)
+        self._lock = threading.Lock()
+
+    @property
+    def healthy_servers(self) -> List[Server]:
+        """The servers that are not taken out of rotation by their circuit breaker (see `CircuitBreaker.is_available`).
+        Reading them does not change the state of the circuit breakers.
+
+        Returns:
+            List[Server]: the healthy servers
+        """
+        return [server for server in self.servers if server.circuit_breaker.is_available]
+
+    def outstanding(self, server: Server) -> int:
+        """The number of requests in progress on a server of the pool.
+
+        Args:
+            server (Server): a server of the pool
+
+        Returns:
+            int: the number of requests that were sent to the server and are waiting for a response
+        """
+        return self._outstanding[server]
+
+    def latency(self, server: Server) -> float:
+        """The moving average of the response time of a server of the pool.
+
+        Args:
+            server (Server): a server of the pool
+
+        Returns:
+            float: the response time in seconds, or None if the server did not respond yet
+        """
+        return self._latency.get(server)
+
+    def _select(self, exclude: List[Server]) -> Server:
+        """Select the server for the next request.
+
+        Args:
+            exclude (List[Server]): servers that already failed for this request
+
+        Raises:
+            requests.exceptions.ConnectionError: if no healthy server is left
+
+        Returns:
+            Server: the selected server
+        """
+        exclude = list(exclude)
+        while True:
+            candidates = [server for server in self.healthy_servers if server not in exclude]
+            if not candidates:
+                raise requests.exceptions.ConnectionError(f"No reachable server in the pool {self.url}")
+            with self._lock:
+                # candidates in round-robin order, starting after the last selected server
+                count = len(self.servers)
+                candidates.sort(key=lambda server: (self.servers.index(server) - self._next) % count)
+                if self.strategy == ServerPool.LEAST_OUTSTANDING:
+                    server = min(candidates, key=self._outstanding.get)
+                elif self.strategy == ServerPool.LATENCY_WEIGHTED:
+                    known = [self._latency[server] for server in candidates if server in self._latency]
+                    # servers without a measurement get the best known response time, so they are tried soon
+                    best = min(known) if known else 1.0
+                    weights = [1 / max(self._latency.get(server, best), 1e-6) for server in candidates]
+                    server = random.choices(candidates, weights)[0]
+                else:
+                    server = candidates[0]
+            # a server that is out of rotation only gets the request as the trial of its circuit breaker,
+            # which another request may have claimed since the circuit breakers were read
+            if server.circuit_breaker.allow_request():
+                break
+            exclude.append(server)
+        with self._lock:
+            self._next = self.servers.index(server) + 1
+            self._outstanding[server] += 1
+        return server
+
+    def _release(self, server: Server, latency: float = None):
+        """Record that a request to a server of the pool finished.
+
+        Args:
+            server (Server): the server the request was sent to
+            latency (float, optional): the response time in seconds, if the server responded. Defaults to None.
+        """
+        with self._lock:
+            self._outstanding[server] -= 1
+            if latency is not None:
+                previous = self._latency.get(server)
+                self._latency[server] = latency if previous is None else (
+                    previous + self.latency_decay * (latency - previous)
+                )
+
+    def _send(self, method: str, path: str = "", **kwargs) -> requests.Response:
+        """Send a single request to a server of the pool, failing over to another server if the connection fails.
+
+        Args:
+            method (str): HTTP method
+            path (str, optional): path relative to the URL of the server. Defaults to "".
+            **kwargs: additional arguments for `requests.Session.request`
+
+        Returns:
+            requests.Response: the response of the server
+        """
+        original = kwargs.get("data")
+        kwargs = self._replayable(kwargs)
+        failed = []
+        try:
+            while True:
+                server = self._select(failed)
+                started = time.monotonic()
+                try:
+                    response = server._send(method, path, **kwargs)
+                except requests.exceptions.ConnectionError:
+                    self._release(server)
+                    failed.append(server)
+                    if len(failed) == len(self.servers):
+                        raise
+                    logging.debug("Server %s failed, failing over to another server of the pool", server.url)
+                    continue
+                except BaseException:
+                    self._release(server)
+                    raise
+                self._release(server, time.monotonic() - started)
+                return response
+        finally:
+            if kwargs.get("data") is not original:
+                kwargs["data"].close()
+
+    async def _send_async(self, method: str, path: str = "", **kwargs) -> AsyncResponse:
+        """Async version of `ServerPool._send`.
+
+        Args:
+            method (str): HTTP method
+            path (str, optional): path relative to the URL of the server. Defaults to "".
+            **kwargs: additional arguments for `AsyncTransport.request`
+
+        Returns:
+            AsyncResponse: the response of the server
+        """
+        original = kwargs.get("data")
+        kwargs = self._replayable(kwargs)
+        failed = []
+        try:
+            while True:
+                server = self._select(failed)
+                started = time.monotonic()
+                try:
+                    response = await server._send_async(method, path, **kwargs)
+                except requests.exceptions.ConnectionError:
+                    self._release(server)
+                    failed.append(server)
+                    if len(failed) == len(self.servers):
+                        raise
+                    logging.debug("Server %s failed, failing over to another server of the pool", server.url)
+                    continue
+                except BaseException:
+                    self._release(server)
+                    raise
+                self._release(server, time.monotonic() - started)
+                return response
+        finally:
+            if kwargs.get("data") is not original:
+                kwargs["data"].close()
+
+    def is_reachable(self) -> bool:
+        """Contact the servers of the pool to see if any of them is reachable.
+
+        Returns:
+            bool: whether a server of the pool is reachable
+        """
+        return any(server.is_reachable() for server in self.servers)
+
+    async def is_reachable_async(self) -> bool:
+        """Async version of `ServerPool.is_reachable`.
+
+        Returns:
+            bool: whether a server of the pool is reachable
+        """
+        return any(await asyncio.gather(*(server.is_reachable_async() for server in self.servers)))
+
+    def _raise_if_unreachable(self):
+        """Raise a connection error if no server of the pool is reachable.
+
+        Raises:
+            ConnectionError: raise error if all servers are unreachable
+        """
+        if any(server.circuit_breaker.is_known_reachable for server in self.servers):
+            return
+        for server in self.healthy_servers:
+            try:
+                server._raise_if_unreachable()
+                return
+            except ConnectionError:
+                pass
+        raise ConnectionError(f"Could not reach any server in the pool {self.url}")
+
+    async def _raise_if_unreachable_async(self):
+        """Async version of `ServerPool._raise_if_unreachable`.
+
+        Raises:
+            ConnectionError: raise error if all servers are unreachable
+        """
+        if any(server.circuit_breaker.is_known_reachable for server in self.servers):
+            return
+        for server in self.healthy_servers:
+            try:
+                await server._raise_if_unreachable_async()
+                return
+            except ConnectionError:
+                pass
+        raise ConnectionError(f"Could not reach any server in the pool {self.url}")
+
+    def _server_for(self, url: str) -> Optional[Server]:
+        """The server of the pool that a request to a URL was sent to, e.g. the URL of a response.
+
+        Args:
+            url (str): absolute URL of a request
+
+        Returns:
+            Optional[Server]: the server with the longest URL that the URL starts with, or None if it is not one of the servers of the pool
+        """
+        url = url if url.endswith("/") else url + "/"
+        matches = [server for server in self.servers if url.startswith(server.url if server.url.endswith("/") else server.url + "/")]
+        return max(matches, key=lambda server: len(server.url), default=None)
+
+    def _metadata_server(self) -> Server:
+        """The server of the pool whose versions and supported mime types are those of the pool.
+
+        Returns:
+            Server: the first healthy server of the pool, or the first server if none is healthy
+        """
+        return next(iter(self.healthy_servers), self.servers[0])
+
+    @property
+    def metadata_cache(self) -> MetadataCache:
+        """The metadata cache of the server whose versions and supported mime types are those of the pool.
+
+        Returns:
+            MetadataCache: the metadata cache
+        """
+        return self._metadata_server().metadata_cache
+
+    def warm_metadata(self):
+        """Fetch the versions and supported mime types of the first available server of the pool, see `Server.warm_metadata`.
+
+        Raises:
+            ConnectionError: raise error if the server is unreachable
+        """
+        self._metadata_server().warm_metadata()
+
+    async def warm_metadata_async(self):
+        """Async version of `ServerPool.warm_metadata`.
+
+        Raises:
+            ConnectionError: raise error if the server is unreachable
+        """
+        await self._metadata_server().warm_metadata_async()
+
+    def _metadata(self, path: str) -> str:
+        return self._metadata_server()._metadata(path)
+
+    async def _metadata_async(self, path: str) -> str:
+        return await self._metadata_server()._metadata_async(path)
+
+    def is_ipp_printer_reachable(self) -> bool:
+        """Check the status of the ipp-printer through the healthy servers of the pool.
+
+        Returns:
+            bool: whether a server of the pool reaches the ipp-printer
+        """
+        return any(server.is_ipp_printer_reachable() for server in self.healthy_servers)
+
+    def revalidate_template_hashes(self, store: HashStore = None) -> int:
+        """Revalidate the stored template hashes of every server of the pool, see `Server.revalidate_template_hashes`.
+
+        Args:
+            store (HashStore, optional): the store to revalidate. Defaults to `ServerConfig.template_hash_store` of each server.
+
+        Returns:
+            int: the number of hashes that were removed
+        """
+        return sum(server.revalidate_template_hashes(store) for server in self.servers)
+
+    async def revalidate_template_hashes_async(self, store: HashStore = None) -> int:
+        """Async version of `ServerPool.revalidate_template_hashes`.
+
+        Args:
+            store (HashStore, optional): the store to revalidate. Defaults to `ServerConfig.template_hash_store` of each server.
+
+        Returns:
+            int: the number of hashes that were removed
+        """
+        return sum(await asyncio.gather(*(server.revalidate_template_hashes_async(store) for server in self.servers)))
+
+    def close(self):
+        """Close the HTTP sessions of all servers in the pool."""
+        for server in self.servers:
+            server.close()
+        super().close()
+
+    async def aclose(self):
+        """Close the pooled connections of the asynchronous transports of all servers in the pool for the running event loop."""
+        for server in self.servers:
+            await server.aclose()
+        await super().aclose()
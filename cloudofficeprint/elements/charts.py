@@ -352,6 +352,8 @@ class ChartOptions():
 class Series(ABC):
     """Abstract base class for a series."""
 
+    __slots__ = ("name",)
+
     def __init__(self, name: str = None):
         self.name: str = name
 
@@ -381,6 +383,8 @@ class Series(ABC):
 class XYSeries(Series):
     """A series for the case where the data consists of x-values and y-values."""
 
+    __slots__ = ("x", "y", "color")
+
     def __init__(self,
                  x: Iterable[Union[int, float, str]],
                  y: Iterable[Union[int, float]],
@@ -434,6 +438,8 @@ class XYSeries(Series):
 class PieSeries(XYSeries):
     """A series for pie charts."""
 
+    __slots__ = ("colors",)
+
     def __init__(self,
                  x: Iterable[Union[int, float, str]],
                  y: Iterable[Union[int, float]],
@@ -470,6 +476,8 @@ class PieSeries(XYSeries):
 class AreaSeries(XYSeries):
     """A series for an area chart."""
 
+    __slots__ = ("opacity",)
+
     def __init__(self,
                  x: Iterable[Union[int, float, str]],
                  y: Iterable[Union[int, float]],
@@ -501,6 +509,8 @@ class AreaSeries(XYSeries):
 class LineSeries(XYSeries):
     """A series for a line chart."""
 
+    __slots__ = ("smooth", "symbol", "symbol_size", "line_width", "line_style")
+
     def __init__(self,
                  x: Iterable[Union[int, float, str]],
                  y: Iterable[Union[int, float]],
@@ -552,6 +562,8 @@ class LineSeries(XYSeries):
 class BubbleSeries(XYSeries):
     """A series for a bubble chart."""
 
+    __slots__ = ("sizes",)
+
     def __init__(self,
                  x: Iterable[Union[int, float, str]],
                  y: Iterable[Union[int, float]],
@@ -598,6 +610,8 @@ class BubbleSeries(XYSeries):
 class StockSeries(Series):
     """A series for candlestick charts."""
 
+    __slots__ = ("x", "high", "low", "close", "open", "volume")
+
     def __init__(self,
                  x: Iterable[Union[int, float, str]],
                  high: Iterable[Union[int, float]],
@@ -6,6 +6,8 @@ from .elements import Element
 class Code(Element, ABC):
     """The abstract base class for QR-codes and barcodes"""
 
+    __slots__ = ("name", "data", "type")
+
     def __init__(self, name: str, data: str, type: str):
         """
         Args:
@@ -50,6 +52,11 @@ class Code(Element, ABC):
 class BarCode(Code):
     """This class is a subclass of Code and is used to generate a barcode element"""
 
+    __slots__ = (
+        "height", "width", "errorcorrectlevel", "url", "rotation", "background_color", "padding_width",
+        "padding_height", "extra_options",
+    )
+
     def __init__(
         self,
         name: str,
@@ -128,6 +135,13 @@ class BarCode(Code):
 class QRCode(Code):
     """This class is a subclass of Code and serves as a superclass for the different types of QR-codes"""
 
+    __slots__ = (
+        "dotscale", "logo", "background_image", "color_dark", "color_light", "logo_width", "logo_height",
+        "logo_background_color", "quiet_zone", "quiet_zone_color", "background_image_alpha", "po_color", "pi_color",
+        "po_tl_color", "pi_tl_color", "po_tr_color", "pi_tr_color", "po_bl_color", "pi_bl_color", "timing_v_color",
+        "timing_h_color", "timing_color", "auto_color", "auto_color_dark", "auto_color_light",
+    )
+
     def __init__(self, name: str, data: str, type: str):
         """
         Args:
@@ -374,6 +388,8 @@ class QRCode(Code):
 class WiFiQRCode(QRCode):
     """This class is a subclass of QRCode and is used to generate a WiFi QR-code element"""
 
+    __slots__ = ("wifi_password", "wifi_encryption", "wifi_hidden")
+
     def __init__(
         self,
         name: str,
@@ -412,6 +428,8 @@ class WiFiQRCode(QRCode):
 class TelephoneNumberQRCode(QRCode):
     """This class is a subclass of QRCode and is used to generate a telephone number QR-code element"""
 
+    __slots__ = ()
+
     def __init__(self, name: str, number: str):
         """
         Args:
@@ -424,6 +442,8 @@ class TelephoneNumberQRCode(QRCode):
 class EmailQRCode(QRCode):
     """This class is a subclass of QRCode and is used to generate an email QR-code element"""
 
+    __slots__ = ("cc", "bcc", "subject", "body")
+
     def __init__(
         self,
         name: str,
@@ -467,6 +487,8 @@ class EmailQRCode(QRCode):
 class SMSQRCode(QRCode):
     """This class is a subclass of QRCode and is used to generate an SMS QR-code element"""
 
+    __slots__ = ("sms_body",)
+
     def __init__(self, name: str, receiver: str, sms_body: str = None):
         """
         Args:
@@ -490,6 +512,8 @@ class SMSQRCode(QRCode):
 class URLQRCode(QRCode):
     """This class is a subclass of QRCode and is used to generate a URL QR-code element"""
 
+    __slots__ = ()
+
     def __init__(self, name: str, url: str):
         """
         Args:
@@ -502,6 +526,8 @@ class URLQRCode(QRCode):
 class VCardQRCode(QRCode):
     """This class is a subclass of QRCode and is used to generate a vCard QR-code element"""
 
+    __slots__ = ("last_name", "email", "website")
+
     def __init__(self, name: str, first_name: str, last_name: str = None, email: str = None, website: str = None):
         """
         Args:
@@ -533,6 +559,11 @@ class VCardQRCode(QRCode):
 class MeCardQRCode(QRCode):
     """This class is a subclass of QRCode and is used to generate a MeCard QR-code element"""
 
+    __slots__ = (
+        "last_name", "nickname", "email", "contact_primary", "contact_secondary", "contact_tertiary", "website",
+        "birthday", "notes",
+    )
+
     def __init__(
         self,
         name: str,
@@ -601,6 +632,8 @@ class MeCardQRCode(QRCode):
 class GeolocationQRCode(QRCode):
     """This class is a subclass of QRCode and is used to generate a geolocation QR-code element"""
 
+    __slots__ = ("longitude", "altitude")
+
     def __init__(self, name: str, latitude: str, longitude: str = None, altitude: str = None):
         """
         Args:
@@ -628,6 +661,8 @@ class GeolocationQRCode(QRCode):
 class EventQRCode(QRCode):
     """This class is a subclass of QRCode and is used to generate an event QR-code element"""
 
+    __slots__ = ("startdate", "enddate")
+
     def __init__(self, name: str, summary: str, startdate: str = None, enddate: str = None):
         """
         Args:
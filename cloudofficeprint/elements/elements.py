@@ -1,13 +1,19 @@
-import json
 from copy import deepcopy
 from typing import Any, Union, Iterable, Mapping, Set, FrozenSet, Dict, List
 from abc import abstractmethod, ABC
 import pandas
 
+import os
+
+from ..own_utils import json_utils, type_utils
+from ..own_utils.encoding_cache import get_encoding_cache
+
 
 class CellStyle(ABC):
     """Abstract base class for a cell style"""
 
+    __slots__ = ()
+
     def __init__(self):
         pass
 
@@ -39,6 +45,16 @@ class CellStyle(ABC):
 class CellStyleDocx(CellStyle):
     """Cell styling settings for docx templates"""
 
+    __slots__ = (
+        "cell_background_color", "width", "preserve_total_width_of_table", "border", "border_top", "border_bottom",
+        "border_left", "border_right", "border_diagonal_down", "border_diagonal_up", "border_color", "border_top_color",
+        "border_bottom_color", "border_left_color", "border_right_color", "border_diagonal_up_color",
+        "border_diagonal_down_color", "border_size", "border_top_size", "border_bottom_size", "border_left_size",
+        "border_right_size", "border_diagonal_up_size", "border_diagonal_down_size", "border_space", "border_top_space",
+        "border_bottom_space", "border_left_space", "border_right_space", "border_diagonal_up_space",
+        "border_diagonal_down_space",
+    )
+
     def __init__(
         self, 
         cell_background_color: str = None, 
@@ -211,6 +227,15 @@ class CellStyleDocx(CellStyle):
 class CellStyleXlsx(CellStyle):
     """Cell styling settings for xlsx templates"""
 
+    __slots__ = (
+        "cell_locked", "cell_hidden", "cell_background", "font_name", "font_size", "font_color", "font_italic",
+        "font_bold", "font_strike", "font_underline", "font_superscript", "font_subscript", "border_top",
+        "border_top_color", "border_bottom", "border_bottom_color", "border_left", "border_left_color", "border_right",
+        "border_right_color", "border_diagonal", "border_diagonal_direction", "border_diagonal_color",
+        "text_h_alignment", "text_v_alignment", "text_rotation", "wrap_text", "width", "height", "max_characters",
+        "height_scaling",
+    )
+
     def __init__(
         self,
         cell_locked: bool = None,
@@ -386,7 +411,14 @@ class CellStyleXlsx(CellStyle):
 
 
 class Element(ABC):
-    """The abstract base class for elements."""
+    """The abstract base class for elements.
+
+    The elements that occur many times in a print job (properties, images, codes, ...) declare `__slots__`,
+    so they have no per-instance `__dict__`. `Element` itself declares no attributes, so that `ElementCollection` can also be a `list`.
+    Subclasses that do not declare `__slots__` get a `__dict__` as usual.
+    """
+
+    __slots__ = ()
 
     def __init__(self, name: str):
         """
@@ -420,7 +452,7 @@ class Element(ABC):
         Returns:
             str: JSON representation
         """
-        return json.dumps(self.as_dict)
+        return json_utils.dumps(self.as_dict)
 
     @property
     @abstractmethod
@@ -451,6 +483,8 @@ class Property(Element):
     In a template, `{name}` is replaced by `value`.
     """
 
+    __slots__ = ("name", "value")
+
     def __init__(self, name: str, value: str):
         """
         Args:
@@ -471,6 +505,8 @@ class Property(Element):
 
 
 class CellStyleProperty(Property):
+    __slots__ = ("cell_style",)
+
     def __init__(self, name: str, value: str, cell_style: CellStyle):
         """
         Args:
@@ -496,6 +532,11 @@ class CellStyleProperty(Property):
 
 
 class Html(Property):
+    __slots__ = (
+        "custom_table_style", "unordered_list_style", "ordered_list_style", "use_tag_style", "ignore_cell_margin",
+        "ignore_empty_p",
+    )
+
     def __init__(
         self, name: str,
         value: str, 
@@ -548,6 +589,8 @@ class Html(Property):
         return result
 
 class RightToLeft(Property):
+    __slots__ = ()
+
     def __init__(self, name: str, value: str):
         """
         Args:
@@ -562,6 +605,8 @@ class RightToLeft(Property):
 
 
 class FootNote(Property):
+    __slots__ = ()
+
     def __init__(self, name: str, value: str):
         """
         Args:
@@ -583,6 +628,8 @@ class AutoLink(Property):
     - Option to preserve template styling
     """
 
+    __slots__ = ("font_color", "underline_color", "preserve_tag_style")
+
     def __init__(self, 
                  name: str, 
                  value: str,
@@ -618,6 +665,8 @@ class AutoLink(Property):
         return result
     
 class Hyperlink(Element):
+    __slots__ = ("name", "url", "text", "font_color", "underline_color", "preserve_tag_style")
+
     def __init__(self, name: str, url: str, text: str = None):
         """
         Args:
@@ -688,6 +737,8 @@ class TableOfContents(Element):
 
 
 class Raw(Property):
+    __slots__ = ()
+
     def __init__(self, name: str, value: str):
         """
         Args:
@@ -702,6 +753,8 @@ class Raw(Property):
 
 
 class Span(Property):
+    __slots__ = ("columns", "rows")
+
     def __init__(self, name: str, value: str, columns: int, rows: int):
         """
         Args:
@@ -728,6 +781,8 @@ class Span(Property):
 
 
 class Formula(Property):
+    __slots__ = ()
+
     def __init__(self, name: str, formula: str):
         """
         Args:
@@ -742,6 +797,8 @@ class Formula(Property):
 
 
 class StyledProperty(Property):
+    __slots__ = ("font", "font_size", "font_color", "bold", "italic", "underline", "strikethrough", "highlight_color")
+
     def __init__(
         self,
         name: str,
@@ -807,6 +864,8 @@ class StyledProperty(Property):
 
 
 class Watermark(Property):
+    __slots__ = ("color", "font", "width", "height", "opacity", "rotation")
+
     def __init__(
         self,
         name: str,
@@ -1052,6 +1111,8 @@ class COPChart(Element):
 class PageBreak(Property):
     """The class for a page break property."""
 
+    __slots__ = ()
+
     def __init__(self, name: str, value: Union[str, bool]):
         """
         Args:
@@ -1069,6 +1130,8 @@ class PageBreak(Property):
 class MarkdownContent(Property):
     """The class for markdown content."""
 
+    __slots__ = ()
+
     def __init__(self, name: str, value: str):
         """
         Args:
@@ -1143,6 +1206,8 @@ class TextBox(Element):
 class Freeze(Property):
     """Only supported in Excel. Represents an object that indicates to put a freeze pane in the excel template."""
 
+    __slots__ = ()
+
     def __init__(self, name: str, value: Union[str, bool]):
         """
         Args:
@@ -1164,6 +1229,8 @@ class Insert(Property):
     Please use `ExcelInsert` element to insert in excel with more flexibility.
     """
 
+    __slots__ = ()
+
     def __init__(self, name: str, value: str):
         """
         Args:
@@ -1200,6 +1267,27 @@ class PdfInclude(Element):
     @property
     def available_tags(self) -> FrozenSet[str]:
         return frozenset({"{?pdfinclude " + self.name + "}"})
+
+    @staticmethod
+    def from_file(name: str, path: str, filename: str = None) -> 'PdfInclude':
+        """Include a local file. The file is encoded once for all elements from the same file (see `own_utils.EncodingCache`).
+
+        Args:
+            name (str): The tag name referenced in templates
+            path (str): The path to the local file, of which the MIME type is determined by its extension
+            filename (str, optional): Name of the file to include. Defaults to the name of the local file.
+
+        Returns:
+            PdfInclude: the generated PdfInclude object from a local file
+        """
+        return PdfInclude(
+            name,
+            None,
+            filename if filename is not None else os.path.basename(path),
+            type_utils.extension_to_mimetype(type_utils.path_to_extension(path)),
+            get_encoding_cache().read_file(path),
+            "base64",
+        )
     
 
     @property
@@ -1223,6 +1311,8 @@ class PptxShapeRemove(Property):
     """Allows the removal of an entire shape / text-box if the associated tag evaluates to false. For example, if a template slide includes a text box with the tag {toShow?} and 
     the value of toShow is false or undefined, the entire shape will be removed from the slide.
     """
+    __slots__ = ()
+
     def __init__(self, name: str, value:  Union[bool, str]):
         """
         Args:
@@ -1241,6 +1331,8 @@ class HideSlide(Property):
     """Allows hiding a slide.
     LIMITATION: using _hide for slide hide is that it can only be used for hiding slides during generation(!slideGeneration)
     """
+    __slots__ = ()
+
     def __init__(self, name: str, condition : str ):
         """
         Args:
@@ -1262,6 +1354,8 @@ class HideSheets(Property):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, name: str, condition: str):
         """
         Args:
@@ -1355,6 +1449,51 @@ class ExcelInsert(Element):
     def available_tags(self) -> FrozenSet[str]:
         return frozenset({"{?insert fileToInsert}"})
 
+    @staticmethod
+    def from_file(name: str,
+                  path: str,
+                  icon: str = None,
+                  fromRow: int = None,
+                  fromCol: Union[str, int] = None,
+                  fromRowOff: str = None,
+                  fromColOff: str = None,
+                  toRow: int = None,
+                  toCol: Union[str, int] = None,
+                  toRowOff: str = None,
+                  toColOff: str = None
+                  ) -> 'ExcelInsert':
+        """Insert a local file. The file is encoded once for all elements from the same file (see `own_utils.EncodingCache`).
+
+        Args:
+            name (str):  Name of insert tag. Ex(fileToInsert)
+            path (str): The path to the local file to insert.
+            icon (str, optional): Icon that links the file to insert. Once clicked on it, opens the file inserted. If it is not provide default icon is used.
+            fromRow (int, optional): position for top of icon. Defaults to row of the tag.
+            fromCol (Union[str,int], optional): positon for left of icon. Defaults to column of the tag.
+            fromRowOff (str, optional): space after the value of from Row. Defaults to 0.
+            fromColOff (str, optional): space after the value of fromCol. Defaults to 0.
+            toRow (int, optional): position for bottom of icon. Defaults to row of the tag + 3.
+            toCol (Union[str,int], optional): position for right side of icon. Defaults to column of the tag.
+            toRowOff (str, optional): space after toRow value. Defaults to 20px.
+            toColOff (str, optional): space after toCol value. Defaults to 50px.
+
+        Returns:
+            ExcelInsert: the generated ExcelInsert object from a local file
+        """
+        return ExcelInsert(
+            name,
+            get_encoding_cache().read_file(path),
+            icon,
+            fromRow,
+            fromCol,
+            fromRowOff,
+            fromColOff,
+            toRow,
+            toCol,
+            toRowOff,
+            toColOff,
+        )
+
 
 class Embed(Property):
     """Inside Word, it is possible to copy the content of one docx file to the template without rendering.
@@ -1366,6 +1505,8 @@ class Embed(Property):
         Only supported in Word and only supports docx file to embed.
     """
 
+    __slots__ = ()
+
     def __init__(self, name: str, value: str):
         """It takes the tagName and its value as parameter.
 
@@ -1591,6 +1732,8 @@ class Link(Property):
     If the uid is not provided, a new uid will be generated uniquely for every link and target pair.
     """
 
+    __slots__ = ("uid_name", "uid_value")
+
     def __init__(
         self,
         name: str,
@@ -1635,6 +1778,8 @@ class ElementCollection(list, Element):
     Its name is used as a key name when nested, but ignored for all purposes when it's the outer ElementCollection.
     """
 
+    __slots__ = ("name",)
+
     def __init__(self, name: str = "", elements: Iterable[Element] = ()):
         """
         Args:
@@ -1674,7 +1819,7 @@ class ElementCollection(list, Element):
 
     @property
     def json(self):
-        return json.dumps(self.as_dict)
+        return json_utils.dumps(self.as_dict)
 
     def add(self, element: Element):
         """Add an element to this element collection object.
@@ -1766,4 +1911,4 @@ class ElementCollection(list, Element):
         Returns:
             ElementCollection: an element collection generated from the given JSON string and name
         """
-        return cls.from_mapping(json.loads(json_str), name)
+        return cls.from_mapping(json_utils.loads(json_str), name)
@@ -1,10 +1,17 @@
+import requests
 from typing import Dict, FrozenSet, Union
-from ..own_utils import file_utils
+from ..own_utils import file_utils, json_utils
+from ..own_utils.encoding_cache import get_encoding_cache
 from .elements import Element
 
 class Image(Element):
     """The class for image elements."""
 
+    __slots__ = (
+        "name", "source", "max_width", "max_height", "transparency", "url", "width", "height", "_alt_text",
+        "_wrap_text", "_rotation", "density",
+    )
+
     def __init__(self,
                  name: str,
                  source: str,
@@ -22,7 +29,7 @@ class Image(Element):
         """
         Args:
             name (str): The name of the image element.
-            source (str): The source for the image: base64 or URL.
+            source (Union[str, json_utils.LazyBase64, json_utils.InternedBase64]): The source for the image: base64 or URL.
             max_width (Union[int, str]): The maximum width of the image (for proportional scaling).
             max_height (Union[int, str]): The maximum height of the image (for proportional scaling).
             alt_text (str): The alternative text for the image, used when the image can't be loaded.
@@ -40,7 +47,7 @@ class Image(Element):
             density (int):The density to use for svg to png conversion.
         """
         super().__init__(name)
-        self.source: str = source
+        self.source: Union[str, json_utils.LazyBase64, json_utils.InternedBase64] = source
         self.max_width: Union[int, str] = max_width
         self.max_height: Union[int, str] = max_height
         self.alt_text: str = alt_text
@@ -168,7 +175,9 @@ class Image(Element):
             url: str=None,
             width: Union[int, str]=None,
             height: Union[int, str]=None,
-            density: int = None
+            density: int = None,
+            lazy: bool = False,
+            interned: bool = False
         ) -> 'Image':
         """Generate an Image object from a local file.
 
@@ -190,13 +199,16 @@ class Image(Element):
             width (Union[int, str]): The width of the image (for non-proportional scaling).
             height (Union[int, str]): The height of the image (for non-proportional scaling).
             density (int): The density to use for svg to png conversion.
+            lazy (bool): Whether to read and encode the image only when the print job is sent (see `own_utils.json_utils.LazyBase64`).
+                Defaults to False, in which case the image is encoded once for all images from the same file (see `own_utils.EncodingCache`).
+            interned (bool): Whether the image is sent as an interned string, see `Image.from_base64`. Ignored for a lazy image. Defaults to False.
 
         Returns:
             Image: the generated Image object from a local file
         """
         return Image(
             name,
-            file_utils.read_file_as_base64(path),
+            json_utils.LazyBase64(path) if lazy else _base64_source(get_encoding_cache().read_file(path), interned),
             max_width,
             max_height,
             alt_text,
@@ -222,7 +234,8 @@ class Image(Element):
             url: str=None,
             width: Union[int, str]=None,
             height: Union[int, str]=None,
-            density: int = None
+            density: int = None,
+            interned: bool = False
         ) -> 'Image':
         """Generate an Image object from raw data.
 
@@ -244,12 +257,13 @@ class Image(Element):
             width (Union[int, str]): The width of the image (for non-proportional scaling).
             height (Union[int, str]): The height of the image (for non-proportional scaling).
             density (int): The density to use for svg to png conversion.
+            interned (bool): Whether the image is sent as an interned string, see `Image.from_base64`. Defaults to False.
         Returns:
             Image: the generated Image object from raw data
         """
         return Image(
             name,
-            file_utils.raw_to_base64(data),
+            _base64_source(get_encoding_cache().encode(data), interned),
             max_width,
             max_height,
             alt_text,
@@ -275,7 +289,8 @@ class Image(Element):
             url: str=None,
             width: Union[int, str]=None,
             height: Union[int, str]=None,
-            density: int = None
+            density: int = None,
+            interned: bool = False
         ) -> 'Image':
         """Generate an Image object from a base64 string.
 
@@ -297,14 +312,16 @@ class Image(Element):
             width (Union[int, str]): The width of the image (for non-proportional scaling).
             height (Union[int, str]): The height of the image (for non-proportional scaling).
             density (int):The density to use for svg to png conversion.
-
+            interned (bool): Whether the image is sent as an interned string (see `own_utils.json_utils.intern_base64`), which is shared
+                by all images with the same content, e.g. the same icon in every row of a loop: it is held in memory once and,
+                when the print job is sent with chunked requests, encoded once for all occurrences. Defaults to False.
 
         Returns:
             Image: the generated Image object from a base64 string
         """
         return Image(
             name,
-            base64str,
+            _base64_source(base64str, interned),
             max_width,
             max_height,
             alt_text,
@@ -330,7 +347,10 @@ class Image(Element):
             url: str=None,
             width: Union[int, str]=None,
             height: Union[int, str]=None,
-            density: int = None
+            density: int = None,
+            fetch: bool = False,
+            max_size: int = None,
+            session: requests.Session = None
         ) -> 'Image':
         """Generate an Image object from a URL.
 
@@ -352,13 +372,18 @@ class Image(Element):
             width (Union[int, str]): The width of the image (for non-proportional scaling).
             height (Union[int, str]): The height of the image (for non-proportional scaling).
             density (int):The density to use for svg to png conversion.
+            fetch (bool): Whether to download the image here and send it as base64, for a URL that the Cloud Office Print server cannot reach
+                (see `own_utils.file_utils.url_as_base64`). Defaults to False.
+            max_size (int): The maximum size in bytes of a fetched image. Defaults to None (unlimited).
+            session (requests.Session): The session that fetches the image, e.g. `config.Server.session` to reuse the pooled connections of a server.
+                Defaults to None (a session for this fetch only).
 
         Returns:
             Image: the generated Image object from a URL
         """
         return Image(
             name,
-            url_source,
+            file_utils.url_as_base64(url_source, max_size, session=session) if fetch else url_source,
             max_width,
             max_height,
             alt_text,
@@ -370,3 +395,15 @@ class Image(Element):
             height,
             min(density, 1200) if density is not None else None
         )
+
+
+def _base64_source(base64str: str, interned: bool) -> Union[str, json_utils.InternedBase64]:
+    """
+    Args:
+        base64str (str): The base64 string for the image.
+        interned (bool): Whether to intern the string.
+
+    Returns:
+        Union[str, json_utils.InternedBase64]: the source for the image
+    """
+    return json_utils.intern_base64(base64str) if interned else base64str
@@ -1,39 +1,222 @@
 from .elements import Element, ElementCollection, Property
-from typing import Dict, Iterable, FrozenSet, List, Union, Mapping
+from ..own_utils import json_utils
+from typing import Any, Dict, Iterable, Iterator, FrozenSet, List, Sequence, Type, Union, Mapping
+
+
+class ColumnarContent(json_utils.LazyArray):
+    """The content of a loop as one sequence of values per column, instead of one `ElementCollection` of `Property`s per row.
+
+    The rows of the loop are only created while the print job is written (see `own_utils.json_utils.LazyArray`),
+    so a loop over a large table needs no element objects per row or per cell. Use it through `ForEach.from_columns`
+    or `ForEach.from_dataframe`.
+    """
+
+    def __init__(self,
+                 columns: Mapping[str, Sequence[Any]],
+                 schema: Mapping[str, Type[Property]] = None):
+        """
+        NumPy values are sent as the equivalent Python values, dates and times (`datetime64` columns) as ISO 8601 strings.
+
+        Args:
+            columns (Mapping[str, Sequence[Any]]): The values of every column by tag name: lists, tuples, NumPy arrays or pandas Series of equal length.
+            schema (Mapping[str, Type[Property]], optional): The `Property` class of the columns whose tag is not a plain `{name}`,
+                e.g. `Raw` for `{@name}`. The class can't add other keys than the name to the dict representation (like `CellStyleProperty` does).
+                Defaults to None (every column is a `Property`).
+
+        Raises:
+            ValueError: if the columns don't have the same length, or the schema contains a column that doesn't exist
+            TypeError: if the schema contains a class that can't be used for a column, or a column contains time differences (`timedelta64`)
+        """
+        self._columns: Dict[str, Sequence[Any]] = {
+            name: ColumnarContent._column(column) for name, column in columns.items()
+        }
+        lengths = {len(column) for column in self._columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"The columns of a loop must have the same length, not {sorted(lengths)}")
+        self._length: int = lengths.pop() if lengths else 0
+        self.schema: Dict[str, Type[Property]] = dict(schema) if schema is not None else {}
+        for name, cls in self.schema.items():
+            if name not in self._columns:
+                raise ValueError(f'The schema contains "{name}", which is not a column')
+            if not (isinstance(cls, type) and issubclass(cls, Property)) or cls.as_dict is not Property.as_dict:
+                raise TypeError(f"{cls!r} can't be used for a column, only Property classes that add no keys can")
+
+    @staticmethod
+    def _column(column: Any) -> Sequence[Any]:
+        """
+        Args:
+            column (Any): the values of a column
+
+        Raises:
+            TypeError: if the column contains time differences, which have no JSON equivalent
+
+        Returns:
+            Sequence[Any]: the values as a sequence that supports slicing: a pandas Series as NumPy array, dates and times as a list of ISO 8601 strings,
+                a list with NumPy values as a list of Python values, any other iterable as list
+        """
+        kind = getattr(getattr(column, "dtype", None), "kind", None)
+        if kind == "m":
+            raise TypeError("A column of time differences can't be sent, convert it to numbers or strings first")
+        if kind == "M":
+            if hasattr(column, "isna"):
+                # a pandas Series of Timestamps, possibly with a time zone
+                return [None if missing else value.isoformat() for value, missing in zip(column, column.isna())]
+            return [ColumnarContent._value(value) for value in column]
+        if hasattr(column, "to_numpy"):
+            return column.to_numpy()
+        if hasattr(column, "tolist") or isinstance(column, range):
+            return column
+        if not isinstance(column, (list, tuple)):
+            column = list(column)
+        if any(hasattr(value, "dtype") for value in column):
+            return [ColumnarContent._value(value) for value in column]
+        return column
+
+    @staticmethod
+    def _value(value: Any) -> Any:
+        """
+        Args:
+            value (Any): a value of a column
+
+        Raises:
+            TypeError: if the value is a NumPy time difference
+
+        Returns:
+            Any: the Python equivalent of a NumPy value, an ISO 8601 string for a NumPy date or time, or the value itself
+        """
+        kind = getattr(getattr(value, "dtype", None), "kind", None)
+        if kind is None or not hasattr(value, "item"):
+            return value
+        if kind == "m":
+            raise TypeError("A column of time differences can't be sent, convert it to numbers or strings first")
+        if kind == "M":
+            # item() returns an int for units smaller than microseconds, a date for units of a day or more
+            if not value.dtype.name.endswith(("[Y]", "[M]", "[W]", "[D]")):
+                value = value.astype("datetime64[us]")
+            value = value.item()
+            return None if value is None else value.isoformat()
+        return value.item()
+
+    @property
+    def names(self) -> List[str]:
+        """
+        Returns:
+            List[str]: the tag names of the columns, in the order of the keys of every row
+        """
+        return list(self._columns)
+
+    @property
+    def available_tags(self) -> FrozenSet[str]:
+        """
+        Returns:
+            FrozenSet[str]: the tags of the columns, as if every row were an `ElementCollection` of `Property`s
+        """
+        result = set()
+        for name in self._columns:
+            result |= self.schema.get(name, Property)(name, None).available_tags
+        return frozenset(result)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def iter_batches(self, batch_size: int = json_utils.BATCH_SIZE, start: int = 0) -> Iterator[List[Dict[str, Any]]]:
+        """Create the rows in batches, as dicts of the values of the columns.
+        NumPy arrays are converted to the equivalent Python values.
+
+        Args:
+            batch_size (int, optional): maximum number of rows in a batch. Defaults to `own_utils.json_utils.BATCH_SIZE`.
+            start (int, optional): index of the first row. Defaults to 0.
+
+        Yields:
+            List[Dict[str, Any]]: the next batch of rows
+        """
+        names = self.names
+        for batch_start in range(start, self._length, batch_size):
+            values = []
+            for column in self._columns.values():
+                part = column[batch_start:batch_start + batch_size]
+                values.append(part.tolist() if hasattr(part, "tolist") else part)
+            yield [dict(zip(names, row)) for row in zip(*values)]
 
 
 class ForEach(Element):
     """The class for representing loops of elements."""
 
-    def __init__(self, name: str, content: Iterable[Element]):
+    def __init__(self, name: str, content: Union[Iterable[Element], ColumnarContent]):
         """
         Args:
             name (str): The name for this element (Cloud Office Print tag).
-            content (Iterable[Element]): An iterable containing the elements for this loop element.
+            content (Union[Iterable[Element], ColumnarContent]): An iterable containing the elements for this loop element,
+                or the columns of the loop (see `ForEach.from_columns`).
         """
         super().__init__(name)
-        self._content = list(content)
+        self._content = content if isinstance(content, ColumnarContent) else list(content)
         # if self._tags should be overwritten in a subclass of this one, remember to do so after calling super().__init__
         self._tags = {
             "{#" + name + "}",
             "{/" + name + "}"
         }
 
+    @classmethod
+    def from_columns(cls,
+                     name: str,
+                     columns: Mapping[str, Sequence[Any]],
+                     schema: Mapping[str, Type[Property]] = None,
+                     **kwargs) -> "ForEach":
+        """Generate a loop from the values of its columns, without creating elements for the rows.
+
+        `ForEach.from_columns("rows", {"a": [1, 2], "b": [3, 4]})` has the same dict representation as a loop with the rows
+        `ElementCollection.from_mapping({"a": 1, "b": 3})` and `ElementCollection.from_mapping({"a": 2, "b": 4})`,
+        but its rows are only created while the print job is written, in batches.
+
+        Args:
+            name (str): The name for this element (Cloud Office Print tag).
+            columns (Mapping[str, Sequence[Any]]): The values of every column by tag name: lists, tuples, NumPy arrays or pandas Series of equal length.
+            schema (Mapping[str, Type[Property]], optional): The `Property` class of the columns whose tag is not a plain `{name}`, see `ColumnarContent`.
+                Defaults to None.
+            **kwargs: the other arguments of the loop class, e.g. `distribute` for `ForEachInline`
+
+        Returns:
+            ForEach: the loop, of the class on which this method is called
+        """
+        return cls(name, ColumnarContent(columns, schema), **kwargs)
+
+    @classmethod
+    def from_dataframe(cls,
+                       name: str,
+                       data: 'pandas.DataFrame',
+                       schema: Mapping[str, Type[Property]] = None,
+                       **kwargs) -> "ForEach":
+        """Generate a loop with a row for every row of a [Pandas dataframe](https://pandas.pydata.org/docs/reference/api/pandas.DataFrame.html),
+        see `ForEach.from_columns`.
+
+        Args:
+            name (str): The name for this element (Cloud Office Print tag).
+            data (pandas.DataFrame): Pandas dataframe of which the column names are the tag names.
+            schema (Mapping[str, Type[Property]], optional): The `Property` class of the columns whose tag is not a plain `{name}`, see `ColumnarContent`.
+                Defaults to None.
+            **kwargs: the other arguments of the loop class, e.g. `distribute` for `ForEachInline`
+
+        Returns:
+            ForEach: the loop, of the class on which this method is called
+        """
+        return cls.from_columns(name, {str(column): data[column] for column in data.columns}, schema, **kwargs)
+
     @property
-    def content(self) -> List[Element]:
+    def content(self) -> Union[List[Element], ColumnarContent]:
         """Get the elements in this loop object.
 
         Returns:
-            List[Element]: the elements in this loop object
+            Union[List[Element], ColumnarContent]: the elements in this loop object, or its columns for a loop generated by `ForEach.from_columns`
         """
         return self._content
 
     @content.setter
-    def content(self, value: Iterable[Element]):
+    def content(self, value: Union[Iterable[Element], ColumnarContent]):
         """Setter for the content of this loop object
 
         Args:
-            value (Iterable[Element]): an iterable consisting of elements
+            value (Union[Iterable[Element], ColumnarContent]): an iterable consisting of elements, or the columns of the loop
         """
         self._content = value
 
@@ -41,13 +224,19 @@ class ForEach(Element):
     def available_tags(self) -> FrozenSet[str]:
         result = self._tags
 
-        for element in self.content:
-            result |= element.available_tags
+        if isinstance(self.content, ColumnarContent):
+            result |= self.content.available_tags
+        else:
+            for element in self.content:
+                result |= element.available_tags
 
         return frozenset(result)
 
     @property
     def as_dict(self) -> Dict:
+        if isinstance(self.content, ColumnarContent):
+            # the rows are created while the print job is written
+            return {self.name: self.content}
         return {
             self.name: [element.as_dict for element in self.content]
         }
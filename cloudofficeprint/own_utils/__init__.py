@@ -3,4 +3,7 @@ Helper functions.
 """
 
 from .file_utils import *
-from .type_utils import *
\ No newline at end of file
+from .type_utils import *
+from .json_utils import *
+from .sync_utils import *
+from .encoding_cache import *
@@ -0,0 +1,222 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+from .file_utils import raw_to_base64
+
+MAX_BYTES = 64 * 1024 * 1024
+"""Default size in bytes of the base64 strings an `EncodingCache` keeps in memory."""
+
+
+class EncodingCache:
+    """Cache for the base64 representations of files, shared by all resources, images and inserted files with the same content.
+
+    Raw data is identified by its SHA-256 digest, a local file by its path, size and modification time,
+    so a file that is used in many print jobs (e.g. a logo) is read and encoded once.
+    The encoded strings are kept in memory up to `EncodingCache.max_bytes`, evicting the least recently used ones.
+    With a `EncodingCache.directory`, they are also stored on disk, where they survive the eviction from memory and a restart
+    and can be shared with other processes. Files on disk are never removed by the cache.
+    `EncodingCache.hits`, `EncodingCache.disk_hits` and `EncodingCache.misses` count how often a string was found in memory,
+    found on disk or had to be encoded.
+    """
+
+    def __init__(self, max_bytes: int = MAX_BYTES, directory: str = None):
+        """
+        Args:
+            max_bytes (int, optional): Total size in bytes of the strings kept in memory. 0 keeps nothing in memory. Defaults to `MAX_BYTES`.
+            directory (str, optional): Directory in which the strings are stored, created if it does not exist. Defaults to None (no disk tier).
+        """
+        self.max_bytes: int = max_bytes
+        self.directory: Optional[str] = directory
+        self.hits: int = 0
+        self.disk_hits: int = 0
+        self.misses: int = 0
+        self._entries: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._size: int = 0
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def size(self) -> int:
+        """
+        Returns:
+            int: the total size in bytes of the strings kept in memory
+        """
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def encode(self, data: bytes, digest: str = None) -> str:
+        """The base64 representation of raw data.
+
+        Args:
+            data (bytes): a [bytes-like object](https://docs.python.org/3/glossary.html#term-bytes-like-object) containing the raw data
+            digest (str, optional): the hexadecimal SHA-256 digest of `data`, if it is known already. Defaults to None.
+
+        Returns:
+            str: base64 string of the raw data
+        """
+        if digest is None:
+            digest = hashlib.sha256(data).hexdigest()
+        return self._get(("sha256", digest), lambda: raw_to_base64(data))
+
+    def read_file(self, path: str) -> str:
+        """The base64 representation of a local file, encoded again when the size or modification time of the file changes.
+
+        Throws IOError if it can't read the file.
+
+        Args:
+            path (str): path of the local file
+
+        Returns:
+            str: base64 representation of the file
+        """
+        stat = os.stat(path)
+
+        def read() -> str:
+            with open(path, "rb") as f:
+                return raw_to_base64(f.read())
+
+        return self._get(("file", os.path.realpath(path), stat.st_size, stat.st_mtime_ns), read)
+
+    async def read_file_async(self, path: str) -> str:
+        """Async version of `EncodingCache.read_file`.
+        The file is read and encoded in a worker thread, so the event loop is not blocked.
+
+        Args:
+            path (str): path of the local file
+
+        Returns:
+            str: base64 representation of the file
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self.read_file, path)
+
+    def clear(self):
+        """Drop all strings kept in memory and reset the counters. Files on disk are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.disk_hits = self.misses = 0
+
+    def _get(self, key: Hashable, encode: Callable[[], str]) -> str:
+        """The cached string for a key, or the encoded one, which is then cached.
+
+        Args:
+            key (Hashable): identifies the content
+            encode (Callable[[], str]): encodes the content
+
+        Returns:
+            str: the base64 string
+        """
+        with self._lock:
+            encoded = self._entries.get(key)
+            if encoded is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return encoded
+        encoded = self._read(key)
+        if encoded is not None:
+            with self._lock:
+                self.disk_hits += 1
+        else:
+            encoded = encode()
+            with self._lock:
+                self.misses += 1
+            self._write(key, encoded)
+        self._remember(key, encoded)
+        return encoded
+
+    def _remember(self, key: Hashable, encoded: str):
+        """Keep a string in memory, evicting the least recently used strings to stay within `EncodingCache.max_bytes`.
+
+        Args:
+            key (Hashable): identifies the content
+            encoded (str): the base64 string
+        """
+        if len(encoded) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = encoded
+            self._size += len(encoded)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def _path(self, key: Hashable) -> Optional[str]:
+        """
+        Args:
+            key (Hashable): identifies the content
+
+        Returns:
+            Optional[str]: the path of the file on disk for a key, or None without disk tier
+        """
+        if self.directory is None:
+            return None
+        return os.path.join(self.directory, hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:40] + ".b64")
+
+    def _read(self, key: Hashable) -> Optional[str]:
+        """
+        Args:
+            key (Hashable): identifies the content
+
+        Returns:
+            Optional[str]: the string stored on disk, or None if it is not stored
+        """
+        path = self._path(key)
+        if path is None:
+            return None
+        try:
+            with open(path, encoding="ascii") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write(self, key: Hashable, encoded: str):
+        """Store a string on disk, if there is a disk tier.
+
+        Args:
+            key (Hashable): identifies the content
+            encoded (str): the base64 string
+        """
+        path = self._path(key)
+        if path is None:
+            return
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporary, "w", encoding="ascii") as f:
+                f.write(encoded)
+            # atomic, so other processes never read a partially written file
+            os.replace(temporary, path)
+        except OSError as err:
+            logging.debug("Could not store an encoded file in %s: %s", self.directory, err)
+
+
+_cache = EncodingCache()
+
+
+def get_encoding_cache() -> EncodingCache:
+    """
+    Returns:
+        EncodingCache: the encoding cache used by all resources and elements of this package, see `set_encoding_cache`
+    """
+    return _cache
+
+
+def set_encoding_cache(cache: EncodingCache):
+    """Set the encoding cache used by all resources and elements of this package,
+    e.g. to change its size or to add a disk tier: `set_encoding_cache(EncodingCache(directory="/tmp/cop"))`.
+
+    Args:
+        cache (EncodingCache): the encoding cache
+    """
+    global _cache
+    _cache = cache
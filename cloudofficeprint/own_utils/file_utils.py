@@ -1,5 +1,19 @@
+import asyncio
 import base64
+import time
 import requests
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator, List, Tuple, Union
+
+FETCH_CHUNK_SIZE = 3 * 64 * 1024
+"""Size in bytes of the pieces in which content fetched from a URL is encoded, a multiple of 3 so every piece encodes without padding."""
+
+FETCH_TIMEOUT = (10.0, 60.0)
+"""Default connect and read timeout in seconds for fetching content from a URL."""
+
+FETCH_POOL_SIZE = 16
+"""Maximum number of connections per host kept by the session that `urls_as_base64` creates when it is not given one."""
 
 
 def raw_to_base64(raw_data: bytes) -> str:
@@ -29,13 +43,201 @@ def read_file_as_base64(path: str) -> str:
     return raw_to_base64(file_content)
 
 
-def url_as_base64(url: str) -> str:
+async def read_file_as_base64_async(path: str) -> str:
+    """Async version of `read_file_as_base64`.
+    The file is read and encoded in a worker thread, so the event loop is not blocked.
+
+    Args:
+        path (str): path of the local file
+
+    Returns:
+        str: base64 representation of the file
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, read_file_as_base64, path)
+
+
+def url_as_base64(
+    url: str,
+    max_size: int = None,
+    timeout: Union[float, Tuple[float, float]] = FETCH_TIMEOUT,
+    total_timeout: float = None,
+    session: requests.Session = None,
+) -> str:
     """Fetch content at url as base64.
+    The content is encoded while it is downloaded, see `stream_url_as_base64`, so only the base64 representation is held in memory.
 
     Args:
         url (str): URL
+        max_size (int, optional): maximum size in bytes of the content. Defaults to None (unlimited).
+        timeout (Union[float, Tuple[float, float]], optional): connect and read timeout in seconds. Defaults to `FETCH_TIMEOUT`.
+        total_timeout (float, optional): maximum time in seconds for the whole download. Defaults to None (unlimited).
+        session (requests.Session, optional): session whose pooled connections are used, e.g. `config.Server.session`. Defaults to None (a session for this fetch only).
+
+    Raises:
+        ValueError: if the content is larger than `max_size`
+        TimeoutError: if the download takes longer than `total_timeout`
+        requests.exceptions.RequestException: if the content cannot be fetched
 
     Returns:
         str: base64 representation of the content at the URL
     """
-    return raw_to_base64(requests.get(url, stream=True).raw)
+    pieces = []
+    stream_url_as_base64(url, pieces.append, max_size, timeout, total_timeout, session=session)
+    return b"".join(pieces).decode("ascii")
+
+
+def stream_url_as_base64(
+    url: str,
+    write: Callable[[bytes], Any],
+    max_size: int = None,
+    timeout: Union[float, Tuple[float, float]] = FETCH_TIMEOUT,
+    total_timeout: float = None,
+    chunk_size: int = FETCH_CHUNK_SIZE,
+    session: requests.Session = None,
+) -> int:
+    """Fetch the content at a URL and write its base64 representation while it is downloaded, e.g. to a file.
+    The content is encoded in pieces of a multiple of 3 bytes, so memory use is bounded by the size of a piece.
+
+    Args:
+        url (str): URL
+        write (Callable[[bytes], Any]): called with every encoded piece, e.g. the `write` method of a file opened in binary mode
+        max_size (int, optional): maximum size in bytes of the content. Defaults to None (unlimited).
+        timeout (Union[float, Tuple[float, float]], optional): connect and read timeout in seconds. Defaults to `FETCH_TIMEOUT`.
+        total_timeout (float, optional): maximum time in seconds for the whole download. Defaults to None (unlimited).
+        chunk_size (int, optional): size in bytes of the pieces that are encoded, rounded down to a multiple of 3. Defaults to `FETCH_CHUNK_SIZE`.
+        session (requests.Session, optional): session whose pooled connections are used, e.g. `config.Server.session`. Defaults to None (a session for this fetch only).
+
+    Raises:
+        ValueError: if the content is larger than `max_size`
+        TimeoutError: if the download takes longer than `total_timeout`
+        requests.exceptions.RequestException: if the content cannot be fetched
+
+    Returns:
+        int: the size in bytes of the content
+    """
+    if session is None:
+        with requests.Session() as session:
+            return stream_url_as_base64(url, write, max_size, timeout, total_timeout, chunk_size, session)
+    deadline = time.monotonic() + total_timeout if total_timeout is not None else None
+    chunk_size = max(chunk_size // 3, 1) * 3
+    with session.get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        length = response.headers.get("Content-Length")
+        if max_size is not None and length is not None and length.isdigit() and int(length) > max_size:
+            raise ValueError(f"The content at {url} is larger than {max_size} bytes")
+        size = 0
+        rest = b""
+        for chunk in response.iter_content(chunk_size):
+            size += len(chunk)
+            if max_size is not None and size > max_size:
+                raise ValueError(f"The content at {url} is larger than {max_size} bytes")
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Fetching {url} took longer than {total_timeout} seconds")
+            data = rest + chunk if rest else chunk
+            cut = len(data) - len(data) % 3
+            rest = data[cut:]
+            if cut:
+                write(base64.b64encode(memoryview(data)[:cut]))
+        if rest:
+            write(base64.b64encode(rest))
+    return size
+
+
+def urls_as_base64(
+    urls: Iterable[str],
+    max_workers: int = 8,
+    max_size: int = None,
+    timeout: Union[float, Tuple[float, float]] = FETCH_TIMEOUT,
+    total_timeout: float = None,
+    session: requests.Session = None,
+) -> List[str]:
+    """Fetch the content at several URLs concurrently as base64, see `url_as_base64`.
+
+    Args:
+        urls (Iterable[str]): the URLs
+        max_workers (int, optional): maximum number of URLs fetched at the same time. Defaults to 8.
+        max_size (int, optional): maximum size in bytes of the content at each URL. Defaults to None (unlimited).
+        timeout (Union[float, Tuple[float, float]], optional): connect and read timeout in seconds. Defaults to `FETCH_TIMEOUT`.
+        total_timeout (float, optional): maximum time in seconds for each download. Defaults to None (unlimited).
+        session (requests.Session, optional): session whose pooled connections are used, e.g. `config.Server.session`.
+            Defaults to None (a session with a pool of `FETCH_POOL_SIZE` connections per host for these fetches only).
+
+    Raises:
+        ValueError: if the content at a URL is larger than `max_size`
+        TimeoutError: if a download takes longer than `total_timeout`
+        requests.exceptions.RequestException: if the content at a URL cannot be fetched
+
+    Returns:
+        List[str]: base64 representation of the content at each URL, in the order of `urls`
+    """
+    urls = list(urls)
+    if not urls:
+        return []
+    if session is None:
+        with requests.Session() as session:
+            adapter = requests.adapters.HTTPAdapter(pool_connections=FETCH_POOL_SIZE, pool_maxsize=FETCH_POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            return urls_as_base64(urls, max_workers, max_size, timeout, total_timeout, session)
+    with ThreadPoolExecutor(min(max_workers, len(urls))) as executor:
+        return list(executor.map(lambda url: url_as_base64(url, max_size, timeout, total_timeout, session), urls))
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress a stream of chunks to the gzip format, one chunk at a time.
+
+    Args:
+        chunks (Iterable[bytes]): the chunks to compress
+        level (int, optional): compression level from 1 (fastest) to 9 (smallest). Defaults to 6.
+
+    Yields:
+        bytes: the next piece of gzip compressed data
+    """
+    # wbits 31: deflate with a gzip header and trailer
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def decode_base64_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Decode a base64 stream that arrives in chunks of arbitrary size.
+    Every chunk is decoded as soon as a complete group of 4 base64 characters is available, whitespace is ignored.
+
+    Args:
+        chunks (Iterable[bytes]): the base64 encoded chunks
+
+    Yields:
+        bytes: the decoded chunks
+    """
+    rest = b""
+    for chunk in chunks:
+        data = rest + b"".join(chunk.split())
+        cut = len(data) - len(data) % 4
+        rest = data[cut:]
+        if cut:
+            yield base64.b64decode(data[:cut])
+    if rest:
+        yield base64.b64decode(rest + b"=" * (-len(rest) % 4))
+
+
+async def decode_base64_chunks_async(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Async version of `decode_base64_chunks`.
+
+    Args:
+        chunks (AsyncIterator[bytes]): the base64 encoded chunks
+
+    Yields:
+        bytes: the decoded chunks
+    """
+    rest = b""
+    async for chunk in chunks:
+        data = rest + b"".join(chunk.split())
+        cut = len(data) - len(data) % 4
+        rest = data[cut:]
+        if cut:
+            yield base64.b64decode(data[:cut])
+    if rest:
+        yield base64.b64decode(rest + b"=" * (-len(rest) % 4))
@@ -0,0 +1,644 @@
+import base64
+import enum
+import hashlib
+import json
+import mmap
+import os
+import uuid
+import weakref
+from abc import abstractmethod
+from collections.abc import Sequence
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+CHUNK_SIZE = 64 * 1024
+"""Size in bytes of the chunks in which a JSON body is written."""
+
+BATCH_SIZE = 1024
+"""Number of items of a `LazyArray` that are created and encoded at the same time."""
+
+BACKENDS = ("orjson", "json")
+"""The supported JSON backends, see `set_backend`."""
+
+_backend = "orjson" if orjson is not None else "json"
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS if orjson is not None else 0
+
+
+class LazyBase64:
+    """The base64 representation of a local file, of raw data or of a binary file object, which is only encoded when it is written.
+
+    A LazyBase64 can be used wherever a base64 string is expected in the dict representation of a print job.
+    `iter_json` encodes it incrementally into the request body, so the base64 string is never held in memory.
+    A local file is memory-mapped while it is encoded or hashed, so it is not copied into memory either.
+    A file object (e.g. the spool of a `Response`) is read from its start in pieces every time it is encoded, so its content must not change.
+    `str()` returns the complete base64 string.
+    """
+
+    def __init__(self, source: Union[str, bytes, BinaryIO]):
+        """
+        Args:
+            source (Union[str, bytes, BinaryIO]): path of a local file, a bytes-like object containing the raw data, or a seekable binary file object
+        """
+        self.source: Union[str, bytes, BinaryIO] = source
+        self._digests: Tuple[Any, Dict[str, str]] = None
+
+    def iter_encoded(self, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """Iterate over the base64 representation in chunks.
+        The source is read in pieces of a multiple of 3 bytes, so every piece encodes without padding except the last one.
+
+        Args:
+            chunk_size (int, optional): maximum size in bytes of the encoded chunks. Defaults to `CHUNK_SIZE`.
+
+        Yields:
+            bytes: the next chunk of the base64 representation
+        """
+        read_size = max(chunk_size // 4, 1) * 3
+        if hasattr(self.source, "read"):
+            for data in self._read(read_size):
+                yield base64.b64encode(data)
+            return
+        with self._raw() as data:
+            for start in range(0, len(data), read_size):
+                yield base64.b64encode(data[start:start + read_size])
+
+    def hexdigests(self) -> Dict[str, str]:
+        """The SHA-256 and MD5 digests of the raw data, computed in one pass.
+        For a file, they are computed again only when the size or modification time of the file changes.
+
+        Returns:
+            Dict[str, str]: the hexadecimal digests by algorithm name ("sha256" and "md5")
+        """
+        if isinstance(self.source, str):
+            stat = os.stat(self.source)
+            key = (stat.st_size, stat.st_mtime_ns)
+        else:
+            key = None
+        if self._digests is None or self._digests[0] != key:
+            digests = {"sha256": hashlib.sha256(), "md5": hashlib.md5()}
+            if hasattr(self.source, "read"):
+                for data in self._read(CHUNK_SIZE * 16):
+                    for digest in digests.values():
+                        digest.update(data)
+            else:
+                with self._raw() as data:
+                    for digest in digests.values():
+                        digest.update(data)
+            self._digests = (key, {name: digest.hexdigest() for name, digest in digests.items()})
+        return self._digests[1]
+
+    def _read(self, size: int) -> Iterator[bytes]:
+        """Read a file object source from its start.
+
+        Args:
+            size (int): size in bytes of the pieces
+
+        Yields:
+            bytes: the next piece of the raw data
+        """
+        self.source.seek(0)
+        while True:
+            data = self.source.read(size)
+            if not data:
+                return
+            yield data
+
+    @contextmanager
+    def _raw(self) -> Iterator[memoryview]:
+        """The raw data, with a local file mapped into memory instead of read.
+
+        Yields:
+            memoryview: the raw data, only valid inside the context
+        """
+        if not isinstance(self.source, str):
+            with memoryview(self.source) as data:
+                yield data
+            return
+        with open(self.source, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # an empty file cannot be mapped
+                yield memoryview(b"")
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as data:
+                yield data
+
+    def __str__(self) -> str:
+        return b"".join(self.iter_encoded()).decode("ascii")
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, LazyBase64):
+            return self.source == other.source or str(self) == str(other)
+        if isinstance(other, str):
+            return str(self) == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    def __repr__(self) -> str:
+        if isinstance(self.source, str) or hasattr(self.source, "read"):
+            return f"LazyBase64({self.source!r})"
+        return f"LazyBase64(<{len(self.source)} bytes>)"
+
+
+class InternedBase64:
+    """A base64 string shared by all elements that use the same content, e.g. the same icon in every row of a loop.
+
+    Obtain it with `intern_base64`, which returns the same object for equal strings, so the string is held in memory once.
+    `iter_json` encodes the document with a short placeholder for each occurrence and writes the same encoded bytes for every one of them,
+    so the base64 string is encoded to bytes once per process instead of once per occurrence.
+    An InternedBase64 is immutable: copies (also deep copies of element collections) are the object itself.
+    """
+
+    def __init__(self, string: str):
+        """You should never need to construct an InternedBase64 manually, see `intern_base64`.
+
+        Args:
+            string (str): the base64 string
+        """
+        self.string: str = string
+        self._encoded: bytes = None
+
+    def iter_encoded(self, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """Iterate over the encoded base64 string in chunks.
+
+        Args:
+            chunk_size (int, optional): maximum size in bytes of the chunks. Defaults to `CHUNK_SIZE`.
+
+        Yields:
+            bytes: the next chunk of the base64 string
+        """
+        if self._encoded is None:
+            self._encoded = self.string.encode("ascii")
+        yield from _iter_slices(memoryview(self._encoded), chunk_size)
+
+    def __str__(self) -> str:
+        return self.string
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, InternedBase64):
+            return self is other or self.string == other.string
+        if isinstance(other, (str, LazyBase64)):
+            return other == self.string
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.string)
+
+    def __copy__(self) -> "InternedBase64":
+        return self
+
+    def __deepcopy__(self, memo: Dict) -> "InternedBase64":
+        return self
+
+    def __repr__(self) -> str:
+        return f"InternedBase64(<{len(self.string)} characters>)"
+
+
+_interned: "weakref.WeakValueDictionary[str, InternedBase64]" = weakref.WeakValueDictionary()
+
+
+class RawJSON:
+    """A value that is encoded as JSON already, e.g. a file of a split print job that was encoded to measure its size.
+
+    A RawJSON can be used wherever a value is expected in the dict representation of a print job.
+    `iter_json` writes its bytes as they are, so the value is not encoded again.
+    """
+
+    def __init__(self, data: bytes):
+        """
+        Args:
+            data (bytes): the UTF-8 encoded JSON representation of the value, as written by `dumps_bytes`
+        """
+        self.data: bytes = data
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        return f"RawJSON(<{len(self.data)} bytes>)"
+
+
+class LazyArray(Sequence):
+    """Abstract base class for a JSON array whose items are only created while it is written, e.g. the rows of a columnar loop.
+
+    A LazyArray can be used wherever a list is expected in the dict representation of a print job.
+    `iter_json` creates and encodes its items in batches of `BATCH_SIZE`, so they are never all held in memory.
+    Iterating over it creates the items batch by batch, comparing it with a list creates all of them.
+    """
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    @abstractmethod
+    def iter_batches(self, batch_size: int = BATCH_SIZE, start: int = 0) -> Iterator[List[Any]]:
+        """Create the items in batches.
+
+        Args:
+            batch_size (int, optional): maximum number of items in a batch. Defaults to `BATCH_SIZE`.
+            start (int, optional): index of the first item. Defaults to 0.
+
+        Yields:
+            List[Any]: the next batch of items
+        """
+        pass
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("LazyArray index out of range")
+        return next(self.iter_batches(1, index))[0]
+
+    def __iter__(self) -> Iterator[Any]:
+        for batch in self.iter_batches():
+            yield from batch
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, LazyArray)):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+
+def intern_base64(string: Union[str, InternedBase64]) -> InternedBase64:
+    """The `InternedBase64` for a base64 string, the same object for all equal strings as long as it is in use.
+
+    Args:
+        string (Union[str, InternedBase64]): the base64 string
+
+    Returns:
+        InternedBase64: the interned base64 string
+    """
+    if isinstance(string, InternedBase64):
+        return string
+    interned = _interned.get(string)
+    if interned is None:
+        interned = _interned.setdefault(string, InternedBase64(string))
+    return interned
+
+
+def set_backend(name: str = "auto"):
+    """Set the JSON backend used for all serialization in this package.
+
+    "orjson" uses the much faster [orjson](https://github.com/ijl/orjson) package, which has to be installed
+    (`pip install cloudofficeprint[fast]`). "json" uses the standard library. "auto" selects orjson if it is installed.
+    Both backends produce the same compact UTF-8 encoded JSON and accept the same objects, see `dumps_bytes`.
+
+    Args:
+        name (str, optional): "auto", "orjson" or "json". Defaults to "auto".
+
+    Raises:
+        ValueError: if the backend is unknown or not installed
+    """
+    global _backend
+    if name == "auto":
+        name = "orjson" if orjson is not None else "json"
+    if name not in BACKENDS:
+        raise ValueError(f'Unknown JSON backend "{name}", choose from "auto", {", ".join(BACKENDS)}')
+    if name == "orjson" and orjson is None:
+        raise ValueError('The JSON backend "orjson" is not installed')
+    _backend = name
+
+
+def get_backend() -> str:
+    """
+    Returns:
+        str: the name of the JSON backend in use, see `set_backend`
+    """
+    return _backend
+
+
+def default(obj: Any) -> Any:
+    """`default` hook for the JSON encoders that serializes a `LazyBase64` or an `InternedBase64` as its base64 string,
+    a `LazyArray` as the list of its items and a `RawJSON` as the value it represents.
+    The types that only one of the backends serializes by itself are converted the way orjson does (an enum as its value,
+    a UUID as its string and a subclass of float as a float), so both backends accept the same objects.
+
+    Args:
+        obj (Any): object that the encoder cannot serialize by itself
+
+    Raises:
+        TypeError: if `obj` is not of one of the types above, e.g. a date or a numpy scalar
+
+    Returns:
+        Any: the base64 string, the items or the converted value
+    """
+    if isinstance(obj, (LazyBase64, InternedBase64)):
+        return str(obj)
+    if isinstance(obj, LazyArray):
+        return list(obj)
+    if isinstance(obj, RawJSON):
+        return loads(obj.data)
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, float):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _float_str(value: float) -> str:
+    """The JSON representation of a float as orjson writes it, for the standard library backend.
+    The digits are those of `repr`, but the exponent has no plus sign or leading zeros, 1e-05 up to 1e-04 are written without exponent,
+    and NaN and infinity, which are not valid JSON, are written as null.
+
+    Args:
+        value (float): the float
+
+    Returns:
+        str: the JSON representation
+    """
+    if value != value or value in (float("inf"), float("-inf")):
+        return "null"
+    text = float.__repr__(value)
+    mantissa, e, exponent = text.partition("e")
+    if not e:
+        return text
+    exponent = int(exponent)
+    if exponent == -5:
+        sign = "-" if mantissa.startswith("-") else ""
+        return sign + "0.0000" + mantissa.lstrip("-").replace(".", "")
+    return f"{mantissa}e{exponent}"
+
+
+def _dumps_stdlib(obj: Any, hook: Callable[[Any], Any]) -> bytes:
+    """Serialize `obj` with the standard library, writing floats as orjson does (see `_float_str`).
+
+    The fast C encoder of the standard library writes floats with `repr`, which only differs for floats with an exponent and for NaN and infinity.
+    Only if the output may contain such a float, the object is serialized again with the Python encoder and `_float_str`.
+
+    Args:
+        obj (Any): the object to serialize
+        hook (Callable[[Any], Any]): called for objects the encoder cannot serialize by itself
+
+    Returns:
+        bytes: the JSON document
+    """
+    text = json.dumps(obj, default=hook, separators=(",", ":"), ensure_ascii=False)
+    if "e+" not in text and "e-" not in text and "NaN" not in text and "Infinity" not in text:
+        return text.encode("utf-8")
+    iterencode = json.encoder._make_iterencode(
+        {}, hook, json.encoder.encode_basestring, None, _float_str, ":", ",", False, False, True
+    )
+    return "".join(iterencode(obj, 0)).encode("utf-8")
+
+
+def dumps_bytes(obj: Any, hook: Callable[[Any], Any] = default) -> bytes:
+    """Serialize `obj` to compact UTF-8 encoded JSON with the selected backend (see `set_backend`).
+
+    Both backends write the same bytes for the same object: floats are written as orjson writes them, NaN and infinity as null,
+    and objects that are no JSON types (e.g. dates or numpy scalars) are rejected unless `hook` converts them.
+
+    Args:
+        obj (Any): the object to serialize
+        hook (Callable[[Any], Any], optional): called for objects the encoder cannot serialize by itself. Defaults to `default`.
+
+    Raises:
+        TypeError: if `obj` contains an object that cannot be serialized
+
+    Returns:
+        bytes: the JSON document
+    """
+    if _backend == "orjson":
+        try:
+            # dates and dataclasses are passed to the hook, since the standard library does not serialize them either
+            return orjson.dumps(obj, default=hook, option=_ORJSON_OPTIONS)
+        except TypeError:
+            # e.g. integers that do not fit in 64 bits, which the standard library does support
+            pass
+    return _dumps_stdlib(obj, hook)
+
+
+def dumps(obj: Any) -> str:
+    """Serialize `obj` to a compact JSON string with the selected backend (see `set_backend`).
+
+    Args:
+        obj (Any): the object to serialize
+
+    Returns:
+        str: the JSON string
+    """
+    return dumps_bytes(obj).decode("utf-8")
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Deserialize a JSON document with the selected backend (see `set_backend`).
+
+    Args:
+        data (Union[str, bytes]): the JSON document
+
+    Returns:
+        Any: the deserialized object
+    """
+    if _backend == "orjson":
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def iter_json(obj: Any, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Serialize `obj` to JSON incrementally.
+
+    The output is identical to `dumps_bytes(obj)`, but it is produced in chunks of at most `chunk_size` bytes.
+    The document is encoded one container at a time, so only about one chunk of it is held in memory in encoded form:
+    dicts are written key by key, with their flat values (scalars and short lists or dicts of scalars) encoded together by the selected backend.
+    The first item of a list is written the same way, and the following items are encoded by the backend in batches
+    of about `chunk_size` bytes, estimated from the size of the items written before, so a loop of many small rows takes few calls to the backend.
+    A placeholder is left for every `LazyBase64`, `InternedBase64`, `LazyArray` and `RawJSON` value. Those values are only read and encoded while their chunks are written,
+    so files loaded lazily never take up memory as a whole, all occurrences of an interned string are written from the same encoded bytes,
+    the items of a lazy array are created in batches of `BATCH_SIZE` and values encoded before are not encoded again.
+
+    Args:
+        obj (Any): the object to serialize
+        chunk_size (int, optional): maximum size in bytes of the chunks. Defaults to `CHUNK_SIZE`.
+
+    Yields:
+        bytes: the next chunk of the JSON document
+    """
+    prefix = "lazy-base64-" + uuid.uuid4().hex + "-"
+    buffer = bytearray()
+    for part in _iter_parts(obj, prefix, chunk_size):
+        buffer += part
+        if len(buffer) >= chunk_size:
+            end = len(buffer) - len(buffer) % chunk_size
+            yield from _iter_slices(memoryview(buffer)[:end], chunk_size)
+            del buffer[:end]
+    if buffer:
+        yield bytes(buffer)
+
+
+def _is_flat(value: Any) -> bool:
+    """Whether `value` is encoded as a whole by `iter_json`: a scalar, or a dict or a list of at most `BATCH_SIZE` scalars.
+
+    Args:
+        value (Any): the value
+
+    Returns:
+        bool: whether the value is flat
+    """
+    if isinstance(value, dict):
+        value = value.values()
+    elif not isinstance(value, (list, tuple)):
+        return not isinstance(value, LazyArray)
+    return len(value) <= BATCH_SIZE and not any(isinstance(item, (dict, list, tuple, LazyArray)) for item in value)
+
+
+def _iter_parts(obj: Any, prefix: str, chunk_size: int) -> Iterator[bytes]:
+    """Yield the pieces of the JSON representation of `obj`, see `iter_json`.
+
+    Args:
+        obj (Any): the object to serialize
+        prefix (str): prefix of the placeholders of the lazy values
+        chunk_size (int): size in bytes of the chunks in which the document is written
+
+    Yields:
+        bytes: the next piece of the JSON document, never empty
+    """
+    if _is_flat(obj):
+        yield from _iter_encoded(obj, prefix, chunk_size)
+    elif isinstance(obj, dict):
+        yield b"{"
+        first = True
+        batch = {}
+        for key, value in obj.items():
+            flat = _is_flat(value)
+            if flat:
+                batch[key] = value
+                if len(batch) < BATCH_SIZE:
+                    continue
+            if batch:
+                if not first:
+                    yield b","
+                first = False
+                # the batch is encoded as a dict, of which the braces are left out
+                yield from _strip(_iter_encoded(batch, prefix, chunk_size))
+                batch = {}
+            if not flat:
+                if not first:
+                    yield b","
+                first = False
+                # the key is encoded by the backend, so keys that are no strings are converted as in `dumps_bytes`
+                yield dumps_bytes({key: 0})[1:-2]
+                yield from _iter_parts(value, prefix, chunk_size)
+        if batch:
+            if not first:
+                yield b","
+            yield from _strip(_iter_encoded(batch, prefix, chunk_size))
+        yield b"}"
+    else:
+        yield b"["
+        first = True
+        item_size = None
+        for items in obj.iter_batches() if isinstance(obj, LazyArray) else [obj]:
+            index = 0
+            while index < len(items):
+                if not first:
+                    yield b","
+                first = False
+                if item_size is None or item_size >= chunk_size:
+                    # an item of unknown or large size is written one container at a time
+                    parts = _iter_parts(items[index], prefix, chunk_size)
+                    count = 1
+                else:
+                    # the batch is encoded as a list, of which the brackets are left out
+                    count = min(BATCH_SIZE, chunk_size // max(item_size, 1))
+                    parts = _strip(_iter_encoded(items[index:index + count], prefix, chunk_size))
+                size = 0
+                for part in parts:
+                    size += len(part)
+                    yield part
+                index += count
+                item_size = size // count
+        yield b"]"
+
+
+def _strip(parts: Iterator[bytes]) -> Iterator[bytes]:
+    """Leave out the first and the last byte of the pieces of an encoded container, i.e. its brackets or braces.
+
+    Args:
+        parts (Iterator[bytes]): the pieces of the encoded container, none of them empty
+
+    Yields:
+        bytes: the pieces of its contents, none of them empty
+    """
+    previous = next(parts)[1:]
+    for part in parts:
+        if previous:
+            yield previous
+        previous = part
+    if len(previous) > 1:
+        yield previous[:-1]
+
+
+def _iter_encoded(obj: Any, prefix: str, chunk_size: int) -> Iterator[bytes]:
+    """Encode `obj` with the selected backend, with the lazy values in it encoded while they are written.
+
+    Args:
+        obj (Any): the object to encode
+        prefix (str): prefix of the placeholders of the lazy values
+        chunk_size (int): size in bytes of the chunks in which the document is written
+
+    Yields:
+        bytes: the next piece of the JSON representation, never empty
+    """
+    lazy = {}
+
+    def hook(value: Any) -> Any:
+        if isinstance(value, (LazyBase64, InternedBase64, LazyArray, RawJSON)):
+            lazy[id(value)] = value
+            return prefix + str(id(value))
+        return default(value)
+
+    data = dumps_bytes(obj, hook)
+    if not lazy:
+        yield data
+        return
+    encoded = memoryview(data)
+    marker = b'"' + prefix.encode("ascii")
+    start = 0
+    while True:
+        end = data.find(marker, start)
+        if end < 0:
+            break
+        close = data.index(b'"', end + 1)
+        value = lazy[int(data[end + len(marker):close])]
+        if isinstance(value, (LazyArray, RawJSON)):
+            # the array or the raw JSON replaces the placeholder including its quotes
+            if end > start:
+                yield bytes(encoded[start:end])
+            if isinstance(value, RawJSON):
+                yield from _iter_slices(memoryview(value.data), chunk_size)
+            else:
+                yield from _iter_parts(value, prefix, chunk_size)
+            start = close + 1
+        else:
+            # keep the opening quote, the placeholder is replaced by the encoded value
+            yield bytes(encoded[start:end + 1])
+            yield from (chunk for chunk in value.iter_encoded(chunk_size) if chunk)
+            start = close
+    if start < len(data):
+        yield bytes(encoded[start:])
+
+
+def _iter_slices(data: memoryview, chunk_size: int) -> Iterator[bytes]:
+    """Split `data` into slices of at most `chunk_size` bytes.
+
+    Args:
+        data (memoryview): the data to split
+        chunk_size (int): maximum size of the slices
+
+    Yields:
+        bytes: the next slice
+    """
+    for start in range(0, len(data), chunk_size):
+        yield bytes(data[start:start + chunk_size])
@@ -0,0 +1,114 @@
+import asyncio
+import threading
+from typing import Callable, Dict, Hashable, List, Set, Tuple
+
+
+class _Flight:
+    """The work in progress for one key of a `SingleFlight`, which threads and coroutines can wait for."""
+
+    def __init__(self):
+        self._finished = threading.Event()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block until the work is finished."""
+        self._finished.wait()
+
+    async def wait_async(self):
+        """Wait until the work is finished, without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            if self._finished.is_set():
+                return
+            self._waiters.append((loop, future))
+        await future
+
+    def finish(self):
+        """Wake up all threads and coroutines waiting for the work."""
+        with self._lock:
+            self._finished.set()
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class SingleFlight:
+    """Lets one caller at a time do the work for a key, while the other callers for that key wait until it is finished.
+
+    Callers can be threads as well as coroutines on any event loop; coroutines wait without blocking their event loop.
+    A caller that leads the work has to call `SingleFlight.release` when it is finished, also when it failed,
+    after which a waiting caller checks again whether the work is done or takes the lead itself.
+    If the leader gives up on the work for a key instead, all callers for that key go ahead without waiting,
+    until `SingleFlight.reset` is called.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._given_up: Set[Hashable] = set()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: Hashable, done: Callable[[], bool]) -> bool:
+        """Wait until the work for `key` is done, or take the lead to do it.
+
+        Args:
+            key (Hashable): identifies the work
+            done (Callable[[], bool]): checks whether the work is done, called while no other caller can take the lead
+
+        Returns:
+            bool: True if the caller leads the work and has to call `SingleFlight.release`, False if the work is done or was given up
+        """
+        while True:
+            with self._lock:
+                if key in self._given_up or done():
+                    return False
+                flight = self._flights.get(key)
+                if flight is None:
+                    self._flights[key] = _Flight()
+                    return True
+            flight.wait()
+
+    async def acquire_async(self, key: Hashable, done: Callable[[], bool]) -> bool:
+        """Async version of `SingleFlight.acquire`.
+
+        Args:
+            key (Hashable): identifies the work
+            done (Callable[[], bool]): checks whether the work is done, called while no other caller can take the lead
+
+        Returns:
+            bool: True if the caller leads the work and has to call `SingleFlight.release`, False if the work is done or was given up
+        """
+        while True:
+            with self._lock:
+                if key in self._given_up or done():
+                    return False
+                flight = self._flights.get(key)
+                if flight is None:
+                    self._flights[key] = _Flight()
+                    return True
+            await flight.wait_async()
+
+    def release(self, key: Hashable, give_up: bool = False):
+        """Finish the work for `key` led by the caller and wake up the callers waiting for it.
+
+        Args:
+            key (Hashable): identifies the work
+            give_up (bool, optional): whether the work cannot be done, so no other caller should take the lead. Defaults to False.
+        """
+        with self._lock:
+            flight = self._flights.pop(key, None)
+            if give_up:
+                self._given_up.add(key)
+        if flight is not None:
+            flight.finish()
+
+    def reset(self):
+        """Forget the keys for which the work was given up, so callers wait for a leader again."""
+        with self._lock:
+            self._given_up.clear()
@@ -0,0 +1,254 @@
+"""
+Module containing the PollingClient class, which is also exposed at package level.
+
+With output polling (`config.OutputConfig` with `output_polling=True`), the Cloud Office Print server answers a print job with a link
+instead of the output file, and the output can be downloaded from that link once it is rendered.
+A `PollingClient` submits print jobs this way and collects their outputs.
+"""
+
+import asyncio
+import copy
+import time
+from typing import AsyncIterator, Iterable, Optional, Tuple, Type
+from urllib.parse import urlencode, urljoin
+
+from .config import AsyncResponse, Server, ServerPool
+from .exceptions import COPError
+from .own_utils import json_utils
+from .printjob import BatchResult, PrintJob
+from .response import Response
+
+NOT_READY = (202, 204, 425)
+"""Status codes with which the server answers a download link of an output that is not rendered yet.
+A 404 is only treated as such within `PollingClient.not_found_grace` seconds after submission."""
+
+
+class PollingHandle:
+    """A print job submitted with output polling, see `PollingClient.submit`."""
+
+    def __init__(self, printjob: PrintJob, server: Server, link: str, secret_key: str = None):
+        """You should never need to construct a PollingHandle manually.
+
+        Args:
+            printjob (PrintJob): the submitted print job
+            server (Server): the server that accepted the print job, which is polled for its output (a single server of a `config.ServerPool`)
+            link (str): the absolute download link returned by the server
+            secret_key (str, optional): the secret key with which the output is encrypted on the server. Defaults to None.
+        """
+        self.printjob: PrintJob = printjob
+        self.server: Server = server
+        self.link: str = link
+        self.secret_key: str = secret_key
+        self.submitted: float = time.monotonic()
+        self.polls: int = 0
+
+    @property
+    def download_url(self) -> str:
+        """The URL from which the output is downloaded, including the secret key to decrypt it.
+
+        Returns:
+            str: the download URL
+        """
+        if self.secret_key is None:
+            return self.link
+        separator = "&" if "?" in self.link else "?"
+        return self.link + separator + urlencode({"secretkey": self.secret_key})
+
+
+class PollingClient:
+    """Client that submits print jobs with output polling and downloads their outputs as soon as they are rendered.
+
+    Every submitted print job is polled with adaptive backoff: the first poll is scheduled after the average time
+    that previous outputs took to be rendered, and the interval between polls grows by `backoff` up to `max_interval`.
+    At most `max_in_flight` requests (submissions, polls and downloads) are sent to the server at the same time.
+    Outputs are streamed into a `Response` while they are downloaded.
+    """
+
+    def __init__(self,
+                 server: Server,
+                 max_in_flight: int = 8,
+                 initial_interval: float = 0.5,
+                 max_interval: float = 10.0,
+                 backoff: float = 1.5,
+                 timeout: float = 600.0,
+                 not_found_grace: float = 30.0):
+        """
+        Args:
+            server (Server): the server or pool of servers the print jobs are submitted to; every output is polled on the server that accepted its print job
+            max_in_flight (int, optional): maximum number of requests sent to the server at the same time. Defaults to 8.
+            initial_interval (float, optional): delay in seconds before the first poll, until render times have been observed. Defaults to 0.5.
+            max_interval (float, optional): maximum delay in seconds between two polls of an output. Defaults to 10.0.
+            backoff (float, optional): factor by which the delay grows after every poll of an output that is not ready. Defaults to 1.5.
+            timeout (float, optional): time in seconds after submission after which an output that is not ready is given up. Defaults to 600.0.
+            not_found_grace (float, optional): time in seconds after submission during which a download link that is not found (404)
+                is polled again, as an output that is not rendered yet. Afterwards a 404 is an error. Defaults to 30.0.
+        """
+        self.server: Server = server
+        self.max_in_flight: int = max_in_flight
+        self.initial_interval: float = initial_interval
+        self.max_interval: float = max_interval
+        self.backoff: float = backoff
+        self.timeout: float = timeout
+        self.not_found_grace: float = not_found_grace
+        self._render_time: Optional[float] = None
+        self._semaphores = {}
+
+    @property
+    def _semaphore(self) -> asyncio.Semaphore:
+        """The semaphore bounding the requests in flight on the running event loop.
+
+        Returns:
+            asyncio.Semaphore: the semaphore
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_in_flight)
+        return semaphore
+
+    async def submit(self, printjob: PrintJob) -> PollingHandle:
+        """Submit a print job with output polling.
+        Output polling is enabled on a copy of the print job if its output config does not enable it yet.
+
+        Args:
+            printjob (PrintJob): the print job to submit
+
+        Raises:
+            COPError: Error when the HTML status code is not 200
+
+        Returns:
+            PollingHandle: the handle to collect the output with
+        """
+        if not printjob.output_config.output_polling:
+            printjob = copy.copy(printjob)
+            printjob.output_config = copy.copy(printjob.output_config)
+            printjob.output_config.output_polling = True
+        async with self._semaphore:
+            response = await printjob._post_async()
+            await response.read()
+        if response.status_code != 200:
+            raise COPError(response.text)
+        server = self._accepting_server(response)
+        return PollingHandle(
+            printjob,
+            server,
+            urljoin(server.url, PollingClient._parse_link(response.text)),
+            printjob.output_config.secret_key,
+        )
+
+    def _accepting_server(self, response: AsyncResponse) -> Server:
+        """The server that accepted a print job, which keeps its output.
+
+        Args:
+            response (AsyncResponse): the answer to the submission of the print job
+
+        Raises:
+            ConnectionError: Error when the answer does not come from a server of the pool
+
+        Returns:
+            Server: the server of `PollingClient.server` that answered
+        """
+        if not isinstance(self.server, ServerPool):
+            return self.server
+        server = self.server._server_for(response.url)
+        if server is None:
+            raise ConnectionError(f"The answer from {response.url} does not come from a server in the pool {self.server.url}")
+        return server
+
+    async def collect(self, handle: PollingHandle) -> Response:
+        """Poll the download link of a submitted print job until its output is rendered, and download it.
+
+        Args:
+            handle (PollingHandle): the handle returned by `PollingClient.submit`
+
+        Raises:
+            COPError: Error when the server answers the poll with an error
+            TimeoutError: Error when the output is not ready within `PollingClient.timeout` seconds after submission
+
+        Returns:
+            Response: the output of the print job
+        """
+        delay = self._render_time if self._render_time is not None else self.initial_interval
+        while True:
+            remaining = handle.submitted + self.timeout - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"The output at {handle.link} was not ready within {self.timeout} seconds")
+            await asyncio.sleep(min(delay, self.max_interval, remaining))
+            handle.polls += 1
+            async with self._semaphore:
+                response = await handle.server._get_async(handle.download_url, stream=True)
+                if response.status_code == 200:
+                    self._record_render_time(time.monotonic() - handle.submitted)
+                    return await Response._from_async_response(response, handle.printjob._spool_threshold)
+                await response.read()
+            pending = response.status_code in NOT_READY or (
+                response.status_code == 404 and time.monotonic() - handle.submitted < self.not_found_grace
+            )
+            if not pending:
+                raise COPError(response.text)
+            delay = min(delay * self.backoff, self.max_interval)
+
+    async def execute(self,
+                      printjobs: Iterable[PrintJob],
+                      capture: Tuple[Type[Exception], ...] = (COPError, TimeoutError)) -> AsyncIterator[BatchResult]:
+        """Submit print jobs with output polling and collect their outputs, in the order in which they are ready.
+
+        An error raised for a print job that is an instance of one of the `capture` types is stored in its `BatchResult`
+        instead of aborting the batch; any other error cancels the remaining print jobs and is raised.
+
+        Args:
+            printjobs (Iterable[PrintJob]): the print jobs to execute
+            capture (Tuple[Type[Exception], ...], optional): the errors to store per print job. Defaults to (COPError, TimeoutError).
+
+        Yields:
+            BatchResult: the outcome of each print job
+        """
+        async def execute(index: int, printjob: PrintJob) -> BatchResult:
+            try:
+                return BatchResult(index, printjob, response=await self.collect(await self.submit(printjob)))
+            except capture as err:
+                return BatchResult(index, printjob, error=err)
+
+        pending = {asyncio.ensure_future(execute(index, printjob)) for index, printjob in enumerate(printjobs)}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _record_render_time(self, duration: float):
+        """Update the moving average of the time outputs take to be ready, which schedules the first poll of the next outputs.
+
+        Args:
+            duration (float): time in seconds between the submission of a print job and its output being ready
+        """
+        if self._render_time is None:
+            self._render_time = duration
+        else:
+            self._render_time += 0.3 * (duration - self._render_time)
+
+    @staticmethod
+    def _parse_link(text: str) -> str:
+        """Extract the download link from the answer of the server to a print job with output polling.
+
+        Args:
+            text (str): the body of the answer, either the link itself or a JSON object containing it
+
+        Returns:
+            str: the download link, absolute or relative to the server URL
+        """
+        text = text.strip()
+        try:
+            answer = json_utils.loads(text)
+        except ValueError:
+            return text
+        if isinstance(answer, str):
+            return answer
+        if isinstance(answer, dict):
+            links = [value for key, value in answer.items() if isinstance(value, str) and ("link" in key or "url" in key)]
+            if links:
+                return links[0]
+        return text
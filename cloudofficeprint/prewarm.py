@@ -0,0 +1,295 @@
+"""
+Module containing the pre-warming of templates, used by `Template.prewarm` and `Template.prewarm_many`.
+
+Pre-warming uploads templates with `Template.should_hash` to every server before a batch of print jobs,
+so the servers cache them and the print jobs of the batch only send the hashes of the templates.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple, Union
+
+import requests
+
+from .config import AsyncResponse, HashStore, OutputConfig, Server, ServerPool
+from .elements import ElementCollection
+from .exceptions import COPError
+from .printjob import PrintJob
+from .template import Template
+
+ServersLike = Union[Server, Iterable[Server]]
+
+_ERRORS = (COPError, ConnectionError, requests.exceptions.RequestException, asyncio.TimeoutError)
+"""The errors with which pre-warming a template on a server fails, both for the synchronous and the asynchronous path."""
+
+
+class PrewarmResult:
+    """The outcome of pre-warming a template on one server."""
+
+    def __init__(self,
+                 template: Template,
+                 server: Server,
+                 template_hash: str = None,
+                 reachable_seconds: float = None,
+                 seconds: float = 0.0,
+                 uploaded: bool = False,
+                 error: BaseException = None):
+        """You should never need to construct a PrewarmResult manually.
+
+        Args:
+            template (Template): the pre-warmed template
+            server (Server): the server on which the template was pre-warmed, a single server of a pool
+            template_hash (str, optional): the hash the server issued for the template. Defaults to None.
+            reachable_seconds (float, optional): time in seconds it took to check that the server is reachable. Defaults to None.
+            seconds (float, optional): time in seconds it took to pre-warm the template, including the reachability check. Defaults to 0.0.
+            uploaded (bool, optional): whether the template was uploaded, i.e. the server did not know its hash yet. Defaults to False.
+            error (BaseException, optional): the error that occurred. Defaults to None.
+        """
+        self.template: Template = template
+        self.server: Server = server
+        self.template_hash: Optional[str] = template_hash
+        self.reachable_seconds: Optional[float] = reachable_seconds
+        self.seconds: float = seconds
+        self.uploaded: bool = uploaded
+        self.error: Optional[BaseException] = error
+
+    @property
+    def ok(self) -> bool:
+        """Whether the server issued a hash for the template.
+
+        Returns:
+            bool: whether the template was pre-warmed
+        """
+        return self.error is None and self.template_hash is not None
+
+    def __repr__(self) -> str:
+        return (f"PrewarmResult(server={self.server.url!r}, template_hash={self.template_hash!r}, "
+                f"seconds={self.seconds:.3f}, uploaded={self.uploaded}, error={self.error!r})")
+
+
+def prewarm(templates: Iterable[Template], servers: ServersLike, max_workers: int = 8) -> List[PrewarmResult]:
+    """Pre-warm templates on servers concurrently, see `Template.prewarm_many`.
+
+    Args:
+        templates (Iterable[Template]): the templates
+        servers (ServersLike): a server, a `config.ServerPool` or several of them
+        max_workers (int, optional): maximum number of templates uploaded at the same time. Defaults to 8.
+
+    Returns:
+        List[PrewarmResult]: the outcome for every template on every server, by template and then by server
+    """
+    tasks = _tasks(templates, servers)
+    if not tasks:
+        return []
+    def run(task: Tuple[Template, Server, Optional[HashStore]]) -> PrewarmResult:
+        try:
+            return _prewarm(*task)
+        except Exception as err:
+            return _failed(task, err)
+
+    with ThreadPoolExecutor(min(max_workers, len(tasks))) as executor:
+        results = list(executor.map(run, tasks))
+    _record(results, tasks)
+    return results
+
+
+async def prewarm_async(templates: Iterable[Template], servers: ServersLike, max_workers: int = 8) -> List[PrewarmResult]:
+    """Async version of `prewarm`, through the asynchronous transport of the servers.
+
+    Args:
+        templates (Iterable[Template]): the templates
+        servers (ServersLike): a server, a `config.ServerPool` or several of them
+        max_workers (int, optional): maximum number of templates uploaded at the same time. Defaults to 8.
+
+    Returns:
+        List[PrewarmResult]: the outcome for every template on every server, by template and then by server
+    """
+    tasks = _tasks(templates, servers)
+    semaphore = asyncio.Semaphore(max_workers)
+
+    async def run(task: Tuple[Template, Server, Optional[HashStore]]) -> PrewarmResult:
+        async with semaphore:
+            try:
+                return await _prewarm_async(*task)
+            except Exception as err:
+                return _failed(task, err)
+
+    results = list(await asyncio.gather(*(run(task) for task in tasks)))
+    _record(results, tasks)
+    return results
+
+
+def _failed(task: Tuple[Template, Server, Optional[HashStore]], error: Exception) -> PrewarmResult:
+    """The outcome of a task that failed with an unexpected error, which is recorded instead of aborting the other tasks.
+
+    Args:
+        task (Tuple[Template, Server, Optional[HashStore]]): the template, the single server and the hash store
+        error (Exception): the error
+
+    Returns:
+        PrewarmResult: the outcome with the error
+    """
+    template, node, _ = task
+    return PrewarmResult(template, node, error=error)
+
+
+def _tasks(templates: Iterable[Template], servers: ServersLike) -> List[Tuple[Template, Server, Optional[HashStore]]]:
+    """Every template combined with every single server, and the hash store in which the hash for that server is recorded.
+
+    Args:
+        templates (Iterable[Template]): the templates
+        servers (ServersLike): a server, a `config.ServerPool` or several of them
+
+    Returns:
+        List[Tuple[Template, Server, Optional[HashStore]]]: the template, the single server and the hash store of every task
+    """
+    if isinstance(servers, Server):
+        servers = [servers]
+    nodes = []
+    for server in servers:
+        store = server.config.template_hash_store if server.config is not None else None
+        for node in server.servers if isinstance(server, ServerPool) else [server]:
+            # the hash store of a pool is the one consulted by the print jobs sent to the pool
+            nodes.append((node, store))
+    # only templates with should_hash consult a hash store, the others keep the hash themselves
+    return [
+        (template, node, store if template.should_hash and template.resource.digest is not None else None)
+        for template in templates for node, store in nodes
+    ]
+
+
+def _known_hash(template: Template, node: Server, store: Optional[HashStore]) -> Optional[str]:
+    """The hash that the server issued for the template before, according to the hash store or the template itself.
+
+    Args:
+        template (Template): the template
+        node (Server): the single server
+        store (Optional[HashStore]): the hash store
+
+    Returns:
+        Optional[str]: the hash, or None if the server did not issue one yet
+    """
+    if store is not None:
+        return store.get(node.url, template.resource.digest)
+    return template.template_hash
+
+
+def _forget_hash(template: Template, node: Server, store: Optional[HashStore]):
+    """Forget a hash that the server does not know anymore.
+
+    Args:
+        template (Template): the template
+        node (Server): the single server
+        store (Optional[HashStore]): the hash store
+    """
+    if store is not None:
+        store.delete(node.url, template.resource.digest)
+
+
+def _upload_job(template: Template, node: Server) -> PrintJob:
+    """The smallest print job that makes the server cache the template and issue a hash for it:
+    no data and an output of the same type as the template, so no conversion is needed.
+
+    Args:
+        template (Template): the template
+        node (Server): the single server
+
+    Returns:
+        PrintJob: the print job
+    """
+    upload = Template(template.resource, template.start_delimiter, template.end_delimiter, should_hash=True)
+    return PrintJob(ElementCollection(), node, upload, OutputConfig(filetype=template.resource.filetype))
+
+
+def _prewarm(template: Template, node: Server, store: Optional[HashStore]) -> PrewarmResult:
+    """Pre-warm a template on a single server.
+
+    Args:
+        template (Template): the template
+        node (Server): the single server
+        store (Optional[HashStore]): the hash store
+
+    Returns:
+        PrewarmResult: the outcome
+    """
+    result = PrewarmResult(template, node)
+    start = time.perf_counter()
+    try:
+        node._raise_if_unreachable()
+        result.reachable_seconds = time.perf_counter() - start
+        known = _known_hash(template, node, store)
+        if known is not None and node.verify_template_hash(known):
+            result.template_hash = known
+        else:
+            _forget_hash(template, node, store)
+            printjob = _upload_job(template, node)
+            response = node._post(**printjob._post_kwargs({}))
+            if response.status_code != 200:
+                raise COPError(response.text)
+            # read the (small) output, so the connection can be reused
+            response.content
+            result.template_hash = response.headers.get("Template-Hash")
+            result.uploaded = True
+    except _ERRORS as err:
+        result.error = err
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+async def _prewarm_async(template: Template, node: Server, store: Optional[HashStore]) -> PrewarmResult:
+    """Async version of `_prewarm`.
+
+    Args:
+        template (Template): the template
+        node (Server): the single server
+        store (Optional[HashStore]): the hash store
+
+    Returns:
+        PrewarmResult: the outcome
+    """
+    result = PrewarmResult(template, node)
+    start = time.perf_counter()
+    try:
+        await node._raise_if_unreachable_async()
+        result.reachable_seconds = time.perf_counter() - start
+        known = _known_hash(template, node, store)
+        if known is not None and await node.verify_template_hash_async(known):
+            result.template_hash = known
+        else:
+            _forget_hash(template, node, store)
+            printjob = _upload_job(template, node)
+            response: AsyncResponse = await node._post_async(**printjob._post_kwargs({}))
+            body = await response.read()
+            if response.status_code != 200:
+                raise COPError(body.decode("utf-8", errors="replace"))
+            result.template_hash = response.headers.get("Template-Hash")
+            result.uploaded = True
+    except _ERRORS as err:
+        result.error = err
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def _record(results: List[PrewarmResult], tasks: List[Tuple[Template, Server, Optional[HashStore]]]):
+    """Record the issued hashes in the hash state of the templates.
+
+    With a hash store, the hash is stored for every server that issued it.
+    Without one, the template itself keeps the hash (see `Template.update_hash`), but only if every server issued that same hash,
+    since the template then sends the hash to any server.
+
+    Args:
+        results (List[PrewarmResult]): the outcome of every task
+        tasks (List[Tuple[Template, Server, Optional[HashStore]]]): the tasks
+    """
+    without_store = {}
+    for result, (template, node, store) in zip(results, tasks):
+        if store is not None:
+            if result.ok:
+                store.set(node.url, template.resource.digest, result.template_hash)
+        else:
+            without_store.setdefault(id(template), (template, []))[1].append(result)
+    for template, template_results in without_store.values():
+        hashes = {result.template_hash for result in template_results}
+        if all(result.ok for result in template_results) and len(hashes) == 1:
+            template.update_hash(hashes.pop())
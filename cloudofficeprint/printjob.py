@@ -4,18 +4,25 @@ Module containing the PrintJob class, which is also exposed at package level.
 
 import requests
 import asyncio
-import json
+import copy
+import itertools
+import shutil
+import time
+import zipfile
 
-from typing import Union, List, Dict, Mapping, Optional
-from functools import partial
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import AsyncIterator, Iterable, Iterator, Tuple, Type, Union, List, Dict, Mapping, Optional
 from pprint import pprint
+from tempfile import SpooledTemporaryFile
 
-from .config import OutputConfig, Server
-from .elements import Element, RESTSource
+from .config import AsyncResponse, HashStore, OutputConfig, Server, ServerPool
+from .elements import Element, Property, RESTSource
 from .exceptions import COPError
-from .resource import Resource
+from .own_utils import json_utils
+from .own_utils.encoding_cache import get_encoding_cache
+from .resource import RawResource, Resource
 from .template import Template
-from .response import Response
+from .response import AsyncStreamingResponse, Response, StreamingResponse, CHUNK_SIZE, SPOOL_THRESHOLD
 from .transformation import TransformationFunction
 
 STATIC_OPTS = {
@@ -24,6 +31,53 @@ STATIC_OPTS = {
     "python_sdk_version": "21.2.0",
 }
 
+HASHED_FILE_SOURCE = "hash"
+"""The `file_source` of a secondary file that is sent as the hash of a file cached on the server (see `Resource.should_hash`)."""
+
+PREPARE_WORKERS = 8
+"""Default number of threads that prepare the resources of print jobs, see `PrintJob.prepare_many`."""
+
+
+class BatchResult:
+    """The outcome of a single print job executed with `PrintJob.execute_many` or `PrintJob.execute_many_async`."""
+
+    def __init__(self,
+                 index: int,
+                 printjob: "PrintJob",
+                 response: Response = None,
+                 error: Exception = None):
+        """You should never need to construct a BatchResult manually.
+
+        Args:
+            index (int): position of the print job in the batch
+            printjob (PrintJob): the executed print job
+            response (Response, optional): the response of the server if the print job succeeded. Defaults to None.
+            error (Exception, optional): the error raised by the print job if it failed. Defaults to None.
+        """
+        self.index: int = index
+        self.printjob: PrintJob = printjob
+        self.response: Response = response
+        self.error: Exception = error
+
+    @property
+    def ok(self) -> bool:
+        """Whether the print job succeeded.
+
+        Returns:
+            bool: whether the print job succeeded
+        """
+        return self.error is None
+
+    def result(self) -> Response:
+        """The response of the print job, raising its error if it failed.
+
+        Returns:
+            Response: the response of the print job
+        """
+        if self.error is not None:
+            raise self.error
+        return self.response
+
 
 class PrintJob:
     """A print job for a Cloud Office Print server.
@@ -32,6 +86,12 @@ class PrintJob:
     and the `PrintJob.execute` method to combine all these and send a request to the Cloud Office Print server.
     """
 
+    _splittable: bool = True
+    """Whether this print job may be split, see `PrintJob.execute`. False for the parts of a split print job."""
+
+    _encoded_files: List[json_utils.RawJSON] = None
+    """The files of the data of a part of a split print job, encoded while the print job was split."""
+
     def __init__(
         self,
         data: Union[Element, Mapping[str, Element], RESTSource],
@@ -74,46 +134,806 @@ class PrintJob:
     def execute(self) -> Response:
         """Execute this print job.
 
+        If `config.ServerConfig.max_payload_size` is set and this print job has a `Mapping` of files as data that exceeds it,
+        the print job is split into print jobs within the limit, which are executed in parallel.
+        If the output config merges the output into one PDF (`config.PDFOptions` with `merge=True`), the resulting PDFs are merged by additional print jobs,
+        otherwise the output files are combined into one zip file.
+
         Returns:
             Response: `Response`-object
         """
-        self.server._raise_if_unreachable()
-        proxy = self.server.config.proxies if self.server.config else None
-        response = requests.post(
-            self.server.url,
-            json=self.as_dict,
-            proxies=proxy,
-            headers={"Content-type": "application/json"},
+        parts = self._split()
+        if parts is None:
+            return PrintJob._handle_response(self._post(), self._spool_threshold)
+        first = next(parts)
+        second = next(parts, None)
+        if second is None:
+            # the print job fits, it is sent as one part with its files encoded while it was measured
+            return PrintJob._handle_response(first._post(), self._spool_threshold)
+        names = []
+        parts = PrintJob._record_names(itertools.chain([first, second], parts), names)
+        return self._combine(
+            [result.result() for result in PrintJob.execute_many(parts, self._max_in_flight, capture=())],
+            names,
         )
-        if type(self.template) is Template and self.template.should_hash:
-            template_hash = response.headers["Template-Hash"]
-            if template_hash:
-                self.template.update_hash(template_hash)
-        return self._handle_response(response)
 
     async def execute_async(self) -> Response:
         """Async version of `PrintJob.execute`
 
+        The request is sent without blocking the event loop through the server's `config.AsyncTransport`.
+
         Returns:
             Response: `Response`-object
         """
+        parts = self._split()
+        if parts is None:
+            return await PrintJob._handle_response_async(await self._post_async(), self._spool_threshold)
+        first = next(parts)
+        second = next(parts, None)
+        if second is None:
+            return await PrintJob._handle_response_async(await first._post_async(), self._spool_threshold)
+        names = []
+        parts = PrintJob._record_names(itertools.chain([first, second], parts), names)
+        return await self._combine_async(
+            [result.result() async for result in PrintJob.execute_many_async(parts, self._max_in_flight, capture=())],
+            names,
+        )
+
+    def execute_stream(self) -> StreamingResponse:
+        """Execute this print job and stream its output instead of buffering it.
+
+        The output is downloaded while it is read from the returned `StreamingResponse`, e.g. with `StreamingResponse.to_file`.
+        Base64 encoded output (`config.OutputConfig` with `encoding="base64"`) is decoded on the fly.
+
+        Raises:
+            COPError: Error when the HTML status code is not 200
+
+        Returns:
+            StreamingResponse: `StreamingResponse`-object
+        """
+        response = self._post()
+        if response.status_code != 200:
+            raise COPError(response.text)
+        return StreamingResponse(response, self.output_config.encoding == "base64")
+
+    async def execute_stream_async(self) -> AsyncStreamingResponse:
+        """Async version of `PrintJob.execute_stream`
+
+        Raises:
+            COPError: Error when the HTML status code is not 200
+
+        Returns:
+            AsyncStreamingResponse: `AsyncStreamingResponse`-object
+        """
+        response = await self._post_async()
+        if response.status_code != 200:
+            await response.read()
+            raise COPError(response.text)
+        return AsyncStreamingResponse(response, self.output_config.encoding == "base64")
+
+    def _post(self) -> requests.Response:
+        """Send this print job to the server, without reading the output.
+
+        If the template should be hashed and another print job is uploading it to the same server, this print job waits until
+        that upload is answered, so it can send only the hash. If that upload is answered without a hash, the server does not hash the template,
+        so this print job and all further ones upload the template themselves without waiting. If that upload failed, this print job takes over the upload.
+
+        Files that were sent as their hash (see `Resource.should_hash`) may have been dropped from the cache of the server, e.g. by a restart.
+        If the server rejects the hashes of such a print job with `config.ServerConfig.hash_rejected_status`, they are forgotten
+        and the print job is sent once more with the full files. Any other error is returned as is.
+
+        Returns:
+            requests.Response: the streamed response of the server
+        """
         self.server._raise_if_unreachable()
-        proxy = self.server.config.proxies if self.server.config else None
-        response = await asyncio.get_event_loop().run_in_executor(
-            None,
-            partial(
-                requests.post,
-                self.server.url,
-                json=self.as_dict,
-                proxies=proxy,
-                headers={"Content-type": "application/json"},
-            ),
+        self.prepare()
+        uploading = self._negotiates_template_hash and self.template._uploads.acquire(
+            self.server.url, lambda: self.template._is_hashed(self._hash_store, self.server)
+        )
+        response = None
+        try:
+            hashed_files = self._hashed_files()
+            stored_hashes = self._uses_stored_hashes(hashed_files)
+            response = self.server._post(**self._post_kwargs(hashed_files))
+            if stored_hashes and self._rejects_hashes(response.status_code):
+                response.close()
+                self._forget_hashes(hashed_files)
+                hashed_files = {}
+                response = self.server._post(**self._post_kwargs(hashed_files))
+            self._update_hashes(response, hashed_files)
+        finally:
+            if uploading:
+                self._release_upload(response)
+        return response
+
+    def _release_upload(self, response: Optional[Union[requests.Response, AsyncResponse]]):
+        """Finish the upload of the template to be hashed by this print job, and let the print jobs waiting for it continue.
+
+        Args:
+            response (Optional[Union[requests.Response, AsyncResponse]]): the answer of the server, or None if the upload failed without one
+        """
+        # a server that renders the print job without issuing a hash does not hash the template,
+        # so the waiting print jobs stop waiting for one; after an error, the next print job tries again
+        given_up = (
+            response is not None
+            and response.status_code == 200
+            and not self.template._is_hashed(self._hash_store, self.server)
+        )
+        self.template._uploads.release(self.server.url, given_up)
+
+    async def _post_async(self) -> AsyncResponse:
+        """Async version of `PrintJob._post`, through the asynchronous transport.
+        Waiting for the upload of the template by another print job does not block the event loop.
+
+        Returns:
+            AsyncResponse: the streamed response of the server
+        """
+        await self.server._raise_if_unreachable_async()
+        if len(self._resources_to_hash()) + len(self._resources_to_encode()) > 1:
+            await asyncio.get_running_loop().run_in_executor(None, self.prepare)
+        uploading = self._negotiates_template_hash and await self.template._uploads.acquire_async(
+            self.server.url, lambda: self.template._is_hashed(self._hash_store, self.server)
+        )
+        loop = asyncio.get_running_loop()
+        response = None
+        try:
+            hashed_files = self._hashed_files()
+            stored_hashes = self._uses_stored_hashes(hashed_files)
+            # serializing the print job in full (without chunked requests) blocks, so it is done in a worker thread
+            response = await self.server._post_async(**await loop.run_in_executor(None, self._post_kwargs, hashed_files))
+            if stored_hashes and self._rejects_hashes(response.status_code):
+                await response.read()
+                self._forget_hashes(hashed_files)
+                hashed_files = {}
+                response = await self.server._post_async(**await loop.run_in_executor(None, self._post_kwargs, hashed_files))
+            self._update_hashes(response, hashed_files)
+        finally:
+            if uploading:
+                self._release_upload(response)
+        return response
+
+    def prepare(self, max_workers: int = PREPARE_WORKERS):
+        """Hash and encode the resources of this print job on a pool of threads, see `PrintJob.prepare_many`.
+        This is done when the print job is executed, if it has more than one resource to prepare.
+
+        Args:
+            max_workers (int, optional): maximum number of resources prepared at the same time. Defaults to `PREPARE_WORKERS`.
+        """
+        PrintJob.prepare_many([self], max_workers)
+
+    @staticmethod
+    def prepare_many(printjobs: Iterable["PrintJob"], max_workers: int = PREPARE_WORKERS):
+        """Hash and encode the resources of print jobs on a pool of threads, before the print jobs are serialized,
+        so reading, hashing and encoding many files of a print job or of a batch of print jobs overlap.
+
+        The digests of the resources that may be sent as their hash (see `Template.should_hash` and `Resource.should_hash`) are computed first.
+        Then the resources with raw data that are sent in full are encoded into the shared `own_utils.EncodingCache`, where serialization finds them.
+        Memory stays bounded: lazily loaded files (see `resource.FileResource`) are not encoded ahead,
+        and resources are only encoded ahead as long as they fit in the encoding cache together.
+        A resource shared by several print jobs is prepared once.
+
+        Args:
+            printjobs (Iterable[PrintJob]): the print jobs
+            max_workers (int, optional): maximum number of resources prepared at the same time. Defaults to `PREPARE_WORKERS`.
+        """
+        printjobs = list(printjobs)
+        to_hash = PrintJob._unique(resource for printjob in printjobs for resource in printjob._resources_to_hash())
+        if len(to_hash) > 1:
+            with ThreadPoolExecutor(min(max_workers, len(to_hash))) as executor:
+                list(executor.map(lambda resource: resource.digest, to_hash))
+        budget = get_encoding_cache().max_bytes
+        to_encode = []
+        for resource in PrintJob._unique(resource for printjob in printjobs for resource in printjob._resources_to_encode()):
+            # the base64 representation is a third larger than the raw data
+            budget -= (len(resource.data) + 2) // 3 * 4
+            if budget < 0:
+                break
+            to_encode.append(resource)
+        if len(to_encode) > 1:
+            with ThreadPoolExecutor(min(max_workers, len(to_encode))) as executor:
+                list(executor.map(lambda resource: resource.base64, to_encode))
+
+    @staticmethod
+    def _unique(resources: Iterable[Resource]) -> List[Resource]:
+        """
+        Args:
+            resources (Iterable[Resource]): resources, possibly with duplicates
+
+        Returns:
+            List[Resource]: every resource once, in order of first occurrence
+        """
+        return list({id(resource): resource for resource in resources}.values())
+
+    def _resources_to_hash(self) -> List[Resource]:
+        """
+        Returns:
+            List[Resource]: the resources of this print job whose digests are needed, because they may be sent as their hash
+        """
+        resources = []
+        if type(self.template) is Template and self.template.should_hash and self._hash_store is not None:
+            resources.append(self.template.resource)
+        if self._file_hash_store is not None:
+            resources.extend(file for file in self._secondary_files if file.should_hash)
+        return resources
+
+    def _resources_to_encode(self) -> List[RawResource]:
+        """
+        Returns:
+            List[RawResource]: the resources of this print job with raw data that are sent in full, so they have to be encoded
+        """
+        resources = []
+        if type(self.template) is Template and not self.template._is_sent_as_hash(self._hash_store, self.server):
+            resources.append(self.template.resource)
+        hashed_files = self._hashed_files()
+        resources.extend(
+            file for file in self._secondary_files
+            if not (file.should_hash and file.digest in hashed_files)
         )
-        if type(self.template) is Template and self.template.should_hash:
-            template_hash = response.headers["Template-Hash"]
-            if template_hash:
+        return [resource for resource in resources if isinstance(resource, RawResource)]
+
+    @property
+    def _negotiates_template_hash(self) -> bool:
+        """Whether the template of this print job should be hashed by the server and the server can issue a hash for it.
+
+        Returns:
+            bool: whether the hash of the template is negotiated with the server
+        """
+        # a hash is only valid on the server that issued it, which is not known for a pool of servers
+        return type(self.template) is Template and self.template.should_hash and not isinstance(self.server, ServerPool)
+
+    def _post_kwargs(self, hashed_files: Dict[str, str]) -> Dict:
+        """The arguments for the request that sends this print job to the server.
+
+        Args:
+            hashed_files (Dict[str, str]): the hashes of the secondary files that are sent as their hash, by digest
+
+        Returns:
+            Dict: the arguments for `config.Server._post` or `config.Server._post_async`
+        """
+        return {
+            "data": self._body(hashed_files),
+            "headers": {"Content-type": "application/json"},
+            "stream": True,
+        }
+
+    def _body(self, hashed_files: Dict[str, str] = None) -> Union[bytes, Iterator[bytes]]:
+        """The JSON body of the request for this print job.
+
+        If `config.ServerConfig.chunked_requests` is enabled, the body is an iterator that serializes the print job while it is sent
+        (see `own_utils.json_utils.iter_json`), so a large print job is never held in memory as a whole.
+
+        Args:
+            hashed_files (Dict[str, str], optional): the hashes of the secondary files that are sent as their hash, by digest. Defaults to `PrintJob._hashed_files()`.
+
+        Returns:
+            Union[bytes, Iterator[bytes]]: the encoded body or an iterator over its chunks
+        """
+        as_dict = self._as_dict(self._hashed_files() if hashed_files is None else hashed_files)
+        if self.server.config is None or self.server.config.chunked_requests:
+            return json_utils.iter_json(as_dict)
+        if self._encoded_files is not None:
+            # the files are encoded already, see `PrintJob._split`
+            return b"".join(json_utils.iter_json(as_dict))
+        return json_utils.dumps_bytes(as_dict)
+
+    @property
+    def _file_hash_store(self) -> Optional[HashStore]:
+        """The registry of the secondary files cached on the server: `config.ServerConfig.template_hash_store`, or else the registry of the server.
+
+        Returns:
+            Optional[HashStore]: the registry, or None if secondary files are not sent as their hash
+                (without `config.ServerConfig.hash_secondary_files` or to a pool of servers)
+        """
+        if self.server.config is None or not self.server.config.hash_secondary_files or isinstance(self.server, ServerPool):
+            return None
+        store = self._hash_store
+        return store if store is not None else self.server._file_hashes
+
+    @property
+    def _secondary_files(self) -> List[Resource]:
+        """
+        Returns:
+            List[Resource]: the subtemplates, prepend, append and compare files and attachments of this print job
+        """
+        return [
+            *self.subtemplates.values(),
+            *self.prepend_files,
+            *self.append_files,
+            *self.compare_files,
+            *self.attachments,
+        ]
+
+    def _hashed_files(self) -> Dict[str, str]:
+        """The hashes of the secondary files that are cached on the server.
+
+        Returns:
+            Dict[str, str]: the hash of every secondary file with `Resource.should_hash` that the server cached, by digest of the file content
+        """
+        store = self._file_hash_store
+        if store is None:
+            return {}
+        hashed_files = {}
+        for file in self._secondary_files:
+            digest = file.digest if file.should_hash else None
+            if digest is not None:
+                hashcode = store.get(self.server.url, digest)
+                if hashcode is not None:
+                    hashed_files[digest] = hashcode
+        return hashed_files
+
+    def _secondary_file_dict(self, file: Resource, hashed_files: Dict[str, str]) -> Dict:
+        """The dict representation of a secondary file for this print job.
+
+        Args:
+            file (Resource): the secondary file
+            hashed_files (Dict[str, str]): the hashes of the secondary files that are sent as their hash, by digest
+
+        Returns:
+            Dict: the file, or only its hash if the server cached it
+        """
+        digest = file.digest if file.should_hash and self._file_hash_store is not None else None
+        if digest is None:
+            return file.secondary_file_dict
+        if digest in hashed_files:
+            return {
+                "mime_type": file.mimetype,
+                "file_source": HASHED_FILE_SOURCE,
+                "file_hash": hashed_files[digest],
+            }
+        return {**file.secondary_file_dict, "should_hash": True}
+
+    def _uses_stored_hashes(self, hashed_files: Dict[str, str]) -> bool:
+        """Whether this print job is sent with hashes of files that the server may have dropped from its cache since.
+
+        Args:
+            hashed_files (Dict[str, str]): the hashes of the secondary files that are sent as their hash, by digest
+
+        Returns:
+            bool: whether a secondary file or the template is sent as a stored hash
+        """
+        return bool(hashed_files) or (
+            type(self.template) is Template
+            and self.template._stored_hash(self._hash_store, self.server) is not None
+        )
+
+    def _rejects_hashes(self, status_code: int) -> bool:
+        """Whether the server rejected the hashes it was sent, because it no longer caches those files, see `config.ServerConfig.hash_rejected_status`.
+
+        Args:
+            status_code (int): HTTP status code of the response
+
+        Returns:
+            bool: whether the print job should be sent again with the full files
+        """
+        return self.server.config is not None and status_code == self.server.config.hash_rejected_status
+
+    def _forget_hashes(self, hashed_files: Dict[str, str]):
+        """Forget the stored hashes with which this print job was sent, so the files are sent in full again.
+
+        Args:
+            hashed_files (Dict[str, str]): the hashes of the secondary files that were sent as their hash, by digest
+        """
+        store = self._file_hash_store
+        for digest in hashed_files:
+            store.delete(self.server.url, digest)
+        if type(self.template) is Template and self.template._stored_hash(self._hash_store, self.server) is not None:
+            for url in Template._server_urls(self.server):
+                self._hash_store.delete(url, self.template.resource.digest)
+
+    def _update_hashes(self, response: Union[requests.Response, AsyncResponse], hashed_files: Dict[str, str]):
+        """Record the files that the server cached while executing this print job.
+
+        Args:
+            response (Union[requests.Response, AsyncResponse]): HTML response from the Cloud Office Print server
+            hashed_files (Dict[str, str]): the hashes of the secondary files that were sent as their hash, by digest
+        """
+        self._update_template_hash(response)
+        store = self._file_hash_store
+        if response.status_code != 200 or store is None:
+            return
+        for file in self._secondary_files:
+            digest = file.digest if file.should_hash else None
+            if digest is not None and digest not in hashed_files:
+                # the server identifies the files it caches by their MD5 hash
+                store.set(self.server.url, digest, file.md5)
+
+    def _update_template_hash(self, response: Union[requests.Response, AsyncResponse]):
+        """Store the template hash returned by the server, if the template should be hashed.
+
+        Args:
+            response (Union[requests.Response, AsyncResponse]): HTML response from the Cloud Office Print server
+        """
+        if self._negotiates_template_hash:
+            template_hash = response.headers.get("Template-Hash")
+            if not template_hash:
+                return
+            store = self._hash_store
+            digest = self.template.resource.digest if store is not None else None
+            if digest is not None:
+                # the template keeps sending its hash only to the servers that issued one
+                store.set(self.server.url, digest, template_hash)
+            else:
                 self.template.update_hash(template_hash)
-        return PrintJob._handle_response(response)
+
+    @property
+    def _hash_store(self) -> Optional[HashStore]:
+        """The store of the hashes issued by the server for templates, as configured for the server.
+
+        Returns:
+            Optional[HashStore]: the hash store, or None if there is none
+        """
+        if self.server.config is None:
+            return None
+        return self.server.config.template_hash_store
+
+    def _split(self) -> Optional[Iterator["PrintJob"]]:
+        """Split this print job into print jobs with a request body within `config.ServerConfig.max_payload_size`.
+
+        Only a print job with a `Mapping` of files as data, which returns its output files, can be split.
+        The files are distributed over the print jobs in their original order.
+        Every file is encoded once to measure it, and the parts are sent with the encoded files (see `json_utils.RawJSON`).
+        The parts are created while they are taken, so only the files of the parts in progress are held in memory in encoded form.
+        A print job within the limit results in a single part.
+
+        Returns:
+            Optional[Iterator[PrintJob]]: the print jobs, or None if this print job cannot be split
+        """
+        limit = self.server.config.max_payload_size if self.server.config else None
+        if (limit is None
+                or not self._splittable
+                or not isinstance(self.data, Mapping)
+                or len(self.data) < 2
+                or self.output_config.encoding == "base64"
+                or self.output_config.output_polling
+                or self.output_config.server_directory):
+            return None
+        return self._iter_parts(limit)
+
+    def _iter_parts(self, limit: int) -> Iterator["PrintJob"]:
+        """The parts of this print job, see `PrintJob._split`.
+
+        Args:
+            limit (int): maximum size in bytes of the request body of a part
+
+        Yields:
+            PrintJob: the next part
+        """
+        base_size = PrintJob._payload_size(self._part({}, []).as_dict)
+        group = {}
+        encoded = []
+        size = base_size
+        for name, element in self.data.items():
+            entry = json_utils.RawJSON(b"".join(json_utils.iter_json({"filename": name, "data": element.as_dict})))
+            # the file is separated from the previous one by a comma
+            entry_size = len(entry) + 1
+            if group and size + entry_size > limit:
+                yield self._part(group, encoded)
+                group = {}
+                encoded = []
+                size = base_size
+            group[name] = element
+            encoded.append(entry)
+            size += entry_size
+        yield self._part(group, encoded)
+
+    def _part(self, data: Mapping[str, Element], encoded_files: List[json_utils.RawJSON]) -> "PrintJob":
+        """A copy of this print job with only part of its files as data, which is not split any further.
+
+        Args:
+            data (Mapping[str, Element]): the files of the part
+            encoded_files (List[json_utils.RawJSON]): the files of the part, encoded
+
+        Returns:
+            PrintJob: the part of this print job
+        """
+        part = copy.copy(self)
+        part.data = data
+        part._encoded_files = encoded_files
+        part._splittable = False
+        return part
+
+    @staticmethod
+    def _record_names(parts: Iterator["PrintJob"], names: List[str]) -> Iterator["PrintJob"]:
+        """Record the name of the first file of every part of a split print job while the parts are taken, see `PrintJob._combine_zip`.
+
+        Args:
+            parts (Iterator[PrintJob]): the parts
+            names (List[str]): the list to which the names are appended
+
+        Yields:
+            PrintJob: the next part
+        """
+        for part in parts:
+            names.append(next(iter(part.data)))
+            yield part
+
+    @staticmethod
+    def _payload_size(obj: Dict) -> int:
+        """The size of the JSON representation of `obj`, computed without holding the JSON in memory as a whole.
+
+        Args:
+            obj (Dict): the dict representation of (part of) a print job
+
+        Returns:
+            int: the size in bytes
+        """
+        return sum(len(chunk) for chunk in json_utils.iter_json(obj))
+
+    @property
+    def _merges_pdf(self) -> bool:
+        """Whether the output files of this print job are merged into one PDF.
+
+        Returns:
+            bool: whether the output is merged
+        """
+        pdf_options = self.output_config.pdf_options
+        return pdf_options is not None and bool(pdf_options.merge)
+
+    def _combine(self, responses: List[Response], names: List[str]) -> Response:
+        """Combine the outputs of the parts of a split print job, see `PrintJob.execute`.
+
+        Args:
+            responses (List[Response]): the outputs of the parts
+            names (List[str]): the name of the first file of every part
+
+        Returns:
+            Response: the combined output
+        """
+        if not self._merges_pdf:
+            return self._combine_zip(responses, names)
+        while len(responses) > 1:
+            groups = self._merge_groups(responses)
+            jobs = [self._merge_job(PrintJob._pdf_resources(group)) for group in groups if len(group) > 1]
+            merged = iter([result.result() for result in PrintJob.execute_many(jobs, self._max_in_flight, capture=())])
+            responses = PrintJob._merged(groups, merged)
+        return responses[0]
+
+    async def _combine_async(self, responses: List[Response], names: List[str]) -> Response:
+        """Async version of `PrintJob._combine`.
+
+        Args:
+            responses (List[Response]): the outputs of the parts
+            names (List[str]): the name of the first file of every part
+
+        Returns:
+            Response: the combined output
+        """
+        if not self._merges_pdf:
+            return self._combine_zip(responses, names)
+        while len(responses) > 1:
+            groups = self._merge_groups(responses)
+            jobs = [self._merge_job(PrintJob._pdf_resources(group)) for group in groups if len(group) > 1]
+            merged = iter([
+                result.result()
+                async for result in PrintJob.execute_many_async(jobs, self._max_in_flight, capture=())
+            ])
+            responses = PrintJob._merged(groups, merged)
+        return responses[0]
+
+    def _merge_groups(self, responses: List[Response]) -> List[List[Response]]:
+        """Group PDFs to merge in one print job each, within `config.ServerConfig.max_payload_size`.
+        Every group but the last has at least two PDFs, so every round of merging reduces the number of PDFs.
+
+        Args:
+            responses (List[Response]): the PDFs to merge
+
+        Returns:
+            List[List[Response]]: the groups of PDFs
+        """
+        limit = self.server.config.max_payload_size
+        empty = Resource.from_base64("", "pdf")
+        base_size = PrintJob._payload_size(self._merge_job([empty]).as_dict)
+        file_size = PrintJob._payload_size(empty.secondary_file_dict) + 1
+        groups = [[]]
+        size = base_size
+        for response in responses:
+            # the PDF is base64 encoded in the request
+            pdf_size = 4 * -(-response.size // 3) + file_size
+            if len(groups[-1]) >= 2 and size + pdf_size > limit:
+                groups.append([])
+                size = base_size
+            groups[-1].append(response)
+            size += pdf_size
+        return groups
+
+    def _merge_job(self, resources: List[Resource]) -> "PrintJob":
+        """A print job merging PDFs into one PDF, with the first PDF as template and the others appended to it.
+
+        Args:
+            resources (List[Resource]): the PDFs to merge
+
+        Returns:
+            PrintJob: the print job
+        """
+        return PrintJob(
+            Property("not_used", "not_used"),
+            self.server,
+            resources[0],
+            OutputConfig(filetype="pdf"),
+            append_files=resources[1:],
+        )
+
+    @staticmethod
+    def _pdf_resources(pdfs: List[Response]) -> List[Resource]:
+        """Resources for PDFs returned by the server, which are only base64 encoded while they are sent.
+        The PDFs are read from the spools of the responses while they are encoded, so they are never held in memory as a whole.
+
+        Args:
+            pdfs (List[Response]): the PDFs
+
+        Returns:
+            List[Resource]: the resources
+        """
+        return [Resource.from_base64(json_utils.LazyBase64(pdf._file), "pdf") for pdf in pdfs]
+
+    @staticmethod
+    def _merged(groups: List[List[Response]], merged: Iterator[Response]) -> List[Response]:
+        """The PDFs after a round of merging: the merged PDF of every group, or the PDF itself for a group of one.
+
+        Args:
+            groups (List[List[Response]]): the groups of PDFs that were merged
+            merged (Iterator[Response]): the merged PDFs of the groups with more than one PDF
+
+        Returns:
+            List[Response]: the PDFs to merge in the next round
+        """
+        result = []
+        for group in groups:
+            if len(group) == 1:
+                result.append(group[0])
+                continue
+            result.append(next(merged))
+            for response in group:
+                response.close()
+        return result
+
+    def _combine_zip(self, responses: List[Response], names: List[str]) -> Response:
+        """Combine the outputs of the parts of a split print job into one zip file.
+        A zip file returned for a part is unpacked into the combined zip file, a single output file is added under its file name.
+
+        Args:
+            responses (List[Response]): the outputs of the parts
+            names (List[str]): the name of the first file of every part
+
+        Returns:
+            Response: the zip file
+        """
+        spool = SpooledTemporaryFile(max_size=self._spool_threshold)
+        with zipfile.ZipFile(spool, "w") as archive:
+            for name, response in zip(names, responses):
+                response._file.seek(0)
+                if response.filetype == "zip":
+                    with zipfile.ZipFile(response._file) as source:
+                        for info in source.infolist():
+                            target = zipfile.ZipInfo(info.filename, info.date_time)
+                            target.compress_type = info.compress_type
+                            with source.open(info) as src, archive.open(target, "w") as dst:
+                                shutil.copyfileobj(src, dst, CHUNK_SIZE)
+                else:
+                    target = zipfile.ZipInfo(f"{name}.{response.filetype}", time.localtime()[:6])
+                    target.compress_type = zipfile.ZIP_DEFLATED
+                    with archive.open(target, "w") as dst:
+                        shutil.copyfileobj(response._file, dst, CHUNK_SIZE)
+                response.close()
+        return Response._from_file(spool, "application/zip")
+
+    @property
+    def _max_in_flight(self) -> int:
+        """The number of parts of a split print job that are executed at the same time: one per pooled connection to the server.
+
+        Returns:
+            int: the number of parts executed at the same time
+        """
+        return self.server.config.pool_maxsize if self.server.config else 10
+
+    @property
+    def _spool_threshold(self) -> int:
+        """Size in bytes above which the output is stored in a temporary file, as configured for the server.
+
+        Returns:
+            int: the spool threshold
+        """
+        return self.server.config.spool_threshold if self.server.config else SPOOL_THRESHOLD
+
+    @staticmethod
+    def execute_many(
+        printjobs: Iterable["PrintJob"],
+        max_in_flight: int = 8,
+        ordered: bool = True,
+        capture: Tuple[Type[Exception], ...] = (COPError,),
+    ) -> Iterator[BatchResult]:
+        """Execute a batch of print jobs concurrently on a pool of worker threads.
+
+        At most `max_in_flight` print jobs are executed at the same time and the print jobs are taken lazily from `printjobs`,
+        so a large batch can be generated on the fly.
+        A new print job is started as soon as any print job completes; if the results are ordered,
+        the results of print jobs that complete before the ones preceding them are kept until they are returned.
+        An error raised by a print job that is an instance of one of the `capture` types is stored in its `BatchResult`
+        instead of aborting the batch; any other error cancels the remaining print jobs and is raised.
+
+        Args:
+            printjobs (Iterable[PrintJob]): the print jobs to execute
+            max_in_flight (int, optional): maximum number of print jobs executed at the same time. Defaults to 8.
+            ordered (bool, optional): whether the results are returned in the order of `printjobs` (True) or as soon as they complete (False). Defaults to True.
+            capture (Tuple[Type[Exception], ...], optional): the errors to store per print job. Defaults to (COPError,).
+
+        Yields:
+            BatchResult: the outcome of each print job
+        """
+        def execute(index: int, printjob: PrintJob) -> BatchResult:
+            try:
+                return BatchResult(index, printjob, response=printjob.execute())
+            except capture as err:
+                return BatchResult(index, printjob, error=err)
+
+        jobs = enumerate(printjobs)
+        completed = {}
+        next_index = 0
+        executor = ThreadPoolExecutor(max_in_flight)
+        pending = set()
+        try:
+            pending.update(executor.submit(execute, *job) for job in itertools.islice(jobs, max_in_flight))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                results = sorted((future.result() for future in done), key=lambda result: result.index)
+                pending.update(executor.submit(execute, *job) for job in itertools.islice(jobs, len(done)))
+                if not ordered:
+                    yield from results
+                    continue
+                completed.update((result.index, result) for result in results)
+                while next_index in completed:
+                    yield completed.pop(next_index)
+                    next_index += 1
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    @staticmethod
+    async def execute_many_async(
+        printjobs: Iterable["PrintJob"],
+        max_in_flight: int = 8,
+        ordered: bool = True,
+        capture: Tuple[Type[Exception], ...] = (COPError,),
+    ) -> AsyncIterator[BatchResult]:
+        """Async version of `PrintJob.execute_many`, executing the print jobs concurrently on the running event loop.
+
+        Args:
+            printjobs (Iterable[PrintJob]): the print jobs to execute
+            max_in_flight (int, optional): maximum number of print jobs executed at the same time. Defaults to 8.
+            ordered (bool, optional): whether the results are returned in the order of `printjobs` (True) or as soon as they complete (False). Defaults to True.
+            capture (Tuple[Type[Exception], ...], optional): the errors to store per print job. Defaults to (COPError,).
+
+        Yields:
+            BatchResult: the outcome of each print job
+        """
+        async def execute(index: int, printjob: PrintJob) -> BatchResult:
+            try:
+                return BatchResult(index, printjob, response=await printjob.execute_async())
+            except capture as err:
+                return BatchResult(index, printjob, error=err)
+
+        jobs = enumerate(printjobs)
+        completed = {}
+        next_index = 0
+        pending = set()
+        try:
+            pending.update(asyncio.ensure_future(execute(*job)) for job in itertools.islice(jobs, max_in_flight))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                results = sorted((task.result() for task in done), key=lambda result: result.index)
+                pending.update(asyncio.ensure_future(execute(*job)) for job in itertools.islice(jobs, len(done)))
+                if not ordered:
+                    for result in results:
+                        yield result
+                    continue
+                completed.update((result.index, result) for result in results)
+                while next_index in completed:
+                    yield completed.pop(next_index)
+                    next_index += 1
+        finally:
+            for task in pending:
+                task.cancel()
 
     @staticmethod
     def execute_full_json(json_data: str, server: Server) -> Response:
@@ -127,14 +947,14 @@ class PrintJob:
             Response: `Response`-object
         """
         server._raise_if_unreachable()
-        proxy = server.config.proxies if server.config else None
-        response = requests.post(
-            server.url,
+        response = server._post(
             data=json_data,
-            proxies=proxy,
             headers={"Content-type": "application/json"},
+            stream=True,
+        )
+        return PrintJob._handle_response(
+            response, server.config.spool_threshold if server.config else SPOOL_THRESHOLD
         )
-        return PrintJob._handle_response(response)
 
     @staticmethod
     async def execute_full_json_async(json_data: str, server: Server) -> Response:
@@ -147,26 +967,23 @@ class PrintJob:
         Returns:
             Response: `Response`-object
         """
-        server._raise_if_unreachable()
-        proxy = server.config.proxies if server.config else None
-        response = await asyncio.get_event_loop().run_in_executor(
-            None,
-            partial(
-                requests.post,
-                server.url,
-                data=json_data,
-                proxies=proxy,
-                headers={"Content-type": "application/json"},
-            ),
+        await server._raise_if_unreachable_async()
+        response = await server._post_async(
+            data=json_data,
+            headers={"Content-type": "application/json"},
+            stream=True,
+        )
+        return await PrintJob._handle_response_async(
+            response, server.config.spool_threshold if server.config else SPOOL_THRESHOLD
         )
-        return PrintJob._handle_response(response)
 
     @staticmethod
-    def _handle_response(res: requests.Response) -> Response:
+    def _handle_response(res: requests.Response, spool_threshold: int = SPOOL_THRESHOLD) -> Response:
         """Converts the HTML response to a `Response`-object
 
         Args:
             res (requests.Response): HTML response from the Cloud Office Print server
+            spool_threshold (int, optional): size in bytes above which the output is stored in a temporary file. Defaults to `SPOOL_THRESHOLD`.
 
         Raises:
             COPError: Error when the HTML status code is not 200
@@ -177,7 +994,27 @@ class PrintJob:
         if res.status_code != 200:
             raise COPError(res.text)
         else:
-            return Response(res)
+            return Response(res, spool_threshold)
+
+    @staticmethod
+    async def _handle_response_async(res: AsyncResponse, spool_threshold: int = SPOOL_THRESHOLD) -> Response:
+        """Async version of `PrintJob._handle_response`, for a streamed response of the asynchronous transport.
+
+        Args:
+            res (AsyncResponse): streamed HTML response from the Cloud Office Print server
+            spool_threshold (int, optional): size in bytes above which the output is stored in a temporary file. Defaults to `SPOOL_THRESHOLD`.
+
+        Raises:
+            COPError: Error when the HTML status code is not 200
+
+        Returns:
+            Response: `Response`-object of HTML response
+        """
+        if res.status_code != 200:
+            await res.read()
+            raise COPError(res.text)
+        else:
+            return await Response._from_async_response(res, spool_threshold)
 
     @property
     def json(self) -> str:
@@ -187,11 +1024,23 @@ class PrintJob:
         Returns:
             str: JSON equivalent of the dict representation of this print job
         """
-        return json.dumps(self.as_dict)
+        return json_utils.dumps(self.as_dict)
 
     @property
     def as_dict(self) -> Dict:
         """Return the dict representation of this print job.
+        Secondary files with `Resource.should_hash` are included in full, whether or not the server cached them.
+
+        Returns:
+            Dict: dict representation of this print job
+        """
+        return self._as_dict({})
+
+    def _as_dict(self, hashed_files: Dict[str, str]) -> Dict:
+        """The dict representation of this print job.
+
+        Args:
+            hashed_files (Dict[str, str]): the hashes of the secondary files that are sent as their hash, by digest
 
         Returns:
             Dict: dict representation of this print job
@@ -207,7 +1056,9 @@ class PrintJob:
         # (e.g. PDFConfigs are just appended at this "output" level)
         result["output"] = self.output_config.as_dict
 
-        if self.template:
+        if isinstance(self.template, Template):
+            result["template"] = self.template._template_dict(self._hash_store, self.server)
+        elif self.template:
             result["template"] = self.template.template_dict
 
         # If output_type is not specified, set this to the template filetype
@@ -218,7 +1069,9 @@ class PrintJob:
             else:
                 result["output"]["output_type"] = "docx"
 
-        if isinstance(self.data, Mapping):
+        if self._encoded_files is not None:
+            result["files"] = self._encoded_files
+        elif isinstance(self.data, Mapping):
             result["files"] = [
                 {"filename": name, "data": data.as_dict}
                 for name, data in self.data.items()
@@ -230,27 +1083,27 @@ class PrintJob:
 
         if len(self.prepend_files) > 0:
             result["prepend_files"] = [
-                file.secondary_file_dict for file in self.prepend_files
+                self._secondary_file_dict(file, hashed_files) for file in self.prepend_files
             ]
 
         if len(self.append_files) > 0:
             result["append_files"] = [
-                file.secondary_file_dict for file in self.append_files
+                self._secondary_file_dict(file, hashed_files) for file in self.append_files
             ]
         
         if len(self.compare_files) > 0:
             result["compare_files"] = [
-                file.secondary_file_dict for file in self.compare_files
+                self._secondary_file_dict(file, hashed_files) for file in self.compare_files
         ]
             
         if len(self.attachments) > 0:
             result["attachments"] = [
-                file.secondary_file_dict for file in self.attachments
+                self._secondary_file_dict(file, hashed_files) for file in self.attachments
             ]
 
         if len(self.subtemplates) > 0:
             result["templates"] = [
-                {**file.secondary_file_dict, "name": name}
+                {**self._secondary_file_dict(file, hashed_files), "name": name}
                 for name, file in self.subtemplates.items()
             ]
 
@@ -10,15 +10,24 @@ The recommended way of obtaining a `Resource` is through the static from_... met
 alternatively, the `Resource` subclasses can be constructed to form a valid `Resource`.
 """
 
-import json
-from typing import Dict, Union
+import base64
+import hashlib
+import os
+import requests
+from typing import Callable, Dict, Optional, Union
 from abc import abstractmethod, ABC
 
-from .own_utils import type_utils, file_utils
+from .own_utils import type_utils, file_utils, json_utils
+from .own_utils.encoding_cache import get_encoding_cache
 
 
 class Resource(ABC):
-    """The abstract base class for the resources."""
+    """The abstract base class for the resources.
+
+    A resource with local content that is used as a secondary file (subtemplate, prepend, append or compare file, attachment)
+    can be cached on a server with `config.ServerConfig.hash_secondary_files` by setting `Resource.should_hash` to True:
+    it is uploaded once per server and afterwards sent as its hash.
+    """
 
     def __init__(
         self,
@@ -33,6 +42,8 @@ class Resource(ABC):
         """
         self.data: Union[str, bytes] = data
         self.filetype: str = filetype
+        self.should_hash: bool = False
+        self._digests = None
 
     @property
     def mimetype(self) -> str:
@@ -42,13 +53,55 @@ class Resource(ABC):
         """
         return type_utils.extension_to_mimetype(self.filetype)
 
+    @property
+    def digest(self) -> Optional[str]:
+        """The SHA-256 digest of the file content, which identifies the file in a `config.HashStore`.
+
+        Returns:
+            Optional[str]: the hexadecimal digest, or None if the content is not available locally (e.g. a file on the server or at a URL)
+        """
+        digests = self._hexdigests()
+        return digests["sha256"] if digests is not None else None
+
+    @property
+    def md5(self) -> Optional[str]:
+        """The MD5 hash of the file content, by which the server identifies the files it caches (see `config.Server.verify_template_hash`).
+
+        Returns:
+            Optional[str]: the hexadecimal hash, or None if the content is not available locally (e.g. a file on the server or at a URL)
+        """
+        digests = self._hexdigests()
+        return digests["md5"] if digests is not None else None
+
+    def _hexdigests(self) -> Optional[Dict[str, str]]:
+        """The digests of the file content.
+
+        Returns:
+            Optional[Dict[str, str]]: the hexadecimal digests by algorithm name ("sha256" and "md5"), or None if the content is not available locally
+        """
+        return None
+
+    def _cached_hexdigests(self, content: Callable[[], bytes]) -> Dict[str, str]:
+        """The digests of the file content, computed again only when `Resource.data` is replaced.
+
+        Args:
+            content (Callable[[], bytes]): returns the file content of `Resource.data`
+
+        Returns:
+            Dict[str, str]: the hexadecimal digests by algorithm name ("sha256" and "md5")
+        """
+        if self._digests is None or self._digests[0] is not self.data:
+            data = content()
+            self._digests = (self.data, {"sha256": hashlib.sha256(data).hexdigest(), "md5": hashlib.md5(data).hexdigest()})
+        return self._digests[1]
+
     @property
     def template_json(self) -> str:
         """
         Returns:
             str: the JSON representation of this Resource.
         """
-        return json.dumps(self.template_dict)
+        return json_utils.dumps(self.template_dict)
 
     @property
     @abstractmethod
@@ -65,7 +118,7 @@ class Resource(ABC):
         Returns:
             str: the JSON representation of this Resource.
         """
-        return json.dumps(self.secondary_file_dict)
+        return json_utils.dumps(self.secondary_file_dict)
 
     @property
     @abstractmethod
@@ -111,7 +164,7 @@ class Resource(ABC):
         return Base64Resource(base64string, filetype)
 
     @staticmethod
-    def from_local_file(local_path: str) -> "Base64Resource":
+    def from_local_file(local_path: str, lazy: bool = False) -> "Base64Resource":
         """Create a Base64Resource with the contents of a local file.
         The filetype is determined by the extension of the file.
 
@@ -119,12 +172,32 @@ class Resource(ABC):
 
         Args:
             local_path (str): the path to local file.
+            lazy (bool, optional): whether to create a `FileResource`, which only encodes the file when the print job is sent,
+                instead of keeping its base64 representation in memory. Defaults to False, in which case the base64 representation
+                is shared by all resources created from the same file (see `own_utils.EncodingCache`).
 
         Returns:
             Base64Resource: the created Base64Resource.
         """
+        if lazy:
+            return FileResource(local_path)
         return Base64Resource(
-            file_utils.read_file_as_base64(local_path),
+            get_encoding_cache().read_file(local_path),
+            type_utils.path_to_extension(local_path),
+        )
+
+    @staticmethod
+    async def from_local_file_async(local_path: str) -> "Base64Resource":
+        """Async version of `Resource.from_local_file`, reading the file without blocking the event loop.
+
+        Args:
+            local_path (str): the path to local file.
+
+        Returns:
+            Base64Resource: the created Base64Resource.
+        """
+        return Base64Resource(
+            await get_encoding_cache().read_file_async(local_path),
             type_utils.path_to_extension(local_path),
         )
 
@@ -142,16 +215,29 @@ class Resource(ABC):
         return ServerPathResource(path)
 
     @staticmethod
-    def from_url(url: str, filetype: str) -> "URLResource":
+    def from_url(
+        url: str,
+        filetype: str,
+        fetch: bool = False,
+        max_size: int = None,
+        session: requests.Session = None,
+    ) -> Union["URLResource", "Base64Resource"]:
         """Create an URLResource targeting the file at a given URL.
 
         Args:
             url (str): the file URL.
             filetype (str): the file type (extension).
+            fetch (bool, optional): whether to download the file here and create a Base64Resource with its contents,
+                for a URL that the Cloud Office Print server cannot reach (see `own_utils.file_utils.url_as_base64`). Defaults to False.
+            max_size (int, optional): maximum size in bytes of a fetched file. Defaults to None (unlimited).
+            session (requests.Session, optional): session that fetches the file, e.g. `config.Server.session` to reuse the pooled connections of a server.
+                Defaults to None (a session for this fetch only).
 
         Returns:
-            URLResource: the created URLResource.
+            Union[URLResource, Base64Resource]: the created URLResource, or the Base64Resource if the file is fetched.
         """
+        if fetch:
+            return Base64Resource(file_utils.url_as_base64(url, max_size, session=session), filetype)
         return URLResource(url, filetype)
 
     @staticmethod
@@ -183,11 +269,15 @@ class RawResource(Resource):
 
     @property
     def base64(self) -> str:
-        """
+        """The base64 representation is shared by all resources with the same content, see `own_utils.EncodingCache`.
+
         Returns:
             str: the base64 representation of the raw data in `RawResource.data`.
         """
-        return file_utils.raw_to_base64(self.data)
+        return get_encoding_cache().encode(self.data, self.digest)
+
+    def _hexdigests(self) -> Dict[str, str]:
+        return self._cached_hexdigests(lambda: self.data)
 
     @property
     def template_dict(self) -> Dict:
@@ -218,17 +308,22 @@ class Base64Resource(Resource):
 
     def __init__(
         self,
-        base64string: str,
+        base64string: Union[str, json_utils.LazyBase64],
         filetype: str,
     ):
         """Create a new Base64Resource.
 
         Args:
-            base64string (str): the base64 encoded data.
+            base64string (Union[str, json_utils.LazyBase64]): the base64 encoded data.
             filetype (str): the file type (extension).
         """
         super().__init__(base64string, filetype)
 
+    def _hexdigests(self) -> Dict[str, str]:
+        if isinstance(self.data, json_utils.LazyBase64):
+            return self.data.hexdigests()
+        return self._cached_hexdigests(lambda: base64.b64decode(self.data))
+
     @property
     def template_dict(self) -> Dict:
         """
@@ -253,6 +348,40 @@ class Base64Resource(Resource):
         }
 
 
+class FileResource(Base64Resource):
+    """A `Base64Resource` backed by a local file, which only keeps the path, size and modification time of the file in memory.
+
+    The file is memory-mapped and encoded incrementally into the request body when the print job is sent
+    (see `own_utils.json_utils.LazyBase64`). When the resource is sent as its hash (see `Template.should_hash` and `Resource.should_hash`),
+    it is never encoded at all: its digests are computed from the raw file.
+    """
+
+    def __init__(self, path: str, filetype: str = None):
+        """Create a new FileResource.
+
+        Throws IOError if the file does not exist.
+
+        Args:
+            path (str): the path to the local file.
+            filetype (str, optional): the file type (extension). Defaults to the extension of the file.
+        """
+        stat = os.stat(path)
+        super().__init__(json_utils.LazyBase64(path), filetype or type_utils.path_to_extension(path))
+        self.path: str = path
+        self.size: int = stat.st_size
+        self.mtime: float = stat.st_mtime
+
+    @property
+    def modified(self) -> bool:
+        """Whether the file changed since this resource was created. The current content of the file is always sent.
+
+        Returns:
+            bool: whether the size or modification time of the file differs
+        """
+        stat = os.stat(self.path)
+        return (stat.st_size, stat.st_mtime) != (self.size, self.mtime)
+
+
 class ServerPathResource(Resource):
     """A `Resource` targeting a file on the server."""
 
@@ -1,11 +1,31 @@
 """
 Module containing the Response class, which is also exposed at package level.
+
+A `Response` holds the complete output of a print job.
+Large outputs are spooled to a temporary file instead of being kept in memory.
+To process the output while it is being downloaded, use `PrintJob.execute_stream`, which returns a `StreamingResponse`.
+A zip file with several outputs (e.g. for a print job with a `Mapping` of files as data) can be read one output at a time
+with `Response.iter_files` and `Response.open_member`, or extracted in parallel with `Response.extract_all`.
 """
 
+import os
 import requests
-from .own_utils import type_utils
+import shutil
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+from typing import AsyncIterator, BinaryIO, Iterator, List, Tuple, Union
+from .config import AsyncResponse
+from .own_utils import type_utils, file_utils
 from os.path import splitext
 
+CHUNK_SIZE = 64 * 1024
+"""Size in bytes of the chunks in which output is read from the server."""
+
+SPOOL_THRESHOLD = 16 * 1024 * 1024
+"""Default size in bytes above which the output in a `Response` is stored in a temporary file instead of in memory."""
+
 
 class Response():
     """The Response class serves as a container for and interface with the Cloud Office Print server's response to a printjob request.
@@ -13,14 +33,59 @@ class Response():
     The Cloud Office Print server can also throw an error, in which case you will be dealing with a cloudofficeprint.exceptions.COPError instead of this class.
     """
 
-    def __init__(self, response: requests.Response):
+    def __init__(self,
+                 response: Union[requests.Response, AsyncResponse],
+                 spool_threshold: int = SPOOL_THRESHOLD):
         """You should never need to construct a Response manually.
 
         Args:
-            response (requests.Response): Response object from the requests package
+            response (Union[requests.Response, AsyncResponse]): Response object from the requests package or from the asynchronous transport
+            spool_threshold (int, optional): size in bytes above which the output is stored in a temporary file instead of in memory. Defaults to `SPOOL_THRESHOLD`.
         """
         self._mimetype = response.headers["Content-Type"]
-        self._bytes = response.content
+        self._file = SpooledTemporaryFile(max_size=spool_threshold)
+        self._archive: zipfile.ZipFile = None
+        if isinstance(response, requests.Response):
+            for chunk in response.iter_content(CHUNK_SIZE):
+                self._file.write(chunk)
+        else:
+            self._file.write(response.content)
+
+    @staticmethod
+    def _from_file(file: SpooledTemporaryFile, mimetype: str) -> "Response":
+        """Create a Response holding the output in `file`, e.g. output combined from several responses.
+
+        Args:
+            file (SpooledTemporaryFile): the file containing the output, which is owned by the Response from now on
+            mimetype (str): mime type of the output
+
+        Returns:
+            Response: the created Response
+        """
+        result = Response.__new__(Response)
+        result._mimetype = mimetype
+        result._file = file
+        result._archive = None
+        return result
+
+    @staticmethod
+    async def _from_async_response(response: AsyncResponse, spool_threshold: int = SPOOL_THRESHOLD) -> "Response":
+        """Create a Response from a streamed `AsyncResponse`, writing its body to the spool while it is received.
+
+        Args:
+            response (AsyncResponse): the streamed response of the asynchronous transport
+            spool_threshold (int, optional): size in bytes above which the output is stored in a temporary file instead of in memory. Defaults to `SPOOL_THRESHOLD`.
+
+        Returns:
+            Response: the created Response
+        """
+        result = Response.__new__(Response)
+        result._mimetype = response.headers["Content-Type"]
+        result._file = SpooledTemporaryFile(max_size=spool_threshold)
+        result._archive = None
+        async for chunk in response.iter_chunks():
+            result._file.write(chunk)
+        return result
 
     @property
     def mimetype(self) -> str:
@@ -46,11 +111,39 @@ class Response():
 
         Response.to_file can be used to output to a file,
         alternatively, use this property to do something else with the binary data.
+        The data is read from the spool every time this property is accessed; for large outputs prefer `Response.to_file` or `Response.iter_chunks`.
 
         Returns:
             bytes: response file as binary
         """
-        return self._bytes
+        self._file.seek(0)
+        return self._file.read()
+
+    @property
+    def size(self) -> int:
+        """Size in bytes of the output file.
+
+        Returns:
+            int: size of the output file
+        """
+        self._file.seek(0, 2)
+        return self._file.tell()
+
+    def iter_chunks(self, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """Iterate over the output file in chunks.
+
+        Args:
+            chunk_size (int, optional): size of the chunks in bytes. Defaults to `CHUNK_SIZE`.
+
+        Yields:
+            bytes: the next chunk of the output file
+        """
+        self._file.seek(0)
+        while True:
+            chunk = self._file.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
 
     def to_string(self) -> str:
         """Return the string representation of this buffer.
@@ -63,14 +156,14 @@ class Response():
             str: string representation of this buffer
         """
         try:
-            return self._bytes.decode('utf-8')
+            return self.binary.decode('utf-8')
         except UnicodeDecodeError as err:
             print("""The method 'to_string()' cannot be called on this object.
             The server response is probably not a string (e.g. JSON).
             To get the bytes of the response, use the property 'binary' instead.""")
             raise err
 
-    def to_file(self, path: str):
+    def to_file(self, path: Union[str, BinaryIO]):
         """Write the response to a file at the given path without extension.
 
         If the given file path does not contain an extension,
@@ -79,13 +172,314 @@ class Response():
         You should only specify the extension in the path if you have some reason to specify the extension manually.
 
         Args:
-            path (str): path without extension
+            path (Union[str, BinaryIO]): path without extension, or a file-like object opened in binary write mode
         """
+        self._file.seek(0)
+        if not isinstance(path, str):
+            shutil.copyfileobj(self._file, path, CHUNK_SIZE)
+            return
 
         if not splitext(path)[1]:
             path += "." + self.filetype
 
         # open the file in binary ("b") and write ("w") mode
-        outfile = open(path, "wb")
-        outfile.write(self.binary)
-        outfile.close()
+        with open(path, "wb") as outfile:
+            shutil.copyfileobj(self._file, outfile, CHUNK_SIZE)
+
+    @property
+    def archive(self) -> zipfile.ZipFile:
+        """The output as a zip file, of which only the central directory is read.
+        The members are read from the spool when they are opened, so they are never all held in memory.
+
+        Raises:
+            zipfile.BadZipFile: if the output is not a zip file
+
+        Returns:
+            zipfile.ZipFile: the zip file
+        """
+        if self._archive is None:
+            self._archive = zipfile.ZipFile(self._file)
+        return self._archive
+
+    @property
+    def member_names(self) -> List[str]:
+        """
+        Returns:
+            List[str]: the names of the files in the zip file of this response, see `Response.archive`
+        """
+        return [info.filename for info in self.archive.infolist() if not info.is_dir()]
+
+    def open_member(self, name: str) -> BinaryIO:
+        """Open a file in the zip file of this response, see `Response.archive`. It is decompressed while it is read.
+
+        Args:
+            name (str): the name of the file in the zip file
+
+        Raises:
+            KeyError: if the zip file has no file with that name
+
+        Returns:
+            BinaryIO: the file, opened for reading in binary mode
+        """
+        return self.archive.open(name)
+
+    def iter_files(self) -> Iterator[Tuple[str, BinaryIO]]:
+        """Iterate over the files in the zip file of this response, see `Response.archive`.
+        Every file is opened when it is reached and closed when the next file is reached, so only one file at a time is read.
+
+        Yields:
+            Tuple[str, BinaryIO]: the name of the next file and the file, opened for reading in binary mode
+        """
+        for info in self.archive.infolist():
+            if info.is_dir():
+                continue
+            with self.archive.open(info) as member:
+                yield info.filename, member
+
+    @staticmethod
+    def _is_inside(root: str, path: str) -> bool:
+        """Whether a path is inside a directory, also when the directory is a root such as `/` or `C:\\`.
+
+        Args:
+            root (str): the resolved path of the directory
+            path (str): the resolved path
+
+        Returns:
+            bool: whether the path is below the directory, and not the directory itself
+        """
+        try:
+            return path != root and os.path.commonpath([root, path]) == root
+        except ValueError:
+            # e.g. on different drives
+            return False
+
+    def extract_all(self, directory: str, max_workers: int = 8) -> List[str]:
+        """Extract the files in the zip file of this response to a directory, decompressing several files at the same time.
+
+        Args:
+            directory (str): the directory, which is created if it does not exist
+            max_workers (int, optional): maximum number of files extracted at the same time. Defaults to 8.
+
+        Raises:
+            ValueError: if a file in the zip file would be extracted outside of `directory`
+
+        Returns:
+            List[str]: the paths of the extracted files, in the order of the zip file
+        """
+        root = os.path.realpath(directory)
+        infos = [info for info in self.archive.infolist() if not info.is_dir()]
+        paths = []
+        for info in infos:
+            path = os.path.realpath(os.path.join(root, info.filename))
+            if not Response._is_inside(root, path):
+                raise ValueError(f'The file "{info.filename}" would be extracted outside of {directory}')
+            paths.append(path)
+        lock = threading.Lock()
+
+        def extract(info: zipfile.ZipInfo, path: str):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # opening a member updates state shared by all members of the zip file, reading them can happen in parallel
+            with lock:
+                member = self.archive.open(info)
+            with member, open(path, "wb") as target:
+                shutil.copyfileobj(member, target, CHUNK_SIZE)
+
+        os.makedirs(root, exist_ok=True)
+        if infos:
+            with ThreadPoolExecutor(min(max_workers, len(infos))) as executor:
+                list(executor.map(extract, infos, paths))
+        return paths
+
+    def close(self):
+        """Release the memory or temporary file holding the output."""
+        if self._archive is not None:
+            self._archive.close()
+        self._file.close()
+
+
+class StreamingResponse():
+    """The output of a print job while it is being downloaded from the Cloud Office Print server.
+
+    Its chunks are passed on as they arrive, so the output is never held in memory in full.
+    If the print job requested base64 output (`config.OutputConfig` with `encoding="base64"`), the output is decoded on the fly.
+    The output can only be consumed once. Use the StreamingResponse as a context manager, or call `StreamingResponse.close`,
+    to release the connection when the output is not read completely.
+    """
+
+    def __init__(self, response: requests.Response, decode_base64: bool = False):
+        """You should never need to construct a StreamingResponse manually.
+
+        Args:
+            response (requests.Response): streamed Response object from the requests package
+            decode_base64 (bool, optional): whether the output is base64 encoded and should be decoded. Defaults to False.
+        """
+        self._mimetype = response.headers["Content-Type"]
+        self._response = response
+        self._decode_base64 = decode_base64
+
+    @property
+    def mimetype(self) -> str:
+        """Mime type of this response.
+
+        Returns:
+            str: mime type of this response
+        """
+        return self._mimetype
+
+    @property
+    def filetype(self) -> str:
+        """File type (extension) of this response. E.g. "docx".
+
+        Returns:
+            str: file type of this response
+        """
+        return type_utils.mimetype_to_extension(self.mimetype)
+
+    def iter_chunks(self, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """Iterate over the output file as it is downloaded.
+
+        Args:
+            chunk_size (int, optional): size in bytes of the chunks read from the server. Defaults to `CHUNK_SIZE`.
+
+        Yields:
+            bytes: the next chunk of the output file
+        """
+        chunks = self._response.iter_content(chunk_size)
+        if self._decode_base64:
+            chunks = file_utils.decode_base64_chunks(chunks)
+        try:
+            yield from chunks
+        finally:
+            self.close()
+
+    def to_file(self, path: Union[str, BinaryIO]):
+        """Write the output to a file while it is downloaded.
+        Like `Response.to_file`, the extension is added to a path without extension.
+
+        Args:
+            path (Union[str, BinaryIO]): path without extension, or a file-like object opened in binary write mode
+        """
+        if not isinstance(path, str):
+            for chunk in self.iter_chunks():
+                path.write(chunk)
+            return
+
+        if not splitext(path)[1]:
+            path += "." + self.filetype
+
+        with open(path, "wb") as outfile:
+            for chunk in self.iter_chunks():
+                outfile.write(chunk)
+
+    def to_response(self, spool_threshold: int = SPOOL_THRESHOLD) -> Response:
+        """Download the output into a `Response`, e.g. to read a zip file with several outputs with `Response.iter_files`.
+        The output is spooled to a temporary file while it is downloaded, so memory stays bounded.
+
+        Args:
+            spool_threshold (int, optional): size in bytes above which the output is stored in a temporary file instead of in memory. Defaults to `SPOOL_THRESHOLD`.
+
+        Returns:
+            Response: the output
+        """
+        spool = SpooledTemporaryFile(max_size=spool_threshold)
+        for chunk in self.iter_chunks():
+            spool.write(chunk)
+        return Response._from_file(spool, self.mimetype)
+
+    def close(self):
+        """Release the connection to the server."""
+        self._response.close()
+
+    def __enter__(self) -> "StreamingResponse":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class AsyncStreamingResponse():
+    """Async version of `StreamingResponse`, for print jobs executed with `PrintJob.execute_stream_async`."""
+
+    def __init__(self, response: AsyncResponse, decode_base64: bool = False):
+        """You should never need to construct an AsyncStreamingResponse manually.
+
+        Args:
+            response (AsyncResponse): streamed response of the asynchronous transport
+            decode_base64 (bool, optional): whether the output is base64 encoded and should be decoded. Defaults to False.
+        """
+        self._mimetype = response.headers["Content-Type"]
+        self._response = response
+        self._decode_base64 = decode_base64
+
+    @property
+    def mimetype(self) -> str:
+        """Mime type of this response.
+
+        Returns:
+            str: mime type of this response
+        """
+        return self._mimetype
+
+    @property
+    def filetype(self) -> str:
+        """File type (extension) of this response. E.g. "docx".
+
+        Returns:
+            str: file type of this response
+        """
+        return type_utils.mimetype_to_extension(self.mimetype)
+
+    async def iter_chunks(self) -> AsyncIterator[bytes]:
+        """Iterate over the output file as it is downloaded.
+
+        Yields:
+            bytes: the next chunk of the output file
+        """
+        chunks = self._response.iter_chunks()
+        if self._decode_base64:
+            chunks = file_utils.decode_base64_chunks_async(chunks)
+        async for chunk in chunks:
+            yield chunk
+
+    async def to_file(self, path: Union[str, BinaryIO]):
+        """Write the output to a file while it is downloaded.
+        Like `Response.to_file`, the extension is added to a path without extension.
+
+        Args:
+            path (Union[str, BinaryIO]): path without extension, or a file-like object opened in binary write mode
+        """
+        if not isinstance(path, str):
+            async for chunk in self.iter_chunks():
+                path.write(chunk)
+            return
+
+        if not splitext(path)[1]:
+            path += "." + self.filetype
+
+        with open(path, "wb") as outfile:
+            async for chunk in self.iter_chunks():
+                outfile.write(chunk)
+
+    async def to_response(self, spool_threshold: int = SPOOL_THRESHOLD) -> Response:
+        """Async version of `StreamingResponse.to_response`.
+
+        Args:
+            spool_threshold (int, optional): size in bytes above which the output is stored in a temporary file instead of in memory. Defaults to `SPOOL_THRESHOLD`.
+
+        Returns:
+            Response: the output
+        """
+        spool = SpooledTemporaryFile(max_size=spool_threshold)
+        async for chunk in self.iter_chunks():
+            spool.write(chunk)
+        return Response._from_file(spool, self.mimetype)
+
+    def close(self):
+        """Release the connection to the server."""
+        self._response.close()
+
+    async def __aenter__(self) -> "AsyncStreamingResponse":
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
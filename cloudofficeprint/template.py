@@ -1,6 +1,8 @@
-import json
-from typing import Dict
+import threading
+from typing import Dict, Iterable, List, Union
 
+from .config import HashStore, Server, ServerPool
+from .own_utils import SingleFlight, json_utils
 from .resource import Resource
 
 
@@ -29,25 +31,46 @@ class Template:
         self.end_delimiter = end_delimiter
         self.should_hash = should_hash
         self.template_hash = template_hash
+        self._lock = threading.Lock()
+        # the print jobs uploading this template to be hashed, by server URL
+        self._uploads = SingleFlight()
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        # the lock and the uploads in progress belong to this process
+        del state["_lock"]
+        del state["_uploads"]
+        return state
+
+    def __setstate__(self, state: Dict):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._uploads = SingleFlight()
 
     def update_hash(self, template_hash: str):
         """Update the Template to store a hash.
         On the next request to the server, the file data will not be sent, only the hash of the template.
+        This method is thread-safe.
 
         Args:
             template_hash (str): the hash of the template.
         """
-        self.template_hash = template_hash
-        self.should_hash = False
+        with self._lock:
+            self.template_hash = template_hash
+            self.should_hash = False
 
     def reset_hash(self, should_hash: bool = True):
         """Reset the stored hash of the template.
+        This method is thread-safe.
 
         Args:
             should_hash (bool, optional): whether the template should be hashed on the server. Defaults to True.
         """
-        self.template_hash = None
-        self.should_hash = should_hash
+        with self._lock:
+            self.template_hash = None
+            self.should_hash = should_hash
+        # servers that did not hash the template before may do so now
+        self._uploads.reset()
 
     @property
     def mimetype(self) -> str:
@@ -63,7 +86,7 @@ class Template:
         Returns:
             str: the JSON representation of this Resource.
         """
-        return json.dumps(self.template_dict)
+        return json_utils.dumps(self.template_dict)
 
     @property
     def template_dict(self) -> Dict:
@@ -71,27 +94,185 @@ class Template:
         Returns:
             Dict: the dictionary representation of this Resource.
         """
-        if self.template_hash and not self.should_hash:
-            dict = {
-                "template_type": self.resource.filetype,
-                "template_hash": self.template_hash,
-            }
-            if self.start_delimiter:
-                dict["start_delimiter"] = self.start_delimiter
-            if self.end_delimiter:
-                dict["end_delimiter"] = self.end_delimiter
-            return dict
+        with self._lock:
+            should_hash, template_hash = self.should_hash, self.template_hash
+        if template_hash and not should_hash:
+            return self._hash_dict(template_hash)
         dict = self.resource.template_dict
         if self.start_delimiter:
             dict["start_delimiter"] = self.start_delimiter
         if self.end_delimiter:
             dict["end_delimiter"] = self.end_delimiter
-        if self.should_hash:
-            dict["should_hash"] = self.should_hash
-        if self.template_hash:
-            dict["template_hash"] = self.template_hash
+        if should_hash:
+            dict["should_hash"] = should_hash
+        if template_hash:
+            dict["template_hash"] = template_hash
+        return dict
+
+    def _hash_dict(self, template_hash: str) -> Dict:
+        """The dictionary representation of this template when it is sent only as a hash.
+
+        Args:
+            template_hash (str): the hash of the template on the server
+
+        Returns:
+            Dict: the dictionary representation of this template.
+        """
+        dict = {
+            "template_type": self.resource.filetype,
+            "template_hash": template_hash,
+        }
+        if self.start_delimiter:
+            dict["start_delimiter"] = self.start_delimiter
+        if self.end_delimiter:
+            dict["end_delimiter"] = self.end_delimiter
         return dict
 
+    def _template_dict(self, store: HashStore = None, server: Server = None) -> Dict:
+        """The dictionary representation of this template for a print job on a server.
+
+        If the template should be hashed and `store` holds the hash that the server issued for the content of this template,
+        only that hash is sent.
+
+        Args:
+            store (HashStore, optional): the store of the hashes issued by the servers. Defaults to None.
+            server (Server, optional): the server the print job is sent to. Defaults to None.
+
+        Returns:
+            Dict: the dictionary representation of this template.
+        """
+        template_hash = self._stored_hash(store, server)
+        if template_hash is not None:
+            return self._hash_dict(template_hash)
+        return self.template_dict
+
+    def _stored_hash(self, store: HashStore, server: Server) -> str:
+        """The hash that a server issued for the content of this template, if this template should be hashed.
+
+        Any server of a `config.ServerPool` may receive a print job, so a pool only has a hash if all of its servers issued the same hash.
+
+        Args:
+            store (HashStore): the store of the hashes issued by the servers
+            server (Server): the server
+
+        Returns:
+            str: the hash, or None if `store` is None or holds no hash for this template
+        """
+        if store is None or not self.should_hash or self.template_hash:
+            return None
+        digest = self.resource.digest
+        if digest is None:
+            return None
+        hashes = {store.get(url, digest) for url in Template._server_urls(server)}
+        return hashes.pop() if len(hashes) == 1 else None
+
+    def _is_hashed(self, store: HashStore, server: Server) -> bool:
+        """Whether this template is sent to a server as a hash, i.e. it does not need to be uploaded to be hashed.
+
+        Args:
+            store (HashStore): the store of the hashes issued by the servers
+            server (Server): the server
+
+        Returns:
+            bool: whether this template is sent as a hash
+        """
+        if not self.should_hash:
+            return True
+        return self._stored_hash(store, server) is not None
+
+    def _is_sent_as_hash(self, store: HashStore, server: Server) -> bool:
+        """Whether only the hash of this template is sent to a server, see `Template._template_dict`.
+
+        Args:
+            store (HashStore): the store of the hashes issued by the servers
+            server (Server): the server
+
+        Returns:
+            bool: whether the content of this template is not sent
+        """
+        with self._lock:
+            should_hash, template_hash = self.should_hash, self.template_hash
+        if template_hash and not should_hash:
+            return True
+        return self._stored_hash(store, server) is not None
+
+    @staticmethod
+    def _server_urls(server: Server) -> List[str]:
+        """
+        Args:
+            server (Server): a server or a pool of servers
+
+        Returns:
+            List[str]: the URLs of the server, or of all servers of the pool
+        """
+        if isinstance(server, ServerPool):
+            return [node.url for node in server.servers]
+        return [server.url]
+
+    def prewarm(self, servers: Union[Server, Iterable[Server]], max_workers: int = 8) -> List["PrewarmResult"]:
+        """Make every server cache this template before a batch of print jobs, so the print jobs of the batch only send its hash.
+
+        Every single server (also every server of a `config.ServerPool`) is checked to be reachable and is sent the smallest print job
+        that makes it issue a hash for this template, unless it already knows the hash this template has for it.
+        The issued hashes are recorded in `config.ServerConfig.template_hash_store` of the server or pool if this template has `should_hash`,
+        otherwise in this template if every server issued the same hash (see `Template.update_hash`).
+        The servers are pre-warmed concurrently and errors are stored in the results instead of being raised.
+
+        Args:
+            servers (Union[Server, Iterable[Server]]): a server, a `config.ServerPool` or several of them
+            max_workers (int, optional): maximum number of servers pre-warmed at the same time. Defaults to 8.
+
+        Returns:
+            List[PrewarmResult]: the outcome and timing for every single server
+        """
+        return Template.prewarm_many([self], servers, max_workers)
+
+    async def prewarm_async(self, servers: Union[Server, Iterable[Server]], max_workers: int = 8) -> List["PrewarmResult"]:
+        """Async version of `Template.prewarm`.
+
+        Args:
+            servers (Union[Server, Iterable[Server]]): a server, a `config.ServerPool` or several of them
+            max_workers (int, optional): maximum number of servers pre-warmed at the same time. Defaults to 8.
+
+        Returns:
+            List[PrewarmResult]: the outcome and timing for every single server
+        """
+        return await Template.prewarm_many_async([self], servers, max_workers)
+
+    @staticmethod
+    def prewarm_many(templates: Iterable["Template"],
+                     servers: Union[Server, Iterable[Server]],
+                     max_workers: int = 8) -> List["PrewarmResult"]:
+        """Pre-warm several templates on several servers concurrently, see `Template.prewarm`.
+
+        Args:
+            templates (Iterable[Template]): the templates
+            servers (Union[Server, Iterable[Server]]): a server, a `config.ServerPool` or several of them
+            max_workers (int, optional): maximum number of uploads at the same time. Defaults to 8.
+
+        Returns:
+            List[PrewarmResult]: the outcome and timing for every template on every single server
+        """
+        from .prewarm import prewarm
+        return prewarm(templates, servers, max_workers)
+
+    @staticmethod
+    async def prewarm_many_async(templates: Iterable["Template"],
+                                 servers: Union[Server, Iterable[Server]],
+                                 max_workers: int = 8) -> List["PrewarmResult"]:
+        """Async version of `Template.prewarm_many`.
+
+        Args:
+            templates (Iterable[Template]): the templates
+            servers (Union[Server, Iterable[Server]]): a server, a `config.ServerPool` or several of them
+            max_workers (int, optional): maximum number of uploads at the same time. Defaults to 8.
+
+        Returns:
+            List[PrewarmResult]: the outcome and timing for every template on every single server
+        """
+        from .prewarm import prewarm_async
+        return await prewarm_async(templates, servers, max_workers)
+
     def __str__(self) -> str:
         """Override the string representation of this class to return the template-style json.
 
@@ -167,12 +348,42 @@ class Template:
         end_delimiter: str = None,
         should_hash: bool = None,
         template_hash: str = None,
+        lazy: bool = False,
     ) -> "Template":
         """Create a Template with a Base64Resource with the contents of a local file.
         The filetype is determined by the extension of the file.
 
         Throws IOError if it can't read the file.
 
+        Args:
+            local_path (str): the path to local file.
+            start_delimiter (str, optional): the starting delimiter used in the template.
+            end_delimiter (str, optional): the starting delimiter used in the template.
+            should_hash (bool, optional): whether the template should be hashed on the server.
+            template_hash (str, optional): the hash of the template.
+            lazy (bool, optional): whether to use a `resource.FileResource`, which only encodes the file when the print job is sent, see `Resource.from_local_file`. Defaults to False.
+
+        Returns:
+            Template: the created Template.
+        """
+        return Template(
+            Resource.from_local_file(local_path, lazy),
+            start_delimiter,
+            end_delimiter,
+            should_hash,
+            template_hash,
+        )
+
+    @staticmethod
+    async def from_local_file_async(
+        local_path: str,
+        start_delimiter: str = None,
+        end_delimiter: str = None,
+        should_hash: bool = None,
+        template_hash: str = None,
+    ) -> "Template":
+        """Async version of `Template.from_local_file`, reading the file without blocking the event loop.
+
         Args:
             local_path (str): the path to local file.
             start_delimiter (str, optional): the starting delimiter used in the template.
@@ -184,7 +395,7 @@ class Template:
             Template: the created Template.
         """
         return Template(
-            Resource.from_local_file(local_path),
+            await Resource.from_local_file_async(local_path),
             start_delimiter,
             end_delimiter,
             should_hash,
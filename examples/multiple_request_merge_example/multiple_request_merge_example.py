@@ -34,22 +34,25 @@ config = cop.config.OutputConfig(
 
 # Let's assume that the Cloud Office Print server can't handle all the data at once, so we need to split our data into multiple requests.
 # Let's use 10 requests with each 10 elements in the data (a total of 100 data elements).
-output_files = []
-for i in range(10):
-    # Create print job with 10 data elements
-    print_job = cop.PrintJob(
+template = cop.Resource.from_local_file("template.docx")
+print_jobs = [
+    cop.PrintJob(
         data={
             # Select 10 data elements from the data
             k[0]: k[1]
             for k in list(data.items())[i * 10 : (i + 1) * 10]
         },
         server=server,
-        template=cop.Resource.from_local_file("template.docx"),
+        template=template,
         output_config=config,
     )
+    for i in range(10)
+]
 
-    # Execute the print job and save the response to a list
-    output_files.append(print_job.execute())
+# Execute the print jobs, at most 4 at the same time, and save the responses to a list (in the order of the print jobs)
+output_files = [
+    result.result() for result in cop.PrintJob.execute_many(print_jobs, max_in_flight=4)
+]
 
 
 # Create the final request to merge all the received (merged) PDFs
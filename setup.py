@@ -21,4 +21,5 @@ setuptools.setup(
     ],
     python_requires='>=3.7',
     install_requires=['requests','pandas'],
+    extras_require={'fast': ['orjson']},
 )
@@ -102,3 +102,42 @@ if __name__ == "__main__":
     from tests.test_elements import run as test_elements
 
     test_elements()
+    from tests.test_server import run as test_server
+
+    test_server()
+    from tests.test_async import run as test_async_transport
+
+    test_async_transport()
+    from tests.test_batch import run as test_batch
+
+    test_batch()
+    from tests.test_response import run as test_response
+
+    test_response()
+    from tests.test_json import run as test_json
+
+    test_json()
+    from tests.test_compression import run as test_compression
+
+    test_compression()
+    from tests.test_retry import run as test_retry
+
+    test_retry()
+    from tests.test_server_pool import run as test_server_pool
+
+    test_server_pool()
+    from tests.test_split import run as test_split
+
+    test_split()
+    from tests.test_polling import run as test_polling
+
+    test_polling()
+    from tests.test_hash_store import run as test_hash_store
+
+    test_hash_store()
+    from tests.test_prewarm import run as test_prewarm
+
+    test_prewarm()
+    from tests.test_encoding_cache import run as test_encoding_cache
+
+    test_encoding_cache()
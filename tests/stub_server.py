@@ -0,0 +1,106 @@
+"""A local stand-in for a Cloud Office Print server, used by the tests that need to send real HTTP requests."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Tuple
+
+
+class StubRequest:
+    """A request as received by the `StubServer`."""
+
+    def __init__(self, method: str, path: str, headers: Dict[str, str], body: bytes):
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.body = body
+
+
+class StubServer:
+    """A threaded HTTP/1.1 server on localhost that answers like a Cloud Office Print server.
+
+    Routes map a (method, path) tuple to a handler taking the `StubRequest` and returning (status, headers, body).
+    A body given as a list of chunks is sent with chunked transfer encoding.
+    Unknown GET paths return their path as text, unknown POST requests return a small docx-typed body.
+    """
+
+    def __init__(self, routes: Dict[Tuple[str, str], Callable] = None):
+        self.routes = dict(routes) if routes else {}
+        self.requests: List[StubRequest] = []
+        self.connections = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                with stub._lock:
+                    stub.connections += 1
+                super().setup()
+
+            def log_message(self, *args):
+                pass
+
+            def _body(self) -> bytes:
+                if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                    chunks = []
+                    while True:
+                        size = int(self.rfile.readline().strip().split(b";")[0], 16)
+                        if size == 0:
+                            self.rfile.readline()
+                            break
+                        chunks.append(self.rfile.read(size))
+                        self.rfile.readline()
+                    return b"".join(chunks)
+                return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            def _handle(self):
+                request = StubRequest(self.command, self.path, dict(self.headers), self._body())
+                with stub._lock:
+                    stub.requests.append(request)
+                handler = stub.routes.get((self.command, self.path.split("?")[0]))
+                if handler is not None:
+                    status, headers, body = handler(request)
+                elif self.command == "GET" and self.path == "/marco":
+                    status, headers, body = 200, {}, b"polo"
+                elif self.command == "GET":
+                    status, headers, body = 200, {}, self.path.encode()
+                else:
+                    status, headers, body = 200, {
+                        "Content-Type": "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+                    }, b"output"
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                if isinstance(body, list):
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    for chunk in body:
+                        self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                    self.wfile.write(b"0\r\n\r\n")
+                    return
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = _handle
+            do_POST = _handle
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        # a handler raising an exception drops the connection, which is how tests simulate network failures
+        self._httpd.handle_error = lambda request, client_address: None
+        self._thread = threading.Thread(target=self._httpd.serve_forever, args=(0.05,), daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}/"
+
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,199 @@
+import asyncio
+import pathlib
+import threading
+import time
+
+import requests
+
+import cloudofficeprint as cop
+from cloudofficeprint.config.async_transport import AsyncTransport
+
+from tests.stub_server import StubServer
+
+
+def test_execute_async():
+    """Test that many concurrent print jobs share a bounded pool of connections on one event loop"""
+    with StubServer() as stub:
+        server = cop.config.Server(stub.url, cop.config.ServerConfig(pool_maxsize=4))
+        printjobs = [
+            cop.PrintJob(cop.elements.Property("test", str(i)), server)
+            for i in range(200)
+        ]
+
+        async def execute_all():
+            results = await asyncio.gather(*(printjob.execute_async() for printjob in printjobs))
+            await server.aclose()
+            return results
+
+        results = asyncio.run(execute_all())
+        assert [result.binary for result in results] == [b"output"] * 200
+        assert [result.mimetype for result in results] == [
+            "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+        ] * 200
+        assert stub.connections <= 4
+        bodies = sorted(r.body for r in stub.requests if r.method == "POST")
+        assert bodies == sorted(printjob.json.encode("utf-8") for printjob in printjobs)
+
+
+def test_server_async():
+    """Test the async versions of the server methods"""
+    routes = {
+        ("GET", "/supported_template_mimetypes"): lambda request: (200, {}, [b'{"docx": ', b'"a"}']),
+        ("GET", "/verify_template_hash"): lambda request: (200, {}, b'{"valid": true}'),
+    }
+    with StubServer(routes) as stub:
+        server = cop.config.Server(stub.url, cop.config.ServerConfig(metadata_ttl=0))
+
+        async def query():
+            assert await server.is_reachable_async()
+            assert await server.get_version_cop_async() == "/version"
+            assert await server.get_version_soffice_async() == "/soffice"
+            assert await server.get_supported_template_mimetypes_async() == {"docx": "a"}
+            assert await server.verify_template_hash_async("hash")
+            await server.aclose()
+
+        asyncio.run(query())
+        assert stub.connections == 1
+
+
+def test_execute_async_unreachable():
+    """Test that an unreachable server raises a ConnectionError"""
+    with StubServer() as stub:
+        url = stub.url
+    server = cop.config.Server(url)
+    printjob = cop.PrintJob(cop.elements.Property("test", "test"), server)
+    try:
+        asyncio.run(printjob.execute_async())
+        assert False
+    except ConnectionError:
+        pass
+
+
+def test_async_transport_body():
+    """Test that a request body given as an iterable is produced in a worker thread, not on the event loop"""
+    threads = []
+
+    def body():
+        for i in range(3):
+            threads.append(threading.current_thread())
+            yield b"chunk%d" % i
+
+    with StubServer() as stub:
+        async def send():
+            transport = AsyncTransport()
+            response = await transport.request("POST", stub.url, data=body())
+            await response.read()
+            await transport.close()
+            return threading.current_thread()
+
+        loop_thread = asyncio.run(send())
+        assert stub.requests[0].body == b"chunk0chunk1chunk2"
+        assert threads and loop_thread not in threads
+
+
+def test_async_transport_errors():
+    """Test that invalid responses and timeouts raise the exceptions of requests and close their connections"""
+    routes = {
+        ("GET", "/large_header"): lambda request: (200, {"X-Large": "a" * 100000}, b""),
+        ("GET", "/slow"): lambda request: time.sleep(0.5) or (200, {}, b""),
+    }
+    with StubServer(routes) as stub:
+        class RecordingTransport(AsyncTransport):
+            async def _connect(self, parts, proxy):
+                connection = await super()._connect(parts, proxy)
+                connections.append(connection)
+                return connection
+
+        connections = []
+
+        async def send(path, timeout=None):
+            # the transport is not closed, so only the failed request itself can have closed its connection
+            await RecordingTransport().request("GET", stub.url + path, timeout=timeout)
+
+        for path, timeout, exception in (
+            ("large_header", None, requests.exceptions.ConnectionError),
+            ("slow", 0.1, requests.exceptions.Timeout),
+        ):
+            try:
+                asyncio.run(send(path, timeout))
+                assert False
+            except exception:
+                pass
+        assert len(connections) == 2
+        assert all(connection.writer.is_closing() for connection in connections)
+
+
+def test_async_transport_limits():
+    """Test the timeout per step, malformed responses, dropped streamed responses, the proxy per host and closing with the loop"""
+    def slow_body():
+        for _ in range(6):
+            time.sleep(0.05)
+            yield b"x" * 1000
+
+    environ_lookups = []
+    get_environ_proxies = requests.utils.get_environ_proxies
+
+    async def raw_server(answer: bytes):
+        async def handle(reader, writer):
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(answer)
+            await writer.drain()
+            writer.close()
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        return server, f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/"
+
+    with StubServer() as stub:
+        class RecordingTransport(AsyncTransport):
+            async def _connect(self, parts, proxy):
+                connection = await super()._connect(parts, proxy)
+                connections.append(connection)
+                return connection
+
+        connections = []
+
+        async def send():
+            transport = RecordingTransport(max_connections_per_host=1)
+            # the upload takes longer than the timeout, but every step of it is within the timeout
+            response = await transport.request("POST", stub.url, data=slow_body(), timeout=0.2)
+            assert response.status_code == 200 and len(stub.requests[-1].body) == 6000
+            # a streamed response that is dropped unread gives back the only connection slot
+            await transport.request("GET", stub.url + "dropped", stream=True)
+            response = await asyncio.wait_for(transport.request("GET", stub.url + "next"), 1)
+            assert response.content == b"/next"
+            for answer in (b"HTTP/1.1 \xb200 OK\r\n\r\n", b"HTTP/1.1 200 OK\r\nContent-Length: 1x\r\n\r\n"):
+                server, url = await raw_server(answer)
+                try:
+                    await transport.request("GET", url)
+                    assert False
+                except requests.exceptions.ConnectionError:
+                    pass
+                server.close()
+            # the transport is not closed: the end of the loop closes its idle connections
+
+        requests.utils.get_environ_proxies = lambda url, no_proxy=None: environ_lookups.append(url) or {}
+        try:
+            asyncio.run(send())
+        finally:
+            requests.utils.get_environ_proxies = get_environ_proxies
+    assert len(environ_lookups) == 3
+    assert connections and all(connection.writer.is_closing() for connection in connections)
+
+
+def test_template_local_file_async():
+    local_path = str(pathlib.Path().resolve()) + "/tests/data/template.docx"
+    template = asyncio.run(cop.Template.from_local_file_async(local_path))
+    assert template.template_dict == cop.Template.from_local_file(local_path).template_dict
+
+
+def run():
+    test_execute_async()
+    test_server_async()
+    test_execute_async_unreachable()
+    test_async_transport_body()
+    test_async_transport_errors()
+    test_async_transport_limits()
+    test_template_local_file_async()
+
+
+if __name__ == "__main__":
+    run()
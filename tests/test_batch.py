@@ -0,0 +1,173 @@
+import asyncio
+import json
+import threading
+import time
+
+import cloudofficeprint as cop
+
+from tests.stub_server import StubServer
+
+
+def batch_stub() -> StubServer:
+    """A stub server that renders a job slowly, fails for jobs with a negative value and tracks the number of concurrent jobs."""
+    state = {"in_flight": 0, "max_in_flight": 0}
+    lock = threading.Lock()
+
+    def render(request):
+        value = int(json.loads(request.body)["files"][0]["data"]["test"])
+        with lock:
+            state["in_flight"] += 1
+            state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        time.sleep(0.01 * (value % 3))
+        with lock:
+            state["in_flight"] -= 1
+        if value < 0:
+            return 400, {}, b"negative value\ncontact support\nencoded"
+        return 200, {"Content-Type": "application/pdf"}, str(value).encode()
+
+    stub = StubServer({("POST", "/"): render})
+    stub.state = state
+    return stub
+
+
+def printjobs(server, values):
+    for value in values:
+        yield cop.PrintJob(cop.elements.Property("test", str(value)), server)
+
+
+def test_execute_many_ordered():
+    """Test that a batch returns results in input order and captures errors per job"""
+    values = [i if i % 7 else -i - 1 for i in range(30)]
+    with batch_stub() as stub:
+        server = cop.config.Server(stub.url)
+        results = list(cop.PrintJob.execute_many(printjobs(server, values), max_in_flight=4))
+        server.close()
+    assert [result.index for result in results] == list(range(30))
+    for value, result in zip(values, results):
+        if value < 0:
+            assert not result.ok
+            assert isinstance(result.error, cop.exceptions.COPError)
+            assert result.error.user_message == "negative value"
+        else:
+            assert result.ok
+            assert result.result().binary == str(value).encode()
+    assert 1 < stub.state["max_in_flight"] <= 4
+
+
+def test_execute_many_unordered():
+    """Test that a batch can return results as they complete"""
+    with batch_stub() as stub:
+        server = cop.config.Server(stub.url)
+        results = list(cop.PrintJob.execute_many(printjobs(server, range(20)), max_in_flight=3, ordered=False))
+        server.close()
+    assert sorted(result.index for result in results) == list(range(20))
+    assert all(result.response.binary == str(result.index).encode() for result in results)
+    assert stub.state["max_in_flight"] <= 3
+
+
+def test_execute_many_refill():
+    """Test that an ordered batch starts a new job whenever any job completes, not only when the first pending one does"""
+    def refill_stub():
+        others_done = threading.Event()
+        state = {"others": 0, "refilled": False}
+        lock = threading.Lock()
+
+        def render(request):
+            value = int(json.loads(request.body)["files"][0]["data"]["test"])
+            if value == 0:
+                # the first job only completes once the other jobs have gone through the remaining slot
+                state["refilled"] = others_done.wait(5)
+            else:
+                with lock:
+                    state["others"] += 1
+                    if state["others"] == 9:
+                        others_done.set()
+            return 200, {"Content-Type": "application/pdf"}, str(value).encode()
+
+        stub = StubServer({("POST", "/"): render})
+        stub.state = state
+        return stub
+
+    async def execute_async(server):
+        results = [result async for result in cop.PrintJob.execute_many_async(printjobs(server, range(10)), max_in_flight=2)]
+        await server.aclose()
+        return results
+
+    for execute in (
+        lambda server: list(cop.PrintJob.execute_many(printjobs(server, range(10)), max_in_flight=2)),
+        lambda server: asyncio.run(execute_async(server)),
+    ):
+        with refill_stub() as stub:
+            server = cop.config.Server(stub.url)
+            results = execute(server)
+            server.close()
+        assert stub.state["refilled"]
+        assert [result.response.binary for result in results] == [str(i).encode() for i in range(10)]
+
+
+def test_execute_many_async():
+    """Test the async version of a batch"""
+    values = [5, -1, 3, 8, 2, 1]
+
+    async def execute():
+        results = [result async for result in cop.PrintJob.execute_many_async(printjobs(server, values), max_in_flight=2)]
+        await server.aclose()
+        return results
+
+    with batch_stub() as stub:
+        server = cop.config.Server(stub.url)
+        results = asyncio.run(execute())
+    assert [result.ok for result in results] == [value >= 0 for value in values]
+    assert [result.response.binary for result in results if result.ok] == [b"5", b"3", b"8", b"2", b"1"]
+    assert stub.state["max_in_flight"] <= 2
+
+
+def test_prepare_many():
+    """Test that the resources of a batch are hashed and encoded once ahead of serialization, within the encoding cache"""
+    previous = cop.own_utils.get_encoding_cache()
+    cache = cop.own_utils.EncodingCache()
+    cop.own_utils.set_encoding_cache(cache)
+    try:
+        server = cop.config.Server("http://localhost:8010/", cop.config.ServerConfig(hash_secondary_files=True))
+        shared = [cop.Resource.from_raw(b"shared %d" % i, "pdf") for i in range(4)]
+        hashed = cop.Resource.from_raw(b"hashed", "pdf")
+        hashed.should_hash = True
+        lazy = cop.Resource.from_local_file("./tests/data/template.docx", lazy=True)
+
+        def not_encoded(*args):
+            raise AssertionError("lazy files should not be encoded ahead")
+
+        lazy.data.iter_encoded = not_encoded
+        jobs = [
+            cop.PrintJob(
+                cop.elements.Property("a", str(i)), server,
+                append_files=[*shared, cop.Resource.from_raw(b"own %d" % i, "pdf"), lazy],
+                subtemplates={"sub": hashed},
+            )
+            for i in range(3)
+        ]
+        cop.PrintJob.prepare_many(jobs)
+        assert hashed._digests is not None
+        assert (cache.hits, cache.misses) == (0, 8)
+        for job in jobs:
+            assert job.as_dict["append_files"][0]["file_content"] == "c2hhcmVkIDA="
+        assert cache.misses == 8
+
+        # resources that do not fit in the cache together are not encoded ahead
+        cop.own_utils.set_encoding_cache(cop.own_utils.EncodingCache(max_bytes=10))
+        cop.PrintJob.prepare_many(jobs)
+        assert cop.own_utils.get_encoding_cache().misses == 0
+    finally:
+        cop.own_utils.set_encoding_cache(previous)
+
+
+def run():
+    test_execute_many_ordered()
+    test_execute_many_unordered()
+    test_execute_many_refill()
+    test_execute_many_async()
+    test_prepare_many()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,84 @@
+import asyncio
+import gzip
+
+import cloudofficeprint as cop
+
+from tests.stub_server import StubServer
+
+
+def large_printjob(server: cop.config.Server) -> cop.PrintJob:
+    rows = [
+        cop.elements.ElementCollection.from_mapping({"name": f"customer {i}", "total": i * 1.5})
+        for i in range(2000)
+    ]
+    return cop.PrintJob(cop.elements.ForEach("rows", rows), server)
+
+
+def test_gzip_request():
+    """Test that compressed bodies decode to the uncompressed bodies byte for byte"""
+    with StubServer() as stub:
+        expected = []
+        for chunked in (True, False):
+            server = cop.config.Server(
+                stub.url, cop.config.ServerConfig(compression="gzip", chunked_requests=chunked)
+            )
+            printjob = large_printjob(server)
+            printjob.execute()
+            expected.append(printjob.json.encode("utf-8"))
+            server.close()
+        compressed = [r for r in stub.requests if r.method == "POST"]
+        for request, body in zip(compressed, expected):
+            assert request.headers["Content-Encoding"] == "gzip"
+            assert len(request.body) < len(body) / 5
+            assert gzip.decompress(request.body) == body
+
+
+def test_gzip_threshold():
+    """Test that bodies smaller than the threshold are sent uncompressed"""
+    with StubServer() as stub:
+        for chunked in (True, False):
+            server = cop.config.Server(
+                stub.url, cop.config.ServerConfig(compression="gzip", chunked_requests=chunked)
+            )
+            printjob = cop.PrintJob(cop.elements.Property("test", "test"), server)
+            printjob.execute()
+            server.close()
+        for request in stub.requests:
+            assert "Content-Encoding" not in request.headers
+            if request.method == "POST":
+                assert request.body == printjob.json.encode("utf-8")
+
+
+def test_gzip_request_async():
+    """Test that the asynchronous transport sends compressed bodies too"""
+    with StubServer() as stub:
+        server = cop.config.Server(stub.url, cop.config.ServerConfig(compression="gzip"))
+        printjob = large_printjob(server)
+
+        async def execute():
+            await printjob.execute_async()
+            await server.aclose()
+
+        asyncio.run(execute())
+        request = [r for r in stub.requests if r.method == "POST"][0]
+        assert request.headers["Content-Encoding"] == "gzip"
+        assert gzip.decompress(request.body) == printjob.json.encode("utf-8")
+
+
+def test_unsupported_compression():
+    try:
+        cop.config.ServerConfig(compression="br")
+        assert False
+    except ValueError:
+        pass
+
+
+def run():
+    test_gzip_request()
+    test_gzip_threshold()
+    test_gzip_request_async()
+    test_unsupported_compression()
+
+
+if __name__ == "__main__":
+    run()
@@ -1,3 +1,5 @@
+import copy
+import pickle
 import sys
 # sys.path.insert(0, "D:/UC/cloudofficeprint-python")
 sys.path.insert(0, "C:/Users/em8ee/OneDrive/Documents/cloudofficeprint-python")
@@ -384,6 +386,33 @@ def test_element_collection():
     }
     assert collection.as_dict == collection_expected
 
+def test_slots():
+    """Test that the elements of large loops have no __dict__ and can still be copied and pickled"""
+    style = cop.elements.CellStyleXlsx(font_bold=True)
+    elements = [
+        cop.elements.Property('prop', 'value'),
+        cop.elements.CellStyleProperty('styled', 'value', style),
+        cop.elements.Hyperlink('link', 'url'),
+        cop.elements.Image.from_url('image', 'url_source', alt_text=''),
+        cop.elements.BarCode('code', 'data', 'ean13'),
+        cop.elements.WiFiQRCode('wifi', 'ssid', 'WPA', wifi_password='secret'),
+        cop.elements.ElementCollection('row', [cop.elements.Property('prop', 'value')]),
+    ]
+    series = cop.elements.LineSeries([1, 2], [3, 4], name='line', smooth=True)
+    for obj in elements + [style, series]:
+        assert not hasattr(obj, '__dict__')
+    for element in elements:
+        for copied in (copy.deepcopy(element), pickle.loads(pickle.dumps(element))):
+            assert copied.name == element.name and copied.as_dict == element.as_dict
+    assert copy.deepcopy(series).as_dict == series.as_dict
+    # subclasses without __slots__ keep a __dict__
+    class Custom(cop.elements.Property):
+        pass
+    custom = Custom('prop', 'value')
+    custom.extra = 'extra'
+    assert custom.as_dict == {'prop': 'value'}
+
+
 def test_freeze_element():
     freezeElement = cop.elements.Freeze(
         name='freeze_element_name',
@@ -518,6 +547,7 @@ def run():
     test_d3_code()
     test_text_box()
     test_element_collection()
+    test_slots()
     test_freeze_element()
     test_protect_element()
     test_insert_element()
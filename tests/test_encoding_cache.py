@@ -0,0 +1,84 @@
+import os
+import tempfile
+
+import cloudofficeprint as cop
+from cloudofficeprint.own_utils import EncodingCache, get_encoding_cache, set_encoding_cache
+
+IMAGE_PATH = "./tests/data/test.jpg"
+
+
+def counters(cache: EncodingCache):
+    return cache.hits, cache.disk_hits, cache.misses
+
+
+def test_lru():
+    """Test that the least recently used strings are evicted to stay within the size limit"""
+    cache = EncodingCache(max_bytes=16)
+    assert cache.encode(b"aaaaaa") == "YWFhYWFh"
+    assert cache.encode(b"bbbbbb") == "YmJiYmJi"
+    assert cache.encode(b"aaaaaa") == "YWFhYWFh"
+    assert counters(cache) == (1, 0, 2) and cache.size == 16
+    # "bbbbbb" is the least recently used
+    cache.encode(b"cccccc")
+    assert len(cache) == 2 and cache.size == 16
+    cache.encode(b"aaaaaa")
+    cache.encode(b"bbbbbb")
+    assert counters(cache) == (2, 0, 4)
+    # too large to be kept in memory
+    cache.encode(b"d" * 100)
+    assert cache.size <= 16
+    cache.clear()
+    assert counters(cache) == (0, 0, 0) and len(cache) == 0
+
+
+def test_files():
+    """Test that files are encoded again when they change, and that the disk tier is shared by caches"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "logo.png")
+        with open(path, "wb") as f:
+            f.write(b"logo")
+        cache = EncodingCache(directory=os.path.join(directory, "cache"))
+        assert cache.read_file(path) == cache.read_file(path) == "bG9nbw=="
+        assert counters(cache) == (1, 0, 1)
+        with open(path, "wb") as f:
+            f.write(b"new logo")
+        assert cache.read_file(path) == "bmV3IGxvZ28="
+        assert counters(cache) == (1, 0, 2)
+        other = EncodingCache(directory=os.path.join(directory, "cache"))
+        assert other.read_file(path) == "bmV3IGxvZ28="
+        assert counters(other) == (0, 1, 0)
+
+
+def test_shared_cache():
+    """Test that resources and elements created from the same content share one encoding"""
+    previous = get_encoding_cache()
+    cache = EncodingCache()
+    set_encoding_cache(cache)
+    try:
+        images = [cop.elements.Image.from_file("logo", IMAGE_PATH) for _ in range(3)]
+        assert all(image.source is images[0].source for image in images)
+        resources = [cop.Resource.from_raw(b"raw content", "docx") for _ in range(2)]
+        assert resources[0].template_dict == resources[1].template_dict
+        assert resources[0].secondary_file_dict["file_content"] == "cmF3IGNvbnRlbnQ="
+        include = cop.elements.PdfInclude.from_file("include", IMAGE_PATH)
+        assert include.as_dict["include"]["name"] == "test.jpg"
+        assert include.as_dict["include"]["mime_type"] == "image/jpeg"
+        assert include.file_content is images[0].source
+        insert = cop.elements.ExcelInsert.from_file("insert", IMAGE_PATH, icon="icon")
+        assert insert.as_dict == {"insert": images[0].source, "insert_icon": "icon"}
+        pdf_options = cop.config.PDFOptions()
+        pdf_options.sign(IMAGE_PATH)
+        assert pdf_options.sign_certificate is images[0].source
+        assert counters(cache) == (7, 0, 2)
+    finally:
+        set_encoding_cache(previous)
+
+
+def run():
+    test_lru()
+    test_files()
+    test_shared_cache()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,262 @@
+import asyncio
+import base64
+import copy
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cloudofficeprint as cop
+
+from tests.stub_server import StubServer
+
+
+def hashing_stub(known: set) -> StubServer:
+    """A stub server that issues a hash for a template sent with should_hash and verifies the hashes in `known`."""
+    def render(request):
+        template = json.loads(request.body)["template"]
+        headers = {"Content-Type": "application/pdf"}
+        if template.get("should_hash"):
+            headers["Template-Hash"] = "hash-" + template["file"][:8]
+            known.add(headers["Template-Hash"])
+        return 200, headers, b"output"
+
+    def verify(request):
+        hashcode = request.path.split("hash=")[1]
+        return 200, {}, json.dumps({"valid": hashcode in known}).encode()
+
+    return StubServer({("POST", "/"): render, ("GET", "/verify_template_hash"): verify})
+
+
+def templates_sent(stub: StubServer):
+    return [json.loads(r.body)["template"] for r in stub.requests if r.method == "POST"]
+
+
+def check_store(store: cop.config.HashStore):
+    assert store.get("http://a/", "digest") is None
+    store.set("http://a/", "digest", "hash1")
+    store.set("http://b", "digest", "hash2")
+    assert store.get("http://a", "digest") == "hash1"
+    assert store.get("http://b/", "digest") == "hash2"
+    assert store.items("http://a") == [("digest", "hash1")]
+    store.delete("http://a", "digest")
+    assert store.get("http://a", "digest") is None
+    assert store.items("http://b") == [("digest", "hash2")]
+
+
+def test_hash_stores():
+    """Test the operations of every hash store"""
+    check_store(cop.config.MemoryHashStore())
+    with tempfile.TemporaryDirectory() as directory:
+        check_store(cop.config.SQLiteHashStore(os.path.join(directory, "hashes.db")))
+        check_store(cop.config.DirectoryHashStore(os.path.join(directory, "hashes")))
+
+
+def test_shared_hash():
+    """Test that templates with the same content share the hash issued by the server, also in another process"""
+    known = set()
+    with tempfile.TemporaryDirectory() as directory, hashing_stub(known) as stub:
+        for _ in range(3):
+            # a new store, server and template for every "process"
+            store = cop.config.SQLiteHashStore(os.path.join(directory, "hashes.db"))
+            server = cop.config.Server(stub.url, cop.config.ServerConfig(template_hash_store=store))
+            template = cop.Template.from_raw(b"template content", "docx", should_hash=True)
+            for _ in range(2):
+                cop.PrintJob(cop.elements.Property("a", "b"), server, template).execute()
+            # the template keeps hashing, for servers without a hash
+            assert template.should_hash and template.template_hash is None
+            server.close()
+        sent = templates_sent(stub)
+        assert "file" in sent[0] and sent[0]["should_hash"]
+        assert all(template == {"template_type": "docx", "template_hash": "hash-dGVtcGxh"} for template in sent[1:])
+        assert len(sent) == 6
+
+
+def test_revalidate():
+    """Test that hashes the server does not know anymore are removed, after which the template is sent again"""
+    known = set()
+    store = cop.config.MemoryHashStore()
+    with hashing_stub(known) as stub:
+        server = cop.config.Server(stub.url, cop.config.ServerConfig(template_hash_store=store))
+        template = cop.Template.from_base64("dGVtcGxhdGU=", "docx", should_hash=True)
+        printjob = cop.PrintJob(cop.elements.Property("a", "b"), server, template)
+        printjob.execute()
+        store.set(stub.url, "unknown", "hash-unknown")
+        assert server.revalidate_template_hashes() == 1
+        assert store.items(stub.url) == [(template.resource.digest, "hash-dGVtcGxh")]
+        # the server restarted and lost its hashes
+        known.clear()
+        assert asyncio.run(server.revalidate_template_hashes_async()) == 1
+        assert store.items(stub.url) == []
+        printjob.execute()
+        assert "file" in templates_sent(stub)[-1]
+        server.close()
+
+
+def test_single_flight_threads():
+    """Test that concurrent print jobs upload a shared template once and send its hash afterwards"""
+    known = set()
+    with hashing_stub(known) as stub:
+        server = cop.config.Server(stub.url)
+        template = cop.Template.from_raw(b"template content", "docx", should_hash=True)
+        printjob = cop.PrintJob(cop.elements.Property("a", "b"), server, template)
+        with ThreadPoolExecutor(8) as executor:
+            outputs = list(executor.map(lambda _: printjob.execute().binary, range(40)))
+        server.close()
+        assert outputs == [b"output"] * 40
+        sent = templates_sent(stub)
+        assert len([template for template in sent if "file" in template]) == 1
+        assert template.template_hash == "hash-dGVtcGxh" and not template.should_hash
+
+
+def test_single_flight_async():
+    """Test that concurrent async print jobs wait for the upload of a shared template, also when the first upload fails"""
+    known = set()
+    state = {"fail": True}
+
+    def render(request):
+        template = json.loads(request.body)["template"]
+        if "file" in template:
+            time.sleep(0.05)
+            if state.pop("fail", False):
+                return 500, {}, b"upload failed\ncontact support\nencoded"
+            return 200, {"Content-Type": "application/pdf", "Template-Hash": "hash"}, b"output"
+        assert template["template_hash"] == "hash"
+        return 200, {"Content-Type": "application/pdf"}, b"output"
+
+    store = cop.config.MemoryHashStore()
+    with StubServer({("POST", "/"): render}) as stub:
+        server = cop.config.Server(stub.url, cop.config.ServerConfig(template_hash_store=store))
+        template = cop.Template.from_raw(b"template content", "docx", should_hash=True)
+        printjobs = [cop.PrintJob(cop.elements.Property("a", str(i)), server, template) for i in range(50)]
+
+        async def execute():
+            results = await asyncio.gather(*(printjob.execute_async() for printjob in printjobs), return_exceptions=True)
+            await server.aclose()
+            return results
+
+        results = asyncio.run(execute())
+        server.close()
+    errors = [result for result in results if isinstance(result, Exception)]
+    assert len(errors) == 1 and errors[0].user_message == "upload failed"
+    assert len([template for template in templates_sent(stub) if "file" in template]) == 2
+    assert store.get(stub.url, template.resource.digest) == "hash"
+
+
+def test_single_flight_no_hash():
+    """Test that print jobs stop waiting for each other once the server renders a template without issuing a hash"""
+    state = {"in_flight": 0, "max_in_flight": 0}
+    lock = threading.Lock()
+
+    def render(request):
+        with lock:
+            state["in_flight"] += 1
+            state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        time.sleep(0.05)
+        with lock:
+            state["in_flight"] -= 1
+        return 200, {"Content-Type": "application/pdf"}, b"output"
+
+    with StubServer({("POST", "/"): render}) as stub:
+        server = cop.config.Server(stub.url)
+        template = cop.Template.from_raw(b"template content", "docx", should_hash=True)
+        printjob = cop.PrintJob(cop.elements.Property("a", "b"), server, template)
+        with ThreadPoolExecutor(8) as executor:
+            outputs = list(executor.map(lambda _: printjob.execute().binary, range(24)))
+        server.close()
+    assert outputs == [b"output"] * 24
+    assert all("file" in template for template in templates_sent(stub))
+    assert state["max_in_flight"] > 1
+    # a template that is reset waits for a leader again
+    template.reset_hash()
+    assert template._uploads.acquire(stub.url, lambda: False)
+    template._uploads.release(stub.url)
+    copied = pickle.loads(pickle.dumps(template))
+    assert copy.deepcopy(template).template_dict == copied.template_dict == template.template_dict
+
+
+def test_hashed_secondary_files():
+    """Test that secondary files with should_hash are uploaded once, and sent in full again when the server rejects their hash"""
+    cached = set()
+    state = {"fail": False}
+
+    def render(request):
+        if state.pop("fail", False):
+            return 500, {}, b"render failed\ncontact support\nencoded"
+        body = json.loads(request.body)
+        for file in body["append_files"] + body["templates"]:
+            if file["file_source"] == "hash" and file["file_hash"] not in cached:
+                return 410, {}, b"unknown hash\ncontact support\nencoded"
+            if file.get("should_hash"):
+                cached.add(hashlib.md5(base64.b64decode(file["file_content"])).hexdigest())
+        return 200, {"Content-Type": "application/pdf"}, b"output"
+
+    config = cop.config.ServerConfig(hash_secondary_files=True)
+    with StubServer({("POST", "/"): render}) as stub:
+        server = cop.config.Server(stub.url, config)
+        terms = cop.Resource.from_raw(b"terms and conditions", "pdf")
+        terms.should_hash = True
+        other = cop.Resource.from_raw(b"other", "pdf")
+        subtemplate = cop.Resource.from_base64(base64.b64encode(b"subtemplate").decode(), "docx")
+        subtemplate.should_hash = True
+
+        def execute(server=server, should_hash=True):
+            printjob = cop.PrintJob(
+                cop.elements.Property("a", "b"), server,
+                append_files=[terms, other], subtemplates={"sub": subtemplate},
+            )
+            assert printjob.execute().binary == b"output"
+            # the dict representation does not depend on what the server cached
+            assert [file.get("should_hash") for file in printjob.as_dict["append_files"]] == [should_hash, None]
+            body = json.loads(stub.requests[-1].body)
+            return body["append_files"] + body["templates"]
+
+        # without the opt-in, the files are always sent in full
+        plain = cop.config.Server(stub.url)
+        assert execute(plain, None) == execute(plain, None)
+        assert all("should_hash" not in file and file["file_source"] == "base64" for file in execute(plain, None))
+        plain.close()
+        files = execute()
+        assert [file.get("should_hash") for file in files] == [True, None, True]
+        files = execute()
+        assert files[0] == {"mime_type": "application/pdf", "file_source": "hash", "file_hash": terms.md5}
+        assert files[1]["file_source"] == "base64"
+        assert files[2] == {"mime_type": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                            "file_source": "hash", "file_hash": subtemplate.md5, "name": "sub"}
+        # the server restarted and lost its cache
+        cached.clear()
+        files = execute()
+        assert [file.get("should_hash") for file in files] == [True, None, True]
+        assert len([request for request in stub.requests if request.method == "POST"]) == 7
+        # another server object keeps its own registry of cached files
+        other_server = cop.config.Server(stub.url, config)
+        assert execute(other_server)[0].get("should_hash")
+        # an error other than `ServerConfig.hash_rejected_status` is not sent again in full
+        state["fail"] = True
+        try:
+            cop.PrintJob(cop.elements.Property("a", "b"), server, append_files=[terms]).execute()
+            assert False
+        except cop.exceptions.COPError as error:
+            assert error.user_message == "render failed"
+        assert len([request for request in stub.requests if request.method == "POST"]) == 9
+        assert execute()[0]["file_source"] == "hash"
+        server.close()
+        other_server.close()
+
+
+def run():
+    test_hash_stores()
+    test_shared_hash()
+    test_revalidate()
+    test_single_flight_threads()
+    test_single_flight_async()
+    test_single_flight_no_hash()
+    test_hashed_secondary_files()
+
+
+if __name__ == "__main__":
+    run()
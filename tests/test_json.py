@@ -0,0 +1,203 @@
+import datetime
+import enum
+import hashlib
+import json
+import os
+import random
+import struct
+import tempfile
+import uuid
+
+import numpy
+
+import cloudofficeprint as cop
+from cloudofficeprint.own_utils import json_utils
+
+from tests.stub_server import StubServer
+
+TEMPLATE_PATH = "./tests/data/template.docx"
+IMAGE_PATH = "./tests/data/test.jpg"
+
+
+def test_backends():
+    """Test that both JSON backends produce the same compact JSON and accept the same objects"""
+    class Color(enum.Enum):
+        RED = "red"
+
+    obj = {
+        "text": "café \U0001F600 \"quoted\"\n\t\x01" * 50,
+        "numbers": [1, 2.5, -3, 1e100, 1e16, 1.5e-5, -2.5e-7, 0.0001, float("nan"), float("-inf"), True, False, None],
+        "empty": [{}, [], ""],
+        "converted": [Color.RED, uuid.UUID(int=1)],
+        1: {"nested": ("a", "b")},
+        None: 0.1,
+    }
+    text = json.dumps(obj["text"], ensure_ascii=False)
+    expected = (
+        '{"text":' + text + ',"numbers":[1,2.5,-3,1e100,1e16,0.000015,-2.5e-7,0.0001,null,null,true,false,null],'
+        '"empty":[{},[],""],"converted":["red","00000000-0000-0000-0000-000000000001"],"1":{"nested":["a","b"]},"null":0.1}'
+    ).encode("utf-8")
+    big = {"big": [2 ** 70, 1e-10]}
+    floats = [struct.unpack("d", struct.pack("Q", random.getrandbits(64)))[0] for _ in range(1000)]
+    try:
+        for backend in json_utils.BACKENDS:
+            json_utils.set_backend(backend)
+            assert json_utils.dumps_bytes(obj) == expected
+            assert json_utils.dumps(obj) == expected.decode("utf-8")
+            assert json_utils.loads(expected) == json.loads(expected)
+            assert json_utils.dumps_bytes(big) == b'{"big":[1180591620717411303424,1e-10]}'
+            for unsupported in (datetime.date(2020, 1, 1), numpy.int64(1), b"bytes", {1, 2}):
+                try:
+                    json_utils.dumps_bytes([unsupported])
+                    assert False
+                except TypeError:
+                    pass
+        if json_utils.orjson is not None:
+            assert json_utils.dumps_bytes(floats) == json_utils.orjson.dumps(floats)
+    finally:
+        json_utils.set_backend()
+    assert json_utils.get_backend() == "orjson"
+    try:
+        json_utils.set_backend("simplejson")
+        assert False
+    except ValueError:
+        pass
+
+
+def test_iter_json():
+    """Test that the incremental encoder produces the same JSON as the backend"""
+    obj = {
+        "text": "café \U0001F600 \"quoted\"\n" * 50,
+        "numbers": [1, 2.5, -3, True, False, None],
+        "empty": [{}, [], ""],
+        1: {"nested": ("a", "b")},
+        None: 0.1,
+    }
+    obj["rows"] = [{"i": i, "nested": [{"j": j} for j in range(i % 3)]} for i in range(3000)]
+    obj["long"] = list(range(3000))
+    expected = json_utils.dumps_bytes(obj)
+    for chunk_size in (1, 7, 64, 1 << 16):
+        chunks = list(json_utils.iter_json(obj, chunk_size))
+        assert b"".join(chunks) == expected
+        assert max(len(chunk) for chunk in chunks) <= chunk_size
+
+    raw = {"files": [json_utils.RawJSON(b'{"filename":"a","data":[1]}')] * 3, "other": 1}
+    expected = b'{"files":[' + b",".join([b'{"filename":"a","data":[1]}'] * 3) + b'],"other":1}'
+    assert json_utils.dumps_bytes(raw) == expected
+    assert b"".join(json_utils.iter_json(raw, 7)) == expected
+
+    # the document is encoded one container at a time, so the start is written before the end is encoded
+    chunks = json_utils.iter_json([{"row": [i]} for i in range(1000)] + [{"row": [datetime.date(2020, 1, 1)]}], 64)
+    assert next(chunks).startswith(b'[{"row":[0]},{"row":[1]},')
+    try:
+        list(chunks)
+        assert False
+    except TypeError:
+        pass
+
+
+def test_lazy_base64():
+    """Test that a LazyBase64 encodes to the same string as the eager helpers"""
+    with open(IMAGE_PATH, "rb") as f:
+        content = f.read()
+    expected = cop.own_utils.read_file_as_base64(IMAGE_PATH)
+    for lazy in (json_utils.LazyBase64(IMAGE_PATH), json_utils.LazyBase64(content)):
+        assert str(lazy) == expected
+        assert lazy == expected
+        chunks = list(lazy.iter_encoded(1000))
+        assert max(len(chunk) for chunk in chunks) <= 1000
+        assert b"".join(chunks).decode("ascii") == expected
+        obj = {"files": [{"file": lazy}, {"file": "eager", "other": lazy}]}
+        expected_json = json_utils.dumps_bytes({"files": [{"file": expected}, {"file": "eager", "other": expected}]})
+        assert json_utils.dumps_bytes(obj) == expected_json
+        assert b"".join(json_utils.iter_json(obj, 100)) == expected_json
+    resource = cop.Resource.from_local_file(TEMPLATE_PATH, lazy=True)
+    assert resource.template_dict == cop.Resource.from_local_file(TEMPLATE_PATH).template_dict
+    assert resource.template_json == cop.Resource.from_local_file(TEMPLATE_PATH).template_json
+
+
+def test_file_resource():
+    """Test that a lazily loaded file is only encoded when it is sent in full, not when it is sent as its hash"""
+    resource = cop.Resource.from_local_file(TEMPLATE_PATH, lazy=True)
+    assert isinstance(resource, cop.resource.FileResource) and resource.filetype == "docx"
+    assert resource.size == os.path.getsize(TEMPLATE_PATH) and not resource.modified
+    with open(TEMPLATE_PATH, "rb") as f:
+        assert resource.md5 == hashlib.md5(f.read()).hexdigest()
+
+    def not_encoded(*args):
+        raise AssertionError("the file should not be encoded")
+
+    resource.data.iter_encoded = not_encoded
+    store = cop.config.MemoryHashStore()
+    server = cop.config.Server("http://localhost:8010/", cop.config.ServerConfig(template_hash_store=store))
+    store.set(server.url, resource.digest, "hash")
+    printjob = cop.PrintJob(cop.elements.Property("a", "b"), server, cop.Template(resource, should_hash=True))
+    assert json.loads(b"".join(printjob._body()))["template"] == {"template_type": "docx", "template_hash": "hash"}
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "empty.pdf")
+        open(path, "wb").close()
+        empty = cop.Resource.from_local_file(path, lazy=True)
+        assert empty.secondary_file_dict["file_content"] == "" and empty.digest == hashlib.sha256().hexdigest()
+
+
+def test_interned_base64():
+    """Test that interned images in a loop share one string and serialize like plain strings"""
+    def loop(interned):
+        rows = []
+        for i in range(100):
+            row = cop.elements.ElementCollection()
+            row.add(cop.elements.Image.from_raw("icon", b"status icon", interned=interned))
+            row.add(cop.elements.Property("row", str(i)))
+            rows.append(row)
+        return cop.elements.ElementCollection(elements=[cop.elements.ForEach("rows", rows)])
+
+    interned = loop(True)
+    sources = [row["icon"] for row in interned.as_dict["rows"]]
+    assert all(source is sources[0] for source in sources)
+    assert isinstance(sources[0], json_utils.InternedBase64) and sources[0] == "c3RhdHVzIGljb24="
+    assert interned.deepcopy().as_dict["rows"][0]["icon"] is sources[0]
+    expected = json_utils.dumps_bytes(loop(False).as_dict)
+    assert json_utils.dumps_bytes(interned.as_dict) == expected
+    assert b"".join(json_utils.iter_json(interned.as_dict, 100)) == expected
+
+
+def test_chunked_request_body():
+    """Test that a print job with lazily read files is streamed with chunked transfer encoding"""
+    def printjob(server, lazy):
+        data = cop.elements.ElementCollection()
+        data.add(cop.elements.Image.from_file("image", IMAGE_PATH, lazy=lazy))
+        data.add(cop.elements.Property("text", "Hello, world!"))
+        return cop.PrintJob(
+            data,
+            server,
+            cop.Template.from_local_file(TEMPLATE_PATH, lazy=lazy),
+            append_files=[cop.Resource.from_local_file(TEMPLATE_PATH, lazy=lazy)],
+        )
+
+    with StubServer() as stub:
+        server = cop.config.Server(stub.url)
+        assert printjob(server, True).execute().binary == b"output"
+        server.close()
+        unchunked_server = cop.config.Server(stub.url, cop.config.ServerConfig(chunked_requests=False))
+        assert printjob(unchunked_server, False).execute().binary == b"output"
+        unchunked_server.close()
+        chunked, unchunked = [r for r in stub.requests if r.method == "POST"]
+        assert chunked.headers["Transfer-Encoding"] == "chunked"
+        assert "Content-Length" not in chunked.headers
+        assert int(unchunked.headers["Content-Length"]) == len(unchunked.body)
+        assert json.loads(chunked.body) == json.loads(unchunked.body)
+        assert chunked.body == printjob(unchunked_server, False).json.encode("utf-8")
+
+
+def run():
+    test_backends()
+    test_iter_json()
+    test_lazy_base64()
+    test_file_resource()
+    test_interned_base64()
+    test_chunked_request_body()
+
+
+if __name__ == "__main__":
+    run()
@@ -1,7 +1,11 @@
 import sys
+
+import numpy
+import pandas
 # sys.path.insert(0, "D:/UC/cloudofficeprint-python")
 sys.path.insert(0, "C:/Users/em8ee/OneDrive/Documents/cloudofficeprint-python")
 import cloudofficeprint as cop
+from cloudofficeprint.own_utils import json_utils
 
 
 def test_for_each():
@@ -351,10 +355,76 @@ def test_for_each_merge_cells():
 
     assert loop.as_dict == expected
 
+def test_columnar_loops():
+    """Test that loops generated from columns are written like the equivalent loops of element collections"""
+    n = 2500
+    columns = {
+        'id': numpy.arange(n),
+        'price': pandas.Series(numpy.arange(n) / 4),
+        'label': ['<b>' + str(i) + '</b>' for i in range(n)],
+        'vat': (0.21,) * n,
+    }
+    rows = [
+        cop.elements.ElementCollection('', [
+            cop.elements.Property('id', i),
+            cop.elements.Property('price', i / 4),
+            cop.elements.Raw('label', '<b>' + str(i) + '</b>'),
+            cop.elements.Property('vat', 0.21),
+        ])
+        for i in range(n)
+    ]
+    for cls, kwargs in ((cop.elements.ForEach, {}), (cop.elements.ForEachInline, {'distribute': True}),
+                        (cop.elements.ForEachTableRow, {}), (cop.elements.ForEachMergeCells, {}),
+                        (cop.elements.Labels, {})):
+        loop = cls.from_columns('rows', columns, {'label': cop.elements.Raw}, **kwargs)
+        expected = cls('rows', rows, **kwargs)
+        assert type(loop) is cls and len(loop.content) == n
+        assert loop.as_dict == expected.as_dict
+        assert loop.available_tags == expected.available_tags
+        data = cop.elements.ElementCollection('', [loop, cop.elements.Property('title', 'title')])
+        assert b''.join(json_utils.iter_json(data.as_dict, 1000)) == json_utils.dumps_bytes({**expected.as_dict, 'title': 'title'})
+    assert loop.content[1] == {'id': 1, 'price': 0.25, 'label': '<b>1</b>', 'vat': 0.21}
+    assert isinstance(loop.content[1]['id'], int)
+
+    frame = pandas.DataFrame({'id': [1, 2], 'name': ['a', 'b']})
+    assert cop.elements.ForEach.from_dataframe('rows', frame).as_dict == {'rows': [{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}]}
+    assert cop.elements.ForEach.from_columns('rows', {}).json == '{"rows":[]}'
+    # NumPy values in a list are sent as Python values
+    loop = cop.elements.ForEach.from_columns('rows', {'a': [numpy.int64(1), numpy.float64(0.5)], 'b': (numpy.bool_(True), 'x')})
+    assert loop.json == '{"rows":[{"a":1,"b":true},{"a":0.5,"b":"x"}]}'
+    # dates and times are sent as ISO 8601 strings, not as numbers
+    frame = pandas.DataFrame({
+        'day': pandas.to_datetime(['2021-03-04 05:06:07', None]),
+        'zoned': pandas.to_datetime(['2021-03-04 05:06', '2021-07-08 09:10']).tz_localize('Europe/Brussels'),
+    })
+    assert cop.elements.ForEach.from_dataframe('rows', frame).as_dict == {'rows': [
+        {'day': '2021-03-04T05:06:07', 'zoned': '2021-03-04T05:06:00+01:00'},
+        {'day': None, 'zoned': '2021-07-08T09:10:00+02:00'},
+    ]}
+    columns = {'at': numpy.array(['2021-03-04T05:06:07.5', 'NaT'], dtype='datetime64[ns]'),
+               'on': numpy.array(['2021-03-04', '2021-03-05'], dtype='datetime64[D]'),
+               'listed': [numpy.datetime64('2021-03-04T05:06'), None]}
+    assert cop.elements.ForEach.from_columns('rows', columns).json == (
+        '{"rows":[{"at":"2021-03-04T05:06:07.500000","on":"2021-03-04","listed":"2021-03-04T05:06:00"},'
+        '{"at":null,"on":"2021-03-05","listed":null}]}'
+    )
+    for columns, schema, error in (({'a': [1, 2], 'b': [1]}, None, ValueError),
+                                   ({'a': [1]}, {'b': cop.elements.Raw}, ValueError),
+                                   ({'a': [1]}, {'a': cop.elements.CellStyleProperty}, TypeError),
+                                   ({'a': numpy.array([1, 2], dtype='timedelta64[s]')}, None, TypeError),
+                                   ({'a': [numpy.timedelta64(1, 's')]}, None, TypeError)):
+        try:
+            cop.elements.ForEach.from_columns('rows', columns, schema)
+            assert False
+        except error:
+            pass
+
+
 def run():
     test_for_each()
     test_for_each_sheet()
     test_for_each_merge_cells()
+    test_columnar_loops()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,181 @@
+import asyncio
+import json
+import threading
+
+import cloudofficeprint as cop
+
+from tests.stub_server import StubServer
+
+
+def polling_stub(count: int, not_ready: int = 2) -> StubServer:
+    """A stub server that answers print jobs with a download link, which is ready after being polled `not_ready` times.
+
+    Jobs with a negative value get a link that fails, and the number of concurrent requests is tracked.
+    """
+    state = {"polls": {}, "in_flight": 0, "max_in_flight": 0}
+    lock = threading.Lock()
+
+    def tracked(handler):
+        def wrapper(request):
+            with lock:
+                state["in_flight"] += 1
+                state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+            try:
+                return handler(request)
+            finally:
+                with lock:
+                    state["in_flight"] -= 1
+        return wrapper
+
+    def submit(request):
+        body = json.loads(request.body)
+        assert body["output"]["output_polling"] is True
+        value = int(body["files"][0]["data"]["test"])
+        return 200, {"Content-Type": "application/json"}, json.dumps({"download_link": f"/download/{value}"}).encode()
+
+    def download(value):
+        def handler(request):
+            with lock:
+                polls = state["polls"][value] = state["polls"].get(value, 0) + 1
+            if value < 0:
+                return 500, {}, b"render failed\ncontact support\nencoded"
+            if polls <= not_ready:
+                return 404, {}, b"not ready"
+            return 200, {"Content-Type": "application/pdf"}, [b"output ", str(value).encode()]
+        return handler
+
+    routes = {("POST", "/"): tracked(submit)}
+    for value in range(-count, count + 1):
+        routes[("GET", f"/download/{value}")] = tracked(download(value))
+    stub = StubServer(routes)
+    stub.state = state
+    return stub
+
+
+def printjobs(server, values, secret_key=None):
+    for value in values:
+        yield cop.PrintJob(
+            cop.elements.Property("test", str(value)),
+            server,
+            output_config=cop.config.OutputConfig(secret_key=secret_key),
+        )
+
+
+def test_polling_client():
+    """Test that a polling client collects all outputs with the secret key and bounds the requests in flight"""
+    values = list(range(12))
+
+    async def execute(server):
+        client = cop.PollingClient(server, max_in_flight=3, initial_interval=0.01, max_interval=0.05)
+        results = [result async for result in client.execute(printjobs(server, values, "s3cr3t"))]
+        await server.aclose()
+        return results
+
+    with polling_stub(12) as stub:
+        server = cop.config.Server(stub.url)
+        results = asyncio.run(execute(server))
+    assert sorted(result.index for result in results) == values
+    for result in results:
+        assert result.result().binary == b"output " + str(values[result.index]).encode()
+        assert result.response.mimetype == "application/pdf"
+    downloads = [request for request in stub.requests if request.path.startswith("/download")]
+    assert all(request.path.endswith("?secretkey=s3cr3t") for request in downloads)
+    assert all(polls == 3 for polls in stub.state["polls"].values())
+    assert stub.state["max_in_flight"] <= 3
+
+
+def test_polling_client_errors():
+    """Test that a failing download link is captured per print job"""
+    async def execute(server):
+        client = cop.PollingClient(server, initial_interval=0.01)
+        results = [result async for result in client.execute(printjobs(server, [1, -1, 2]))]
+        await server.aclose()
+        return results
+
+    with polling_stub(3, not_ready=0) as stub:
+        server = cop.config.Server(stub.url)
+        results = sorted(asyncio.run(execute(server)), key=lambda result: result.index)
+    assert [result.ok for result in results] == [True, False, True]
+    assert isinstance(results[1].error, cop.exceptions.COPError)
+    assert results[1].error.user_message == "render failed"
+    assert all("secretkey" not in request.path for request in stub.requests)
+
+
+def test_polling_client_timeout():
+    """Test that an output that does not get ready in time results in a timeout"""
+    async def execute(server):
+        client = cop.PollingClient(server, initial_interval=0.01, max_interval=0.02, timeout=0.1)
+        results = [result async for result in client.execute(printjobs(server, [1]))]
+        await server.aclose()
+        return results
+
+    with polling_stub(1, not_ready=1000) as stub:
+        server = cop.config.Server(stub.url)
+        results = asyncio.run(execute(server))
+    assert isinstance(results[0].error, TimeoutError)
+    assert stub.state["polls"][1] > 1
+
+
+def node_stub() -> StubServer:
+    """A stub server that answers print jobs with a relative download link, which only this server can serve."""
+    accepted = set()
+
+    def submit(request):
+        value = json.loads(request.body)["files"][0]["data"]["test"]
+        accepted.add(value)
+        return 200, {}, f"download/{value}".encode()
+
+    def download(request):
+        value = request.path.split("/")[-1]
+        if value not in accepted:
+            return 404, {}, b"unknown output\ncontact support\nencoded"
+        return 200, {"Content-Type": "application/pdf"}, b"output " + value.encode()
+
+    routes = {("POST", "/"): submit}
+    for value in range(-1, 8):
+        routes[("GET", f"/download/{value}")] = download
+    return StubServer(routes)
+
+
+def test_polling_client_pool():
+    """Test that every output is polled on the server of a pool that accepted its print job, and that a lasting 404 fails"""
+    async def execute(pool, values, **options):
+        client = cop.PollingClient(pool, initial_interval=0.01, max_interval=0.02, **options)
+        results = [result async for result in client.execute(printjobs(pool, values))]
+        for server in pool.servers:
+            await server.aclose()
+        return sorted(results, key=lambda result: result.index)
+
+    with node_stub() as first, node_stub() as second:
+        pool = cop.config.ServerPool([first.url, second.url])
+        results = asyncio.run(execute(pool, range(8)))
+        assert [result.result().binary for result in results] == [b"output " + str(value).encode() for value in range(8)]
+        for stub in (first, second):
+            posts = [request for request in stub.requests if request.method == "POST"]
+            downloads = [request for request in stub.requests if request.path.startswith("/download")]
+            assert len(posts) == len(downloads) == 4
+        # an output that is never found is an error once the grace period is over, not a timeout
+        first.routes[("POST", "/")] = second.routes[("POST", "/")] = lambda request: (200, {}, b"download/-1")
+        results = asyncio.run(execute(pool, [0], not_found_grace=0.05, timeout=5))
+        assert isinstance(results[0].error, cop.exceptions.COPError)
+        assert results[0].error.user_message == "unknown output"
+        pool.close()
+
+
+def test_parse_link():
+    """Test the formats in which the server can return the download link"""
+    assert cop.PollingClient._parse_link("/download/1\n") == "/download/1"
+    assert cop.PollingClient._parse_link('"/download/1"') == "/download/1"
+    assert cop.PollingClient._parse_link('{"status": "ok", "download_link": "/download/1"}') == "/download/1"
+
+
+def run():
+    test_polling_client()
+    test_polling_client_errors()
+    test_polling_client_timeout()
+    test_polling_client_pool()
+    test_parse_link()
+
+
+if __name__ == "__main__":
+    run()
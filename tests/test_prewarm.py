@@ -0,0 +1,116 @@
+import asyncio
+import json
+
+import cloudofficeprint as cop
+
+from tests.test_hash_store import hashing_stub, templates_sent
+
+
+def test_prewarm_server():
+    """Test that a pre-warmed template is only sent as its hash, and that pre-warming again only verifies the hash"""
+    known = set()
+    store = cop.config.MemoryHashStore()
+    with hashing_stub(known) as stub:
+        server = cop.config.Server(stub.url, cop.config.ServerConfig(template_hash_store=store))
+        template = cop.Template.from_raw(b"template content", "docx", should_hash=True)
+        results = template.prewarm(server)
+        assert [(result.ok, result.uploaded, result.template_hash) for result in results] == [(True, True, "hash-dGVtcGxh")]
+        assert results[0].server is server and results[0].seconds >= results[0].reachable_seconds >= 0
+        upload = json.loads(stub.requests[-1].body)
+        assert upload["output"]["output_type"] == "docx" and upload["template"]["should_hash"]
+        assert store.get(stub.url, template.resource.digest) == "hash-dGVtcGxh"
+
+        cop.PrintJob(cop.elements.Property("a", "b"), server, template).execute()
+        assert "file" not in templates_sent(stub)[-1]
+        results = template.prewarm(server)
+        assert results[0].ok and not results[0].uploaded
+        assert len(templates_sent(stub)) == 2
+        server.close()
+
+
+def test_prewarm_pool():
+    """Test that templates pre-warmed on every server of a pool are sent to the pool as their hash"""
+    known = set()
+    store = cop.config.MemoryHashStore()
+    with hashing_stub(known) as first, hashing_stub(known) as second:
+        pool = cop.config.ServerPool([first.url, second.url], cop.config.ServerConfig(template_hash_store=store))
+        templates = [
+            cop.Template.from_raw(b"template content", "docx", should_hash=True),
+            cop.Template.from_raw(b"other content", "docx", should_hash=True),
+        ]
+        # a template sent to a pool before pre-warming is uploaded in full
+        cop.PrintJob(cop.elements.Property("a", "b"), pool, templates[0]).execute()
+        assert "file" in templates_sent(first)[-1]
+        results = cop.Template.prewarm_many(templates, pool)
+        assert [(result.template, result.server.url) for result in results] == [
+            (template, stub.url) for template in templates for stub in (first, second)
+        ]
+        assert all(result.ok and result.uploaded for result in results)
+        sent = len(templates_sent(first)), len(templates_sent(second))
+        for _ in range(4):
+            cop.PrintJob(cop.elements.Property("a", "b"), pool, templates[1]).execute()
+        batch = templates_sent(first)[sent[0]:] + templates_sent(second)[sent[1]:]
+        assert len(batch) == 4 and all("file" not in template for template in batch)
+        pool.close()
+
+
+def test_prewarm_without_store():
+    """Test that a template without hash store keeps the hash, and that unreachable servers are reported"""
+    known = set()
+    with hashing_stub(known) as stub:
+        server = cop.config.Server(stub.url)
+        template = cop.Template.from_raw(b"template content", "docx")
+
+        async def prewarm():
+            results = await template.prewarm_async(server)
+            await server.aclose()
+            return results
+
+        results = asyncio.run(prewarm())
+        assert results[0].ok and template.template_hash == "hash-dGVtcGxh" and not template.should_hash
+        server.close()
+        stub_url = stub.url
+    # the server is gone
+    other = cop.Template.from_raw(b"other content", "docx", should_hash=True)
+    results = other.prewarm(cop.config.Server(stub_url))
+    assert not results[0].ok and results[0].error is not None and not results[0].uploaded
+    assert other.should_hash and other.template_hash is None
+
+
+def test_prewarm_unexpected_error():
+    """Test that an unexpected error on one server is recorded for that server, without aborting the others"""
+    class BrokenServer(cop.config.Server):
+        def _raise_if_unreachable(self):
+            raise ValueError("broken")
+
+        async def _raise_if_unreachable_async(self):
+            raise ValueError("broken")
+
+    known = set()
+    with hashing_stub(known) as stub:
+        for asynchronous in (False, True):
+            store = cop.config.MemoryHashStore()
+            config = cop.config.ServerConfig(template_hash_store=store)
+            servers = [BrokenServer(stub.url + "broken/", config), cop.config.Server(stub.url, config)]
+            template = cop.Template.from_raw(b"template content", "docx", should_hash=True)
+
+            async def prewarm():
+                results = await template.prewarm_async(servers)
+                await servers[1].aclose()
+                return results
+
+            results = asyncio.run(prewarm()) if asynchronous else template.prewarm(servers)
+            assert isinstance(results[0].error, ValueError) and not results[0].ok
+            assert results[1].ok and store.get(stub.url, template.resource.digest) == "hash-dGVtcGxh"
+            servers[1].close()
+
+
+def run():
+    test_prewarm_server()
+    test_prewarm_pool()
+    test_prewarm_without_store()
+    test_prewarm_unexpected_error()
+
+
+if __name__ == "__main__":
+    run()
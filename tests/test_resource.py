@@ -1,7 +1,10 @@
+import base64
 import pathlib
 
 import cloudofficeprint as cop
 
+from tests.stub_server import StubServer
+
 
 def test_resource_raw():
     local_path = str(pathlib.Path().resolve()) + "/tests/data/template.docx"
@@ -66,6 +69,45 @@ def test_resource_html():
     assert resource.template_dict == resource_expected
 
 
+def test_resource_fetched_url():
+    """Test that content fetched from a URL is encoded while it is downloaded, within the size limit"""
+    content = bytes(range(256)) * 400 + b"end"
+    pieces = [content[start:start + 7001] for start in range(0, len(content), 7001)]
+    routes = {
+        ("GET", "/chunked.png"): lambda request: (200, {"Content-Type": "image/png"}, pieces),
+        ("GET", "/sized.png"): lambda request: (200, {"Content-Type": "image/png"}, content),
+    }
+    expected = cop.own_utils.raw_to_base64(content)
+    with StubServer(routes) as stub:
+        written = []
+        size = cop.own_utils.stream_url_as_base64(stub.url + "chunked.png", written.append, chunk_size=1000)
+        assert size == len(content) and b"".join(written).decode("ascii") == expected
+        # every piece but the last encodes a multiple of 3 bytes, so it has no padding
+        assert all(len(piece) % 4 == 0 and b"=" not in piece for piece in written[:-1])
+        assert max(len(piece) for piece in written) <= 1332
+        assert cop.own_utils.urls_as_base64([stub.url + "sized.png", stub.url + "chunked.png"]) == [expected, expected]
+        for path in ("chunked.png", "sized.png"):
+            try:
+                cop.own_utils.url_as_base64(stub.url + path, max_size=len(content) - 1)
+                assert False, "the content is too large"
+            except ValueError:
+                pass
+        resource = cop.Resource.from_url(stub.url + "sized.png", "png", fetch=True, max_size=len(content))
+        assert resource.template_dict == {"template_type": "png", "file": expected}
+        image = cop.elements.Image.from_url("image", stub.url + "chunked.png", fetch=True)
+        assert base64.b64decode(image.source) == content
+        # fetches through the session of a server reuse its pooled connection
+        server = cop.config.Server(stub.url)
+        connections = stub.connections
+        resource = cop.Resource.from_url(stub.url + "sized.png", "png", fetch=True, session=server.session)
+        image = cop.elements.Image.from_url("image", stub.url + "chunked.png", fetch=True, session=server.session)
+        assert cop.own_utils.url_as_base64(stub.url + "sized.png", session=server.session) == expected
+        assert resource.template_dict["file"] == image.source == expected
+        assert stub.connections == connections + 1
+        server.close()
+    assert isinstance(cop.Resource.from_url("http://localhost/sized.png", "png"), cop.resource.URLResource)
+
+
 def run():
     test_resource_base64()
     test_resource_raw()
@@ -73,6 +115,7 @@ def run():
     test_resource_server_path()
     test_resource_url()
     test_resource_html()
+    test_resource_fetched_url()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,160 @@
+import asyncio
+import base64
+import io
+import os
+import tempfile
+import zipfile
+
+import cloudofficeprint as cop
+
+from tests.stub_server import StubServer
+
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+OUTPUT = bytes(range(256)) * 1024
+
+
+def output_stub(body) -> StubServer:
+    """Stub server answering print jobs with `body`"""
+    return StubServer({("POST", "/"): lambda request: (200, {"Content-Type": DOCX}, body)})
+
+
+def test_response_spooled():
+    """Test that an output larger than the spool threshold is stored in a temporary file"""
+    chunks = [OUTPUT[i:i + 10000] for i in range(0, len(OUTPUT), 10000)]
+    with output_stub(chunks) as stub:
+        server = cop.config.Server(stub.url, cop.config.ServerConfig(spool_threshold=1024))
+        response = cop.PrintJob(cop.elements.Property("test", "test"), server).execute()
+        server.close()
+    assert response._file._rolled
+    assert response.size == len(OUTPUT)
+    assert response.binary == OUTPUT
+    assert b"".join(response.iter_chunks(1000)) == OUTPUT
+    buffer = io.BytesIO()
+    response.to_file(buffer)
+    assert buffer.getvalue() == OUTPUT
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "output")
+        response.to_file(path)
+        with open(path + ".docx", "rb") as f:
+            assert f.read() == OUTPUT
+    response.close()
+
+
+def test_execute_stream():
+    """Test that base64 output is decoded while it is streamed"""
+    encoded = base64.b64encode(OUTPUT)
+    # chunk boundaries that do not align with base64 quanta
+    chunks = [encoded[i:i + 9999] for i in range(0, len(encoded), 9999)]
+    with output_stub(chunks) as stub:
+        server = cop.config.Server(stub.url)
+        printjob = cop.PrintJob(
+            cop.elements.Property("test", "test"),
+            server,
+            output_config=cop.config.OutputConfig(encoding="base64"),
+        )
+        with printjob.execute_stream() as response:
+            assert response.filetype == "docx"
+            buffer = io.BytesIO()
+            response.to_file(buffer)
+        assert buffer.getvalue() == OUTPUT
+        server.close()
+
+
+def test_execute_stream_error():
+    """Test that a server error is raised before the output is streamed"""
+    with StubServer({("POST", "/"): lambda request: (400, {}, b"error\ncontact support\nENCODED")}) as stub:
+        server = cop.config.Server(stub.url)
+        printjob = cop.PrintJob(cop.elements.Property("test", "test"), server)
+        try:
+            printjob.execute_stream()
+            assert False
+        except cop.exceptions.COPError:
+            pass
+        server.close()
+
+
+def test_execute_stream_async():
+    """Test the async versions of streamed and spooled output"""
+    encoded = base64.b64encode(OUTPUT)
+    chunks = [encoded[i:i + 9999] for i in range(0, len(encoded), 9999)]
+    with output_stub(chunks) as stub:
+        server = cop.config.Server(stub.url, cop.config.ServerConfig(spool_threshold=1024))
+
+        async def execute():
+            printjob = cop.PrintJob(
+                cop.elements.Property("test", "test"),
+                server,
+                output_config=cop.config.OutputConfig(encoding="base64"),
+            )
+            async with await printjob.execute_stream_async() as response:
+                buffer = io.BytesIO()
+                await response.to_file(buffer)
+            spooled = await printjob.execute_async()
+            await server.aclose()
+            return buffer.getvalue(), spooled
+
+        streamed, spooled = asyncio.run(execute())
+        assert streamed == OUTPUT
+        assert spooled._file._rolled
+        assert spooled.binary == encoded
+
+
+def zip_output(count: int) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("documents/", b"")
+        for i in range(count):
+            archive.writestr(f"documents/{i}.docx", OUTPUT[:1000 * (i + 1)])
+    return buffer.getvalue()
+
+
+def test_response_zip_members():
+    """Test that the files in a zip output are read one at a time and extracted in parallel"""
+    body = zip_output(20)
+    with output_stub([body[i:i + 5000] for i in range(0, len(body), 5000)]) as stub:
+        server = cop.config.Server(stub.url, cop.config.ServerConfig(spool_threshold=1024))
+        response = cop.PrintJob(cop.elements.Property("test", "test"), server).execute()
+        with cop.PrintJob(cop.elements.Property("test", "test"), server).execute_stream() as streaming:
+            streamed = streaming.to_response()
+        server.close()
+    for output in (response, streamed):
+        assert output.member_names == [f"documents/{i}.docx" for i in range(20)]
+        for i, (name, member) in enumerate(output.iter_files()):
+            assert name == f"documents/{i}.docx" and member.read() == OUTPUT[:1000 * (i + 1)]
+        with output.open_member("documents/3.docx") as member:
+            assert member.read(10) == OUTPUT[:10]
+        with tempfile.TemporaryDirectory() as directory:
+            paths = output.extract_all(directory, max_workers=4)
+            assert paths == [os.path.join(os.path.realpath(directory), "documents", f"{i}.docx") for i in range(20)]
+            for i, path in enumerate(paths):
+                with open(path, "rb") as f:
+                    assert f.read() == OUTPUT[:1000 * (i + 1)]
+        output.close()
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("../escaped.docx", b"escaped")
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            cop.Response._from_file(buffer, DOCX).extract_all(directory)
+            assert False, "the file should not be extracted outside of the directory"
+        except ValueError:
+            pass
+    # a root directory contains every other path, but a sibling with the same prefix is outside
+    root = os.path.realpath(os.sep)
+    assert cop.Response._is_inside(root, os.path.join(root, "documents", "0.docx"))
+    assert not cop.Response._is_inside(root, root)
+    directory = os.path.join(root, "output")
+    assert not cop.Response._is_inside(directory, directory + "-other")
+
+
+def run():
+    test_response_spooled()
+    test_execute_stream()
+    test_execute_stream_error()
+    test_execute_stream_async()
+    test_response_zip_members()
+
+
+if __name__ == "__main__":
+    run()
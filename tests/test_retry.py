@@ -0,0 +1,118 @@
+import asyncio
+import gzip
+import time
+
+import cloudofficeprint as cop
+from cloudofficeprint.own_utils import json_utils
+
+from tests.stub_server import StubServer
+
+ERROR = b"error\ncontact support\nENCODED"
+
+
+class CountingBase64(json_utils.LazyBase64):
+    """LazyBase64 counting how many times it is encoded"""
+
+    encoded = 0
+
+    def iter_encoded(self, chunk_size: int = json_utils.CHUNK_SIZE):
+        CountingBase64.encoded += 1
+        yield from super().iter_encoded(chunk_size)
+
+
+def flaky(statuses):
+    """Route handler answering with the given statuses first and with a document afterwards"""
+    statuses = list(statuses)
+
+    def handler(request):
+        if statuses:
+            status = statuses.pop(0)
+            if status is None:
+                raise ConnectionResetError("dropped by the stub server")
+            return status, {"Retry-After": "0"} if status == 429 else {}, ERROR
+        return 200, {"Content-Type": "application/pdf"}, b"output"
+    return handler
+
+
+def test_retry_status():
+    """Test that transient errors are retried with the same encoded body"""
+    with StubServer({("POST", "/"): flaky([503, None, 502])}) as stub:
+        server = cop.config.Server(stub.url, cop.config.ServerConfig(
+            compression="gzip",
+            compression_threshold=0,
+            retry_policy=cop.config.RetryPolicy(backoff_factor=0.01),
+        ))
+        CountingBase64.encoded = 0
+        printjob = cop.PrintJob(
+            cop.elements.Property("test", "test"),
+            server,
+            cop.Template(cop.resource.Base64Resource(CountingBase64(b"template" * 10000), "docx")),
+        )
+        assert printjob.execute().binary == b"output"
+        server.close()
+        bodies = [r.body for r in stub.requests if r.method == "POST"]
+        assert len(bodies) == 4
+        expected = printjob.json.encode("utf-8")
+        assert all(gzip.decompress(body) == expected for body in bodies)
+        # the body was encoded once, the reference JSON above encodes it once more
+        assert CountingBase64.encoded == 2
+
+
+def test_retry_total_timeout():
+    """Test that retries stop when the total time would be exceeded"""
+    with StubServer({("POST", "/"): lambda request: (503, {}, ERROR)}) as stub:
+        server = cop.config.Server(stub.url, cop.config.ServerConfig(
+            retry_policy=cop.config.RetryPolicy(
+                max_attempts=100, backoff_factor=0.05, jitter=False, total_timeout=0.5
+            ),
+        ))
+        printjob = cop.PrintJob(cop.elements.Property("test", "test"), server)
+        start = time.monotonic()
+        try:
+            printjob.execute()
+            assert False
+        except cop.exceptions.COPError:
+            pass
+        assert time.monotonic() - start < 0.5
+        # delays of 0.05, 0.1 and 0.2 seconds fit in the total time, 0.4 does not
+        assert len([r for r in stub.requests if r.method == "POST"]) == 4
+        server.close()
+
+
+def test_retry_async():
+    """Test that the asynchronous transport retries too"""
+    with StubServer({("POST", "/"): flaky([429, 503])}) as stub:
+        server = cop.config.Server(stub.url, cop.config.ServerConfig(
+            retry_policy=cop.config.RetryPolicy(backoff_factor=0.01, retry_on_status=(429, 503)),
+        ))
+        printjob = cop.PrintJob(cop.elements.Property("test", "test"), server)
+
+        async def execute():
+            response = await printjob.execute_async()
+            await server.aclose()
+            return response
+
+        assert asyncio.run(execute()).binary == b"output"
+        bodies = [r.body for r in stub.requests if r.method == "POST"]
+        assert bodies == [printjob.json.encode("utf-8")] * 3
+
+
+def test_backoff():
+    policy = cop.config.RetryPolicy(backoff_factor=1, max_backoff=5, jitter=False)
+    assert [policy.backoff(attempt) for attempt in range(5)] == [1, 2, 4, 5, 5]
+    assert policy.backoff(0, "3") == 3
+    assert policy.backoff(0, "60") == 5
+    jittered = cop.config.RetryPolicy(backoff_factor=1, max_backoff=5)
+    assert all(0 <= jittered.backoff(3) <= 5 for _ in range(100))
+    assert policy.next_delay(3, time.monotonic()) is None
+
+
+def run():
+    test_retry_status()
+    test_retry_total_timeout()
+    test_retry_async()
+    test_backoff()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,206 @@
+import asyncio
+import copy
+import os
+import pickle
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cloudofficeprint as cop
+
+from tests.stub_server import StubServer
+
+
+def test_connection_reuse():
+    """Test that all request paths share the keep-alive connections of the server"""
+    with StubServer() as stub:
+        server = cop.config.Server(stub.url, cop.config.ServerConfig(metadata_ttl=0))
+        printjob = cop.PrintJob(cop.elements.Property("test", "test"), server)
+        for _ in range(5):
+            assert server.get_version_cop() == "/version"
+            assert printjob.execute().binary == b"output"
+        server.close()
+        # the server is only checked for reachability once
+        assert len(stub.requests) == 11
+        assert stub.connections == 1
+
+
+def test_connection_pool_threads():
+    """Test that concurrent requests are bounded by the connection pool"""
+    with StubServer() as stub:
+        server = cop.config.Server(stub.url, cop.config.ServerConfig(pool_maxsize=4))
+        with ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(lambda _: server.get_version_soffice(), range(40)))
+        server.close()
+        assert results == ["/soffice"] * 40
+        assert stub.connections <= 4
+
+
+def test_no_keep_alive():
+    """Test that connections are not reused when keep-alive is disabled"""
+    with StubServer() as stub:
+        with cop.config.Server(stub.url, cop.config.ServerConfig(keep_alive=False, metadata_ttl=0)) as server:
+            server.get_version_cop()
+            server.get_version_cop()
+        assert stub.connections == 3
+
+
+def test_reachability_cache():
+    """Test that the server is not contacted for a reachability check while it is known to be reachable"""
+    with StubServer() as stub:
+        server = cop.config.Server(stub.url, cop.config.ServerConfig(metadata_ttl=0))
+        printjob = cop.PrintJob(cop.elements.Property("test", "test"), server)
+        for _ in range(5):
+            printjob.execute()
+            server.get_version_cop()
+        assert [r.path for r in stub.requests].count("/marco") == 1
+        assert len(stub.requests) == 11
+
+
+def test_circuit_breaker():
+    """Test that requests fail fast while the server is down and that the server is probed again in the background"""
+    status = {"marco": 503}
+    routes = {("GET", "/marco"): lambda request: (status["marco"], {}, b"polo")}
+    with StubServer(routes) as stub:
+        server = cop.config.Server(
+            stub.url,
+            cop.config.ServerConfig(failure_threshold=2, recovery_timeout=0.2),
+        )
+        printjob = cop.PrintJob(cop.elements.Property("test", "test"), server)
+        for _ in range(4):
+            try:
+                printjob.execute()
+                assert False
+            except ConnectionError:
+                pass
+        # only the first two checks reached the server, the others failed fast
+        assert len(stub.requests) == 2
+        assert server.circuit_breaker.state == cop.config.CircuitBreaker.OPEN
+
+        # after the recovery timeout, one print job is let through as the trial
+        status["marco"] = 200
+        time.sleep(0.25)
+        assert printjob.execute().binary == b"output"
+        assert server.circuit_breaker.state == cop.config.CircuitBreaker.CLOSED
+        assert [r.path for r in stub.requests] == ["/marco", "/marco", "/marco", "/"]
+
+
+def test_half_open_trial():
+    """Test that a half-open circuit lets a single trial through, and replaces a trial that never finishes"""
+    breaker = cop.config.CircuitBreaker(failure_threshold=1, recovery_timeout=0.1)
+    breaker.record_failure()
+    assert not breaker.allow_request()
+    time.sleep(0.15)
+    with ThreadPoolExecutor(8) as executor:
+        allowed = list(executor.map(lambda _: breaker.allow_request(), range(8)))
+    assert allowed.count(True) == 1 and breaker.state == cop.config.CircuitBreaker.HALF_OPEN
+    time.sleep(0.15)
+    assert breaker.allow_request() and not breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == cop.config.CircuitBreaker.OPEN
+    time.sleep(0.15)
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == cop.config.CircuitBreaker.CLOSED and breaker.allow_request()
+    # a probe is the trial, the caller fails fast
+    breaker.record_failure()
+    time.sleep(0.15)
+    assert not breaker.allow_request(breaker.record_success)
+    for _ in range(20):
+        if breaker.state == cop.config.CircuitBreaker.CLOSED:
+            break
+        time.sleep(0.01)
+    assert breaker.state == cop.config.CircuitBreaker.CLOSED
+
+
+def test_metadata_cache():
+    """Test that the metadata is fetched in one sweep and invalidated when the version of Cloud Office Print changes"""
+    state = {"version": "1.0"}
+    routes = {
+        ("GET", "/version"): lambda request: (200, {}, state["version"].encode()),
+        ("GET", "/supported_template_mimetypes"): lambda request: (200, {}, b'{"docx": "a"}'),
+        ("GET", "/officetopdf"): lambda request: (404, {}, b"not on windows"),
+    }
+    with StubServer(routes) as stub:
+        server = cop.config.Server(stub.url, cop.config.ServerConfig(metadata_ttl=0.2))
+        for _ in range(3):
+            assert server.get_version_cop() == "1.0"
+            assert server.get_version_soffice() == "/soffice"
+            assert server.get_supported_template_mimetypes() == {"docx": "a"}
+        paths = [r.path for r in stub.requests]
+        assert paths[0] == "/marco"
+        assert sorted(paths[1:]) == sorted("/" + path for path in cop.config.METADATA_PATHS)
+        # a failed request is not cached
+        assert server.get_version_officetopdf() == "not on windows"
+        assert [r.path for r in stub.requests].count("/officetopdf") == 2
+
+        output_path = "supported_output_mimetypes?template=docx"
+        assert server._metadata(output_path) == "/" + output_path
+
+        state["version"] = "2.0"
+        server.get_supported_template_mimetypes()
+        assert [r.path for r in stub.requests].count("/supported_template_mimetypes") == 1
+        time.sleep(0.25)
+        # an expired entry is fetched again in one sweep with all others, which notices the new version
+        count = len(stub.requests)
+        assert server.get_supported_template_mimetypes() == {"docx": "a"}
+        assert server.get_version_soffice() == "/soffice"
+        paths = [r.path for r in stub.requests[count:] if r.path != "/marco"]
+        assert sorted(paths) == sorted("/" + path for path in cop.config.METADATA_PATHS)
+        assert server.metadata_cache.get("version") == "2.0"
+        # entries that are not part of the sweep were dropped with the old version
+        assert server.metadata_cache.get(output_path) is None
+        server.close()
+
+
+def test_metadata_cache_file():
+    """Test that the metadata cache is shared through a file and warmed concurrently by the async methods"""
+    with tempfile.TemporaryDirectory() as directory, StubServer() as stub:
+        path = os.path.join(directory, "metadata.json")
+        config = cop.config.ServerConfig(metadata_cache_path=path)
+        server = cop.config.Server(stub.url, config)
+
+        async def query():
+            assert await server.get_version_cop_async() == "/version"
+            await server.aclose()
+
+        asyncio.run(query())
+        assert len(stub.requests) == 1 + len(cop.config.METADATA_PATHS)
+        other = cop.config.Server(stub.url, config)
+        assert other.get_version_soffice() == "/soffice"
+        assert other.get_version_cop() == "/version"
+        assert len(stub.requests) == 1 + len(cop.config.METADATA_PATHS)
+
+
+def test_copy_and_pickle():
+    """Test that a server that was used can be copied and pickled, and that the copy creates its own connections"""
+    with StubServer() as stub:
+        config = cop.config.ServerConfig(template_hash_store=cop.config.MemoryHashStore())
+        pool = cop.config.ServerPool([stub.url, stub.url], config)
+        server = cop.config.Server(stub.url, config)
+        for original in (server, pool):
+            printjob = cop.PrintJob(cop.elements.Property("test", "test"), original)
+            printjob.execute()
+            original.get_version_cop()
+            for copied in (copy.deepcopy(printjob), pickle.loads(pickle.dumps(printjob))):
+                assert copied.server is not original and copied.server.url == original.url
+                assert copied.execute().binary == b"output"
+                assert copied.server.session is not original.session
+                copied.server.close()
+            original.close()
+
+
+def run():
+    test_connection_reuse()
+    test_connection_pool_threads()
+    test_no_keep_alive()
+    test_reachability_cache()
+    test_circuit_breaker()
+    test_half_open_trial()
+    test_metadata_cache()
+    test_metadata_cache_file()
+    test_copy_and_pickle()
+
+
+if __name__ == "__main__":
+    run()
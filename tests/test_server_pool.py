@@ -0,0 +1,177 @@
+import asyncio
+import random
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+import cloudofficeprint as cop
+
+from tests.stub_server import StubServer
+
+
+def posts(stub: StubServer) -> int:
+    return len([r for r in stub.requests if r.method == "POST"])
+
+
+def test_round_robin():
+    """Test that print jobs are spread evenly and the pool configuration is used for the print jobs"""
+    with ExitStack() as stack:
+        stubs = [stack.enter_context(StubServer()) for _ in range(3)]
+        pool = cop.config.ServerPool(
+            [stub.url for stub in stubs], cop.config.ServerConfig(api_key="KEY")
+        )
+        printjob = cop.PrintJob(cop.elements.Property("test", "test"), pool)
+        for _ in range(9):
+            assert printjob.execute().binary == b"output"
+        assert pool.get_version_cop() == "/version"
+        pool.close()
+        assert [posts(stub) for stub in stubs] == [3, 3, 3]
+        assert all(b'"api_key":"KEY"' in r.body for stub in stubs for r in stub.requests if r.method == "POST")
+
+
+def test_failover():
+    """Test that a print job is sent to another server when a server drops the connection, and that the failing server is taken out of rotation"""
+    def drop(request):
+        raise ConnectionResetError("dropped by the stub server")
+
+    with ExitStack() as stack:
+        broken = stack.enter_context(StubServer({("POST", "/"): drop}))
+        stubs = [stack.enter_context(StubServer()) for _ in range(2)]
+        config = cop.config.ServerConfig(failure_threshold=2, recovery_timeout=60)
+        pool = cop.config.ServerPool([broken.url] + [stub.url for stub in stubs], config)
+        printjob = cop.PrintJob(cop.elements.Property("test", "test"), pool)
+        for _ in range(10):
+            assert printjob.execute().binary == b"output"
+        pool.close()
+        assert posts(broken) == 2
+        assert pool.servers[0].circuit_breaker.state == cop.config.CircuitBreaker.OPEN
+        assert pool.healthy_servers == pool.servers[1:]
+        bodies = {r.body for stub in (broken, *stubs) for r in stub.requests if r.method == "POST"}
+        assert bodies == {printjob.json.encode("utf-8")}
+
+
+def test_selection_is_pure():
+    """Test that selecting servers does not change their circuit breakers, and that a recovered server gets a request as trial"""
+    def drop(request):
+        raise ConnectionResetError("dropped by the stub server")
+
+    with ExitStack() as stack:
+        broken = stack.enter_context(StubServer({("POST", "/"): drop}))
+        stub = stack.enter_context(StubServer())
+        config = cop.config.ServerConfig(failure_threshold=1, recovery_timeout=0.2)
+        pool = cop.config.ServerPool([broken.url, stub.url], config)
+        printjob = cop.PrintJob(cop.elements.Property("test", "test"), pool)
+        assert printjob.execute().binary == b"output"
+        breaker = pool.servers[0].circuit_breaker
+        assert breaker.state == cop.config.CircuitBreaker.OPEN and pool.healthy_servers == pool.servers[1:]
+        time.sleep(0.3)
+        for _ in range(5):
+            assert pool.healthy_servers == pool.servers
+        assert breaker.state == cop.config.CircuitBreaker.OPEN
+        assert posts(broken) == 1
+        # the next request selected for the recovered server is its trial, and fails over
+        assert printjob.execute().binary == b"output"
+        pool.close()
+        assert posts(broken) == 2
+        assert breaker.state == cop.config.CircuitBreaker.OPEN
+
+
+def test_pool_url():
+    """Test that the pool has no URL of a server and caches the metadata of its servers per server"""
+    with ExitStack() as stack:
+        stubs = [stack.enter_context(StubServer()) for _ in range(2)]
+        pool = cop.config.ServerPool([stub.url for stub in stubs])
+        assert pool.url not in [server.url for server in pool.servers]
+        assert pool.get_version_cop() == "/version"
+        assert pool.servers[0].metadata_cache.get("version") == "/version"
+        assert pool.metadata_cache is pool.servers[0].metadata_cache
+        for _ in range(3):
+            pool.servers[0].circuit_breaker.record_failure()
+        assert pool.get_version_soffice() == "/soffice"
+        assert pool.servers[1].metadata_cache.get("soffice") == "/soffice"
+        assert not any(r.path.startswith("/serverpool") for stub in stubs for r in stub.requests)
+        pool.close()
+
+
+def test_all_servers_down():
+    with StubServer() as stub:
+        url = stub.url
+    pool = cop.config.ServerPool([url, url])
+    try:
+        cop.PrintJob(cop.elements.Property("test", "test"), pool).execute()
+        assert False
+    except ConnectionError:
+        pass
+
+
+def test_least_outstanding():
+    """Test that concurrent print jobs avoid a server that is busy"""
+    def slow(request):
+        time.sleep(0.3)
+        return 200, {"Content-Type": "application/pdf"}, b"output"
+
+    with ExitStack() as stack:
+        busy = stack.enter_context(StubServer({("POST", "/"): slow}))
+        stubs = [stack.enter_context(StubServer()) for _ in range(2)]
+        pool = cop.config.ServerPool(
+            [busy.url] + [stub.url for stub in stubs], strategy=cop.config.ServerPool.LEAST_OUTSTANDING
+        )
+        printjobs = [cop.PrintJob(cop.elements.Property("test", str(i)), pool) for i in range(30)]
+        results = list(cop.PrintJob.execute_many(printjobs, max_in_flight=3, ordered=False))
+        pool.close()
+        assert all(result.ok for result in results)
+        assert posts(busy) <= 2
+        assert all(pool.outstanding(server) == 0 for server in pool.servers)
+
+
+def test_latency_weighted():
+    """Test that slow servers get fewer print jobs"""
+    def slow(request):
+        time.sleep(0.05)
+        return 200, {"Content-Type": "application/pdf"}, b"output"
+
+    random.seed(0)
+    with ExitStack() as stack:
+        slow_stub = stack.enter_context(StubServer({("POST", "/"): slow}))
+        fast_stub = stack.enter_context(StubServer())
+        pool = cop.config.ServerPool(
+            [slow_stub.url, fast_stub.url], strategy=cop.config.ServerPool.LATENCY_WEIGHTED
+        )
+        printjob = cop.PrintJob(cop.elements.Property("test", "test"), pool)
+        for _ in range(40):
+            printjob.execute()
+        pool.close()
+        assert posts(slow_stub) < 8
+        assert pool.latency(pool.servers[0]) > pool.latency(pool.servers[1])
+
+
+def test_pool_async():
+    """Test that asynchronous print jobs are spread over the pool too"""
+    with ExitStack() as stack:
+        stubs = [stack.enter_context(StubServer()) for _ in range(2)]
+        pool = cop.config.ServerPool([stub.url for stub in stubs])
+        printjobs = [cop.PrintJob(cop.elements.Property("test", str(i)), pool) for i in range(20)]
+
+        async def execute():
+            results = await asyncio.gather(*(printjob.execute_async() for printjob in printjobs))
+            await pool.aclose()
+            return results
+
+        results = asyncio.run(execute())
+        assert [result.binary for result in results] == [b"output"] * 20
+        assert Counter(posts(stub) for stub in stubs) == Counter([10, 10])
+
+
+def run():
+    test_round_robin()
+    test_failover()
+    test_selection_is_pure()
+    test_pool_url()
+    test_all_servers_down()
+    test_least_outstanding()
+    test_latency_weighted()
+    test_pool_async()
+
+
+if __name__ == "__main__":
+    run()
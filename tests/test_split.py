@@ -0,0 +1,133 @@
+import asyncio
+import base64
+import io
+import json
+import zipfile
+
+import cloudofficeprint as cop
+
+from tests.stub_server import StubServer
+
+LIMIT = 4000
+
+
+def render(request):
+    """Stub rendering: every file becomes a document containing its data, merge concatenates them"""
+    body = json.loads(request.body)
+    if "append_files" in body:
+        # a merge job: the template and appended PDFs are concatenated
+        pdfs = [body["template"]["file"]] + [f["file_content"] for f in body["append_files"]]
+        return 200, {"Content-Type": "application/pdf"}, b"".join(base64.b64decode(pdf) for pdf in pdfs)
+    documents = [(f["filename"], f["data"]["text"].encode()) for f in body["files"]]
+    if body["output"].get("output_merge"):
+        return 200, {"Content-Type": "application/pdf"}, b"".join(content for _, content in documents)
+    if len(documents) == 1:
+        return 200, {"Content-Type": "application/pdf"}, documents[0][1]
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in documents:
+            archive.writestr(name + ".pdf", content)
+    return 200, {"Content-Type": "application/zip"}, buffer.getvalue()
+
+
+def data(count: int):
+    return {f"file{i}": cop.elements.Property("text", f"<{i}>" + "x" * 300) for i in range(count)}
+
+
+def test_split_zip():
+    """Test that a large Mapping is split into print jobs within the limit and combined into one zip file"""
+    with StubServer({("POST", "/"): render}) as stub:
+        server = cop.config.Server(stub.url, cop.config.ServerConfig(max_payload_size=LIMIT, pool_maxsize=4))
+        printjob = cop.PrintJob(data(41), server, output_config=cop.config.OutputConfig(filetype="pdf"))
+        response = printjob.execute()
+        server.close()
+        bodies = [r.body for r in stub.requests if r.method == "POST"]
+        assert len(bodies) > 3
+        assert all(len(body) <= LIMIT for body in bodies)
+        assert response.mimetype == "application/zip"
+        with zipfile.ZipFile(io.BytesIO(response.binary)) as archive:
+            assert archive.namelist() == [f"file{i}.pdf" for i in range(41)]
+            assert [archive.read(f"file{i}.pdf") for i in range(41)] == [
+                (f"<{i}>" + "x" * 300).encode() for i in range(41)
+            ]
+
+
+def test_split_merge():
+    """Test that the PDFs of the parts are merged in a reduction step"""
+    with StubServer({("POST", "/"): render}) as stub:
+        server = cop.config.Server(stub.url, cop.config.ServerConfig(max_payload_size=LIMIT))
+        output_config = cop.config.OutputConfig(filetype="pdf", pdf_options=cop.config.PDFOptions(merge=True))
+        response = cop.PrintJob(data(60), server, output_config=output_config).execute()
+        server.close()
+        assert response.binary == b"".join((f"<{i}>" + "x" * 300).encode() for i in range(60))
+        merge_jobs = [r for r in stub.requests if r.method == "POST" and b"append_files" in r.body]
+        assert len(merge_jobs) > 1
+        # two PDFs are always merged together, even if that exceeds the limit
+        assert all(len(r.body) <= LIMIT for r in stub.requests if r.method == "POST" and r not in merge_jobs)
+        assert all(json.loads(r.body)["output"]["output_type"] == "pdf" for r in merge_jobs)
+
+
+def test_no_split():
+    """Test that a print job within the limit is sent as is"""
+    with StubServer({("POST", "/"): render}) as stub:
+        server = cop.config.Server(stub.url, cop.config.ServerConfig(max_payload_size=LIMIT))
+        printjob = cop.PrintJob(data(3), server, output_config=cop.config.OutputConfig(filetype="pdf"))
+        response = printjob.execute()
+        server.close()
+        assert [r.body for r in stub.requests if r.method == "POST"] == [printjob.json.encode("utf-8")]
+        assert response.mimetype == "application/zip"
+
+
+def test_split_encodes_once():
+    """Test that the files of a split print job are encoded once, and that PDFs to merge are read from the spools of the responses"""
+    class CountingProperty(cop.elements.Property):
+        encoded = 0
+
+        @property
+        def as_dict(self):
+            CountingProperty.encoded += 1
+            return super().as_dict
+
+    with StubServer({("POST", "/"): render}) as stub:
+        server = cop.config.Server(stub.url, cop.config.ServerConfig(max_payload_size=LIMIT))
+        for count in (41, 3):
+            CountingProperty.encoded = 0
+            files = {f"file{i}": CountingProperty("text", f"<{i}>" + "x" * 300) for i in range(count)}
+            response = cop.PrintJob(files, server, output_config=cop.config.OutputConfig(filetype="pdf")).execute()
+            assert CountingProperty.encoded == count
+            assert len(response.archive.namelist()) == count
+        server.close()
+
+    pdf = cop.Response._from_file(io.BytesIO(b"%PDF"), "application/pdf")
+    resource = cop.PrintJob._pdf_resources([pdf])[0]
+    assert resource.secondary_file_dict["file_content"].source is pdf._file
+    assert str(resource.secondary_file_dict["file_content"]) == base64.b64encode(b"%PDF").decode("ascii")
+
+
+def test_split_async():
+    with StubServer({("POST", "/"): render}) as stub:
+        server = cop.config.Server(stub.url, cop.config.ServerConfig(max_payload_size=LIMIT))
+        output_config = cop.config.OutputConfig(filetype="pdf", pdf_options=cop.config.PDFOptions(merge=True))
+
+        async def execute():
+            merged = await cop.PrintJob(data(30), server, output_config=output_config).execute_async()
+            zipped = await cop.PrintJob(data(30), server, output_config=cop.config.OutputConfig(filetype="pdf")).execute_async()
+            await server.aclose()
+            return merged, zipped
+
+        merged, zipped = asyncio.run(execute())
+        assert merged.binary == b"".join((f"<{i}>" + "x" * 300).encode() for i in range(30))
+        with zipfile.ZipFile(io.BytesIO(zipped.binary)) as archive:
+            assert len(archive.namelist()) == 30
+
+
+def run():
+    test_split_zip()
+    test_split_merge()
+    test_no_split()
+    test_split_encodes_once()
+    test_split_async()
+
+
+if __name__ == "__main__":
+    run()